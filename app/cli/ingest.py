@@ -0,0 +1,84 @@
+"""Bulk-index PDFs from the command line.
+
+Usage:
+    python -m app.cli.ingest PATH [PATH ...] [--collection NAME] [--chunk-size 500] [--chunk-overlap 100]
+                             [--output results.json]
+
+Each PATH is a PDF, a zip/tar archive of PDFs, or a directory searched
+recursively for both. Files run through the same pipelined ingestion as
+POST /documents/bulk, writing directly to the configured Chroma directory,
+so do not run it against a collection the API server is writing to.
+Progress is printed while indexing, followed by counts and pages/sec and
+chunks/sec.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List, Tuple
+from app.config.config import get_settings
+from app.controllers.document_controller import DocumentController
+from app.services.upload_service import archive_suffix
+from app.services.vector_store_service import VectorStoreService
+
+
+def _is_input(path: str) -> bool:
+    return path.lower().endswith(".pdf") or archive_suffix(path) is not None
+
+
+def collect_inputs(paths: List[str]) -> List[Tuple[str, str]]:
+    """``(path, filename)`` pairs for the given files and the PDFs/archives under the given directories"""
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                inputs.extend((os.path.join(root, name), name) for name in sorted(files) if _is_input(name))
+        elif os.path.isfile(path):
+            inputs.append((path, os.path.basename(path)))
+        else:
+            raise SystemExit(f"No such file or directory: {path}")
+    return inputs
+
+
+def _print_progress(**counters) -> None:
+    print(
+        f"\r{counters['files_indexed']}/{counters['files_total']} files, "
+        f"{counters['pages_parsed']} pages, {counters['chunks_written']} chunks written "
+        f"({counters['pages_per_sec']} pages/sec, {counters['chunks_per_sec']} chunks/sec)",
+        end="", file=sys.stderr, flush=True
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--collection", help="defaults to CHROMA_COLLECTION_NAME")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--chunk-overlap", type=int)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    inputs = collect_inputs(args.paths)
+    if not inputs:
+        raise SystemExit("No PDFs or archives found")
+
+    controller = DocumentController(vector_store_service=VectorStoreService())
+    results = controller.index_bulk(
+        inputs,
+        collection_name=args.collection or get_settings().CHROMA_COLLECTION_NAME,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        progress_callback=_print_progress
+    )
+    print(file=sys.stderr)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if results["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
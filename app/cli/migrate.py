@@ -0,0 +1,31 @@
+"""Migrate collections indexed before chunks got content-derived IDs.
+
+Usage:
+    python -m app.cli.migrate [--collection NAME ...]
+
+Older chunks were stored under random IDs with the upload's temporary path
+as their source, so uploading the same PDF again added a second copy
+instead of replacing it, and deleting the document left them behind. This
+rewrites them under content-derived IDs with the original filename as
+source, keeping their embeddings. Running it again is a no-op. Like
+``app.cli.ingest`` it writes to the Chroma directory directly, so stop the
+API server first.
+"""
+
+import argparse
+from app.config.config import get_settings
+from app.services.vector_store_service import VectorStoreService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", action="append", help="defaults to CHROMA_COLLECTION_NAME")
+    args = parser.parse_args()
+
+    service = VectorStoreService()
+    for collection in args.collection or [get_settings().CHROMA_COLLECTION_NAME]:
+        print(f"{collection}: {service.migrate_legacy_chunks(collection)} chunks migrated")
+
+
+if __name__ == "__main__":
+    main()
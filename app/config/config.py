@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -21,23 +21,137 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.5-flash-lite"
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
 
+    # Embedding Engine
+    EMBEDDING_BACKEND: str = "torch"  # torch, onnx or onnx-int8
+    EMBEDDING_ONNX_FILE: str = "onnx/model_quint8_avx2.onnx"  # used by onnx-int8
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_WORKERS: int = 0  # encode processes for large batches; 0 or 1 encodes in-process
+    EMBEDDING_POOL_MIN_TEXTS: int = 256
+
+    # Agent Pool
+    AGENT_POOL_SIZE: int = 4
+    AGENT_POOL_ACQUIRE_TIMEOUT_SECONDS: float = 30.0
+    AGENT_MAX_EXECUTION_SECONDS: Optional[float] = 60.0  # the agent stops reasoning after this long
+    REACT_PROMPT_REF: str = "hwchase17/react:d15fe3c4"
+    REACT_PROMPT_CACHE_PATH: str = "./data/prompts/react_prompt.json"
+
+    # Query Routing
+    FAST_PATH_ENABLED: bool = True  # answer from retrieved context with one LLM call unless tools are needed
+
+    # Agent Tools
+    TOOL_HTTP_MAX_CONNECTIONS: int = 20
+    TOOL_HTTP_MAX_KEEPALIVE: int = 10
+    TOOL_HTTP_KEEPALIVE_SECONDS: float = 30.0
+    TOOL_HTTP_DEFAULT_TIMEOUT_SECONDS: float = 10.0
+    TOOL_CACHE_SIZE: int = 256  # entries per tool; 0 disables result caching
+    WEATHER_API_BASE_URL: str = "http://api.openweathermap.org/data/2.5"
+    WEATHER_TIMEOUT_SECONDS: float = 5.0
+    WEATHER_CACHE_TTL_SECONDS: Optional[int] = 5 * 60
+    NEWS_API_BASE_URL: str = "https://google-news13.p.rapidapi.com"
+    NEWS_TIMEOUT_SECONDS: float = 8.0
+    NEWS_CACHE_TTL_SECONDS: Optional[int] = 30 * 60
+    SEARCH_TIMEOUT_SECONDS: float = 10.0
+    SEARCH_CACHE_TTL_SECONDS: Optional[int] = 15 * 60
+    TOOL_BREAKER_FAILURES: int = 3  # consecutive failures before a tool is short-circuited
+    TOOL_BREAKER_RESET_SECONDS: float = 30.0
+    TOOL_PARALLEL_MAX_CALLS: int = 5
+
     # Chroma DB
     CHROMA_PERSIST_DIR: str = "./data/chroma_db"
     CHROMA_COLLECTION_NAME: str = "pdf_documents"
+    CHROMA_MAX_OPEN_COLLECTIONS: int = 32
+    CHROMA_COLLECTION_IDLE_SECONDS: Optional[int] = 30 * 60  # None keeps idle handles open
+    CHROMA_WARM_COLLECTIONS: List[str] = []  # opened at startup besides the default collection
+
+    # PDF Extraction
+    PDF_EXTRACTOR: str = "pypdf"
+    PDF_EXTRACT_WORKERS: int = 0  # 0 uses every CPU core
+    PDF_PAGES_PER_TASK: int = 8
+    PDF_PARALLEL_MIN_PAGES: int = 16
 
     # Chunk Settings
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
 
+    # Uploads
+    MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+    UPLOAD_BLOCK_SIZE: int = 1024 * 1024
+
+    # Ingestion Jobs
+    INGESTION_WORKERS: int = 2
+    INGESTION_QUEUE_SIZE: int = 16
+    INGESTION_JOB_DIR: str = "./data/ingestion_jobs"
+    INGESTION_BATCH_SIZE: int = 64
+    INGESTION_JOB_TTL_SECONDS: int = 7 * 24 * 3600  # finished jobs are forgotten after this long
+    INGESTION_MAX_FINISHED_JOBS: int = 1000  # and beyond this many, oldest first
+    DOCUMENT_STORE_DIR: str = "./data/documents"  # originals kept for re-indexing
+
+    # Bulk Ingestion
+    BULK_MAX_FILES: int = 500  # PDFs per bulk job, counting archive members
+    BULK_MAX_UPLOAD_BYTES: int = 1024 * 1024 * 1024  # whole bulk request
+    BULK_QUEUE_SIZE: int = 256  # items buffered between pipeline stages
+    BULK_WRITE_BATCH_SIZE: int = 1024  # chunks per Chroma write
+
     # Search Settings
     DEFAULT_TOP_K: int = 1
     MAX_TOP_K: int = 10
+    MIN_RELEVANCE_SCORE: float = 0.2  # cosine similarity; chunks scoring lower are left out of the context
+
+    # Hybrid Retrieval
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_CANDIDATES: int = 20  # results taken from each retriever before fusion
+    RRF_K: int = 60
+    BM25_MIN_SCORE_RATIO: float = 0.2  # keyword hits below this share of the best score are ignored
+    BM25_INDEX_DIR: str = "./data/bm25_index"
+
+    # Context Assembly
+    CONTEXT_TOKEN_BUDGET: int = 1500
+    CONTEXT_DUPLICATE_THRESHOLD: float = 0.9  # shingle similarity above which a passage is dropped
+    CONTEXT_MMR_LAMBDA: Optional[float] = None  # e.g. 0.7 to trade relevance for diversity; None disables MMR
+
+    # Reranking
+    RERANKER_ENABLED: bool = False
+    RERANKER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20  # chunks retrieved for the reranker to choose top_k from
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_LATENCY_BUDGET_MS: Optional[int] = 500  # retrieval order is kept when exceeded
+    RERANK_SCORE_CACHE_SIZE: int = 4096
+    RERANK_MAX_CONCURRENCY: int = 2
+
+    # Retrieval Caches (0 disables a cache)
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    RETRIEVAL_CACHE_SIZE: int = 512
+
+    # Query Pipeline Concurrency
+    RETRIEVAL_MAX_CONCURRENCY: int = 8
+    LLM_MAX_CONCURRENCY: int = 4
+
+    # Batch Queries
+    BATCH_MAX_QUESTIONS: int = 1000
+    BATCH_LLM_CONCURRENCY: int = 4  # answers generated at once per batch request
+
+    # Answer Cache
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_BACKEND: str = "memory"
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: int = 60 * 60
+    ANSWER_CACHE_NAMESPACE: str = "answer_cache:"
 
     # Redis / Chat Memory
     REDIS_URL: Optional[str] = "redis://:admin12345@localhost:6379"
-    CHAT_MEMORY_BACKEND: str = "memory"
+    CHAT_MEMORY_BACKEND: str = "memory"  # memory or redis
     CHAT_MEMORY_TTL_SECONDS: Optional[int] = 60 * 60 * 24
     CHAT_MEMORY_NAMESPACE: str = "chat_mem:"
+    CHAT_MEMORY_MAX_MESSAGES: Optional[int] = 200  # older messages are trimmed on write
+    CHAT_HISTORY_MESSAGES: int = 6  # recent messages read back for the prompt; twice as many with summaries on
+    CHAT_MEMORY_MAX_CONVERSATIONS: int = 10000  # memory backend: least recently used are evicted
+    CHAT_MEMORY_MAX_TOTAL_CHARS: Optional[int] = 50_000_000  # memory backend: cap on stored message text
+
+    # Conversation Summary
+    CHAT_SUMMARY_ENABLED: bool = True
+    CHAT_SUMMARY_TRIGGER_TOKENS: int = 2000  # unfolded messages above this are folded down to half of it
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
 
     # Pydantic v2 config
     model_config = {
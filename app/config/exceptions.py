@@ -18,4 +18,24 @@ class LLMError(RAGException):
 
 class InvalidFileTypeError(RAGException):
     """Invalid file type uploaded"""
-    pass
\ No newline at end of file
+    pass
+
+class FileTooLargeError(RAGException):
+    """Uploaded file exceeds the configured size limit"""
+    pass
+
+class CollectionNotFoundError(RAGException):
+    """Requested collection does not exist"""
+    pass
+
+class DocumentNotFoundError(RAGException):
+    """No indexed chunks or stored original exist for a document"""
+    pass
+
+class IngestionQueueFullError(RAGException):
+    """Ingestion job queue is at capacity"""
+    pass
+
+class ToolError(RAGException):
+    """External tool call failed, timed out or is unavailable"""
+    pass
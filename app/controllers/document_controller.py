@@ -1,44 +1,269 @@
 """Controller for document operations"""
 
+import asyncio
+import os
+import shutil
 from app.services.pdf_service import PDFService
 from app.services.ai.chunking_service import ChunkingService
 from app.services.vector_store_service import VectorStoreService
-from app.models.response_models import UploadResponse
+from app.services.ingestion_job_service import IngestionJobQueue
+from app.services.upload_service import (
+    ARCHIVE_MAGIC, PDF_MAGIC, AsyncReadable, archive_suffix, spool_upload
+)
+from app.services.bulk_ingestion_service import BulkIngestionPipeline, BulkSource, iter_pdf_sources
+from app.services.pdf_extractors import PDFSource
+from app.models.response_models import DocumentDeleteResponse, IngestionJobResponse
 from app.config.config import get_settings
-from app.config.exceptions import InvalidFileTypeError
+from app.config.exceptions import DocumentNotFoundError, InvalidFileTypeError
+from app.config.logger import logger
+from langchain_core.documents import Document
+from typing import AsyncIterable, Callable, Dict, Iterator, List, Optional, Tuple
 
 class DocumentController:
-    def __init__(self):
+    def __init__(
+        self,
+        vector_store_service: Optional[VectorStoreService] = None,
+        job_queue: Optional[IngestionJobQueue] = None
+    ):
         self.pdf_service = PDFService()
         self.chunking_service = ChunkingService()
-        self.vector_store_service = VectorStoreService()
+        self.vector_store_service = vector_store_service or VectorStoreService()
+        self.job_queue = job_queue
         self.settings = get_settings()
-    
-    async def process_and_index_pdf(
+
+    async def submit_pdf(
         self,
-        file_content: bytes,
+        upload: AsyncReadable,
         filename: str,
         chunk_size: int = None,
         chunk_overlap: int = None
-    ) -> UploadResponse:
-        """Process PDF and index in vector store"""
-        
+    ) -> IngestionJobResponse:
+        """Stream a PDF upload to the job spool file and queue it for background indexing"""
+
         if not filename.lower().endswith('.pdf'):
             raise InvalidFileTypeError("Only PDF files are supported")
-        
-        documents = await self.pdf_service.load_pdf(file_content, filename)
-        
-        chunks = self.chunking_service.chunk_documents(
-            documents,
-            chunk_size=chunk_size or self.settings.CHUNK_SIZE,
-            chunk_overlap=chunk_overlap or self.settings.CHUNK_OVERLAP
+
+        job = self.job_queue.create_job(
+            filename=filename,
+            collection_name=self.settings.CHROMA_COLLECTION_NAME,
+            options={"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
         )
-        
-        self.vector_store_service.add_documents(chunks)
-        
-        return UploadResponse(
-            message="PDF processed and indexed successfully",
+        try:
+            await spool_upload(
+                upload,
+                self.job_queue.upload_path(job["job_id"]),
+                max_bytes=self.settings.MAX_UPLOAD_BYTES,
+                block_size=self.settings.UPLOAD_BLOCK_SIZE
+            )
+        except BaseException:
+            self.job_queue.discard(job["job_id"])
+            raise
+
+        job = self.job_queue.enqueue(job["job_id"])
+        return IngestionJobResponse(**job)
+
+    async def submit_bulk(
+        self,
+        uploads: AsyncIterable[Tuple[AsyncReadable, str]],
+        chunk_size: int = None,
+        chunk_overlap: int = None
+    ) -> IngestionJobResponse:
+        """Spool several PDFs or zip/tar archives of PDFs and queue them as one bulk job.
+
+        Uploads are consumed in order, so they can be read straight from the
+        request body; each is checked before any of it is written.
+        """
+        job = self.job_queue.create_job(filename="bulk upload", collection_name=self.settings.CHROMA_COLLECTION_NAME)
+        upload_dir = self.job_queue.upload_dir(job["job_id"])
+        names: List[str] = []
+        try:
+            os.makedirs(upload_dir, exist_ok=True)
+            # Archives may use the whole bulk allowance, single PDFs the usual upload limit
+            remaining = self.settings.BULK_MAX_UPLOAD_BYTES
+            async for upload, filename in uploads:
+                name = os.path.basename(filename)
+                suffix = archive_suffix(name)
+                if not name.lower().endswith('.pdf') and suffix is None:
+                    raise InvalidFileTypeError(f"'{name}' is neither a PDF nor a zip/tar archive")
+                if len(names) == self.settings.BULK_MAX_FILES:
+                    raise InvalidFileTypeError(f"At most {self.settings.BULK_MAX_FILES} files can be uploaded at once")
+                remaining -= await spool_upload(
+                    upload,
+                    os.path.join(upload_dir, str(len(names))),
+                    max_bytes=remaining if suffix else min(remaining, self.settings.MAX_UPLOAD_BYTES),
+                    block_size=self.settings.UPLOAD_BLOCK_SIZE,
+                    magic=ARCHIVE_MAGIC[suffix] if suffix else PDF_MAGIC,
+                    kind="archive" if suffix else "PDF"
+                )
+                names.append(name)
+            if not names:
+                raise InvalidFileTypeError("No files were uploaded")
+
+            self.job_queue.describe_job(
+                job["job_id"],
+                filename=names[0] if len(names) == 1 else f"{names[0]} and {len(names) - 1} more",
+                options={"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "files": names}
+            )
+        except BaseException:
+            self.job_queue.discard(job["job_id"])
+            raise
+
+        job = self.job_queue.enqueue(job["job_id"])
+        return IngestionJobResponse(**job)
+
+    async def reindex_document(
+        self,
+        filename: str,
+        chunk_size: int = None,
+        chunk_overlap: int = None
+    ) -> IngestionJobResponse:
+        """Queue the stored original of a document for indexing again.
+
+        Chunk IDs are content-derived, so only chunks that differ from the
+        indexed version are embedded and written.
+        """
+        collection = self.settings.CHROMA_COLLECTION_NAME
+        original = self.original_path(collection, filename)
+        if not os.path.exists(original):
+            raise DocumentNotFoundError(f"No stored original for document '{filename}'")
+
+        job = self.job_queue.create_job(
             filename=filename,
-            chunks_created=len(chunks),
-            collection_name=self.settings.CHROMA_COLLECTION_NAME
-        )
\ No newline at end of file
+            collection_name=collection,
+            options={"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+        )
+        try:
+            await asyncio.to_thread(shutil.copyfile, original, self.job_queue.upload_path(job["job_id"]))
+        except BaseException:
+            self.job_queue.discard(job["job_id"])
+            raise
+
+        job = self.job_queue.enqueue(job["job_id"])
+        return IngestionJobResponse(**job)
+
+    def delete_document(self, filename: str) -> DocumentDeleteResponse:
+        """Remove a document's chunks and its stored original"""
+        collection = self.settings.CHROMA_COLLECTION_NAME
+        deleted = self.vector_store_service.delete_source(filename, collection_name=collection)
+
+        original = self.original_path(collection, filename)
+        had_original = os.path.exists(original)
+        if had_original:
+            os.unlink(original)
+        if not deleted and not had_original:
+            raise DocumentNotFoundError(f"Document '{filename}' is not indexed")
+
+        return DocumentDeleteResponse(filename=filename, collection_name=collection, chunks_deleted=deleted)
+
+    def original_path(self, collection_name: str, filename: str) -> str:
+        """Where the original upload of an indexed document is kept for re-indexing"""
+        return os.path.join(self.settings.DOCUMENT_STORE_DIR, collection_name, os.path.basename(filename))
+
+    def keep_original(self, upload_path: str, collection_name: str, filename: str) -> None:
+        """Move a successfully indexed upload into the document store"""
+        original = self.original_path(collection_name, filename)
+        os.makedirs(os.path.dirname(original), exist_ok=True)
+        os.replace(upload_path, original)
+        logger.debug(f"Stored original of '{filename}' at {original}")
+
+    def get_job(self, job_id: str) -> Optional[IngestionJobResponse]:
+        """Current state and progress of an ingestion job"""
+        job = self.job_queue.get(job_id)
+        return IngestionJobResponse(**job) if job else None
+
+    def store_original(self, collection_name: str, filename: str, source: PDFSource) -> None:
+        """Copy a PDF given as a path or buffer into the document store"""
+        original = self.original_path(collection_name, filename)
+        os.makedirs(os.path.dirname(original), exist_ok=True)
+        if isinstance(source, str):
+            shutil.copyfile(source, original)
+        else:
+            with open(original, "wb") as f:
+                f.write(source)
+
+    def index_bulk(
+        self,
+        inputs: List[Tuple[str, str]],
+        collection_name: Optional[str] = None,
+        chunk_size: int = None,
+        chunk_overlap: int = None,
+        progress_callback: Optional[Callable[..., None]] = None
+    ) -> Dict:
+        """Index ``(path, filename)`` inputs, each a PDF or a zip/tar archive of PDFs.
+
+        Files go through the pipelined bulk ingestion; every file that parses
+        is kept in the document store for re-indexing. Returns the pipeline's
+        counts, throughput and per-file errors.
+        """
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        max_files = self.settings.BULK_MAX_FILES
+
+        def sources() -> Iterator[BulkSource]:
+            count = 0
+            for path, filename in inputs:
+                for name, source in iter_pdf_sources(path, filename, self.settings.MAX_UPLOAD_BYTES):
+                    count += 1
+                    if count > max_files:
+                        yield name, InvalidFileTypeError(
+                            f"Bulk ingestion is limited to {max_files} PDFs; this and later files were not indexed"
+                        )
+                        return
+                    yield name, source
+
+        pipeline = BulkIngestionPipeline(
+            self.vector_store_service,
+            pdf_service=self.pdf_service,
+            chunk_size=chunk_size or self.settings.CHUNK_SIZE,
+            chunk_overlap=chunk_overlap or self.settings.CHUNK_OVERLAP,
+            embed_batch_size=self.settings.INGESTION_BATCH_SIZE,
+            write_batch_size=self.settings.BULK_WRITE_BATCH_SIZE,
+            queue_size=self.settings.BULK_QUEUE_SIZE
+        )
+        return pipeline.run(
+            sources(),
+            collection_name=collection,
+            progress_callback=progress_callback,
+            on_file_parsed=lambda filename, source: self.store_original(collection, filename, source)
+        )
+
+    def index_pdf_file(
+        self,
+        file_path: str,
+        filename: str,
+        collection_name: Optional[str] = None,
+        chunk_size: int = None,
+        chunk_overlap: int = None,
+        progress_callback: Optional[Callable[..., None]] = None
+    ) -> int:
+        """Parse, chunk, embed and index a PDF stored on disk; returns the chunk count.
+
+        Pages stream from the extractor into the chunker and the vector store,
+        so embedding starts before the last page has been parsed. The document
+        replaces any indexed version with the same filename: unchanged chunks
+        are skipped and chunks missing from the new version are deleted.
+        """
+        progress = progress_callback or (lambda **counters: None)
+        counts = {"pages_parsed": 0, "chunks_total": 0}
+
+        def parsed_pages() -> Iterator[Document]:
+            for page in self.pdf_service.iter_pages(file_path, filename):
+                counts["pages_parsed"] += 1
+                progress(pages_parsed=counts["pages_parsed"])
+                yield page
+
+        def chunks() -> Iterator[Document]:
+            for chunk in self.chunking_service.chunk_stream(
+                parsed_pages(),
+                chunk_size=chunk_size or self.settings.CHUNK_SIZE,
+                chunk_overlap=chunk_overlap or self.settings.CHUNK_OVERLAP
+            ):
+                counts["chunks_total"] += 1
+                yield chunk
+
+        self.vector_store_service.add_documents(
+            chunks(),
+            collection_name=collection_name,
+            progress_callback=lambda **counters: progress(chunks_total=counts["chunks_total"], **counters),
+            source=filename
+        )
+        return counts["chunks_total"]
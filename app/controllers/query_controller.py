@@ -1,18 +1,250 @@
 """Controller for query operations"""
 
-from typing import Optional
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
 
 from app.services.vector_store_service import VectorStoreService
 from app.services.ai.llm_service import LLMService
-from app.models.response_models import QueryResponse, SourceDocument
+from app.services.ai.context_assembler import ContextAssembler, TokenCounter
+from app.services.ai.conversation_summarizer import ConversationSummarizer
+from app.services.ai.reranker_service import CrossEncoderReranker
+from app.models.response_models import BatchQueryItem, QueryResponse, SourceDocument
 from app.config.config import get_settings
+from app.config.logger import logger
+from app.services.metrics import stage_timer
+from app.services.answer_cache_service import BaseAnswerCache, context_fingerprint
+from app.services.bm25_index import code_terms, reciprocal_rank_fusion
 from app.services.chat_memory_service import BaseChatMemory
+from app.services.stage_executor import get_stage_executor
+
+# A retrieved chunk with its relevance score
+ScoredDocument = Tuple[Document, float]
+
 class QueryController:
-    def __init__(self, memory_service: Optional[BaseChatMemory] = None):
-        self.vector_store_service = VectorStoreService()
-        self.llm_service = LLMService()
+    def __init__(
+        self,
+        memory_service: Optional[BaseChatMemory] = None,
+        llm_service: Optional[LLMService] = None,
+        vector_store_service: Optional[VectorStoreService] = None,
+        answer_cache: Optional[BaseAnswerCache] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        summarizer: Optional[ConversationSummarizer] = None
+    ):
+        self.vector_store_service = vector_store_service or VectorStoreService()
+        self.llm_service = llm_service or LLMService()
         self.settings = get_settings()
         self.memory = memory_service
+        self.answer_cache = answer_cache
+        self.reranker = reranker
+        self.summarizer = summarizer
+        self.retrieval_stage = get_stage_executor("retrieval")
+        self.rerank_stage = get_stage_executor("rerank")
+        self.context_assembler = ContextAssembler(
+            TokenCounter(self.settings.GEMINI_MODEL),
+            token_budget=self.settings.CONTEXT_TOKEN_BUDGET,
+            max_overlap_chars=self.settings.CHUNK_OVERLAP,
+            duplicate_threshold=self.settings.CONTEXT_DUPLICATE_THRESHOLD,
+            mmr_lambda=self.settings.CONTEXT_MMR_LAMBDA
+        )
+        self.llm_stage = get_stage_executor("llm")
+
+    async def check_collection(self, collection_name: Optional[str]) -> None:
+        """Raise CollectionNotFoundError for an unknown collection, e.g. before a response starts streaming"""
+        await self.retrieval_stage.run(self.vector_store_service.get_vectorstore, collection_name)
+
+    async def _load_history(
+        self,
+        conversation_id: Optional[str],
+        use_memory: bool
+    ) -> Tuple[Optional[str], List[Dict]]:
+        """Fetch the conversation summary and recent messages when memory is enabled for this request"""
+        if not (use_memory and conversation_id and self.memory):
+            return None, []
+        # Messages wait unfolded until the summarizer's high-water mark, and all of them belong in the prompt
+        limit = self.summarizer.max_messages if self.summarizer else self.settings.CHAT_HISTORY_MESSAGES
+        with stage_timer("memory_load"):
+            return await self.memory.get_history(conversation_id, limit=limit)
+
+    def _dense_search(
+        self,
+        question: str,
+        k: int,
+        collection_name: Optional[str]
+    ) -> Tuple[List[float], List[ScoredDocument]]:
+        """Embed the question once and search with that embedding"""
+        query_embedding = self.vector_store_service.embed_query(question)
+        scored = self.vector_store_service.similarity_search_with_scores(
+            query=question,
+            k=k,
+            collection_name=collection_name,
+            query_embedding=query_embedding
+        )
+        return query_embedding, scored
+
+    async def search(
+        self,
+        question: str,
+        k: int,
+        collection_name: Optional[str] = None,
+        min_score: Optional[float] = None,
+        hybrid: Optional[bool] = None
+    ) -> Tuple[List[float], List[ScoredDocument]]:
+        """Retrieve the top ``k`` relevant chunks and the question embedding.
+
+        In hybrid mode the vector and BM25 searches run in parallel and their
+        rankings are merged with reciprocal rank fusion. Chunks whose vector
+        relevance is below ``min_score`` are dropped, except in hybrid mode
+        those containing a code from the question (part number, error code).
+        """
+        threshold = self.settings.MIN_RELEVANCE_SCORE if min_score is None else min_score
+        hybrid = self.settings.HYBRID_SEARCH_ENABLED if hybrid is None else hybrid
+
+        if not hybrid:
+            query_embedding, scored = await self.retrieval_stage.run(self._dense_search, question, k, collection_name)
+        else:
+            candidates = max(k, self.settings.HYBRID_CANDIDATES)
+            (query_embedding, dense), keyword = await asyncio.gather(
+                self.retrieval_stage.run(self._dense_search, question, candidates, collection_name),
+                self.retrieval_stage.run(self.vector_store_service.keyword_search, question, candidates, collection_name)
+            )
+            scored = await self._fuse(k, collection_name, query_embedding, dense, keyword)
+        return query_embedding, self._filter_relevant(question, scored, threshold, hybrid)
+
+    async def _fuse(
+        self,
+        k: int,
+        collection_name: Optional[str],
+        query_embedding: List[float],
+        dense: List[ScoredDocument],
+        keyword: List[Tuple[str, float]]
+    ) -> List[ScoredDocument]:
+        """Merge dense and BM25 rankings with reciprocal rank fusion, scoring keyword-only hits"""
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc, _ in dense], [doc_id for doc_id, _ in keyword]],
+            k=self.settings.RRF_K
+        )[:k]
+
+        by_id = {doc.id: (doc, score) for doc, score in dense}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        if missing:
+            by_id.update(await self.retrieval_stage.run(
+                self.vector_store_service.get_scored_by_ids, missing, query_embedding, collection_name
+            ))
+        logger.info("Hybrid retrieval fused %d dense and %d keyword candidates", len(dense), len(keyword))
+        return [by_id[doc_id] for doc_id, _ in fused if doc_id in by_id]
+
+    @staticmethod
+    def _filter_relevant(
+        question: str,
+        scored: List[ScoredDocument],
+        threshold: float,
+        hybrid: bool
+    ) -> List[ScoredDocument]:
+        codes = code_terms(question) if hybrid else set()
+        relevant = [
+            (doc, score) for doc, score in scored
+            if score >= threshold or (codes and codes & code_terms(doc.page_content))
+        ]
+        if len(relevant) < len(scored):
+            logger.info("Dropped %d of %d chunks scoring below %.2f", len(scored) - len(relevant), len(scored), threshold)
+        return relevant
+
+    async def _retrieve(
+        self,
+        question: str,
+        k: int,
+        collection_name: Optional[str],
+        min_score: Optional[float],
+        conversation_id: Optional[str],
+        use_memory: bool
+    ) -> Tuple[List[float], List[ScoredDocument], Tuple[Optional[str], List[Dict]]]:
+        """Run retrieval and the chat history fetch concurrently, then rerank"""
+        # With a reranker, a wider candidate set is retrieved and narrowed back to k
+        candidates = max(k, self.settings.RERANK_CANDIDATES) if self.reranker else k
+        # Retrieval runs on its own bounded thread pool while chat history
+        # is fetched concurrently from the memory backend.
+        (query_embedding, scored), history = await asyncio.gather(
+            self.search(question, candidates, collection_name, min_score),
+            self._load_history(conversation_id, use_memory)
+        )
+        if self.reranker and len(scored) > k:
+            scored = await self.rerank_stage.run(self.reranker.rerank, question, scored, k)
+        return query_embedding, scored, history
+
+    @staticmethod
+    def _cacheable(conv_history: Optional[List[Dict]], summary: Optional[str]) -> bool:
+        # The cache key covers only the question and the retrieved chunks, so
+        # answers that may lean on earlier turns must not be shared
+        return not conv_history and not summary
+
+    async def _lookup_cached_answer(
+        self,
+        collection: str,
+        fingerprint: str,
+        query_embedding: List[float],
+        cacheable: bool = True
+    ) -> Optional[Dict]:
+        if self.answer_cache is None or not cacheable:
+            return None
+        with stage_timer("answer_cache"):
+            return await self.answer_cache.lookup(collection, fingerprint, query_embedding)
+
+    async def _store_cached_answer(
+        self,
+        collection: str,
+        fingerprint: str,
+        query_embedding: List[float],
+        answer: str,
+        sources: List[SourceDocument],
+        cacheable: bool = True
+    ) -> None:
+        if self.answer_cache is None or not cacheable:
+            return
+        await self.answer_cache.store(
+            collection,
+            fingerprint,
+            query_embedding,
+            {"answer": answer, "sources": [source.model_dump() for source in sources]},
+        )
+
+    def _assemble_context(self, scored: List[ScoredDocument]) -> str:
+        with stage_timer("context"):
+            return self.context_assembler.assemble(scored)
+
+    async def _build_context(self, scored: List[ScoredDocument]) -> str:
+        """Assemble the LLM context on the default executor, outside every stage limit.
+
+        It only counts tokens, so it takes no retrieval slot, and it must be
+        ready before an LLM slot is taken so the slot covers the call alone.
+        """
+        return await asyncio.to_thread(self._assemble_context, scored)
+
+    @staticmethod
+    def _build_sources(scored: List[ScoredDocument]) -> List[SourceDocument]:
+        return [
+            SourceDocument(
+                content=doc.page_content[:300] + "...",
+                metadata=doc.metadata,
+                score=round(score, 4),
+            )
+            for doc, score in scored
+        ]
+
+    async def _save_turn(
+        self,
+        conversation_id: Optional[str],
+        use_memory: bool,
+        question: str,
+        answer: str
+    ) -> None:
+        if use_memory and conversation_id and self.memory:
+            with stage_timer("memory_save"):
+                await self.memory.append_turn(conversation_id, question, answer)
+            if self.summarizer:
+                # Folding old turns into the summary happens off the request path
+                self.summarizer.schedule(self.memory, conversation_id)
 
     async def query_documents(
         self,
@@ -20,19 +252,23 @@ class QueryController:
         top_k: int = None,
         collection_name: str = None,
         conversation_id: Optional[str] = None,
-        use_memory: bool = True
+        use_memory: bool = True,
+        min_score: Optional[float] = None
     ) -> QueryResponse:
-        """Query documents and generate an LLM-based answer with optional chat memory"""
+        """Query documents and generate an LLM-based answer with optional chat memory.
+
+        Chunks scoring below ``min_score`` (default MIN_RELEVANCE_SCORE) are left
+        out of the context, which is omitted when none are relevant.
+        """
 
         k = top_k or self.settings.DEFAULT_TOP_K
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
 
-        docs = self.vector_store_service.similarity_search(
-            query=question,
-            k=k,
-            collection_name=collection_name
+        query_embedding, scored, (summary, conv_history) = await self._retrieve(
+            question, k, collection_name, min_score, conversation_id, use_memory
         )
 
-        # if not docs:
+        # if not scored:
         #     return QueryResponse(
         #         question=question,
         #         answer="No relevant documents found. Please upload a PDF first.",
@@ -40,33 +276,49 @@ class QueryController:
         #         model_used=self.settings.GEMINI_MODEL,
         #     )
 
-        context = "\n\n".join([doc.page_content[:1000] for doc in docs])[:2000]
+        response = await self._answer(question, collection, query_embedding, scored, conv_history, summary)
+        await self._save_turn(conversation_id, use_memory, question, response.answer)
+        return response
 
-        conv_history = None
-        if use_memory and conversation_id and self.memory:
-            conv_history = await self.memory.get_messages(conversation_id)
+    async def _answer(
+        self,
+        question: str,
+        collection: str,
+        query_embedding: List[float],
+        scored: List[ScoredDocument],
+        conv_history: Optional[List[Dict]] = None,
+        summary: Optional[str] = None
+    ) -> QueryResponse:
+        """Answer from the retrieved chunks, serving and filling the answer cache"""
+        fingerprint = context_fingerprint([doc for doc, _ in scored])
+        cacheable = self._cacheable(conv_history, summary)
+        cached = await self._lookup_cached_answer(collection, fingerprint, query_embedding, cacheable)
+        if cached is not None:
+            return QueryResponse(
+                question=question,
+                answer=cached["answer"],
+                sources=[SourceDocument(**source) for source in cached["sources"]],
+                model_used=self.settings.GEMINI_MODEL,
+                cached=True,
+            )
 
-        result = self.llm_service.generate_answer(
+        context = await self._build_context(scored)
+
+        result = await self.llm_stage.run_async(
+            self.llm_service.generate_answer,
             context=context,
             question=question,
-            conversation_history=conv_history[-6:],
+            conversation_history=conv_history or [],
+            conversation_summary=summary,
         )
         answer = result["output"]
         used_tool = result["used_tool"]
-        if use_memory and conversation_id and self.memory:
-            await self.memory.append_message(conversation_id, "user", question)
-            await self.memory.append_message(conversation_id, "assistant", answer)
-        
+
         sources = []
         if not used_tool:
-            sources = [
-                SourceDocument(
-                    content=doc.page_content[:300] + "...",
-                    metadata=doc.metadata,
-                    score=0.0,
-                )
-                for doc in docs
-            ]
+            sources = self._build_sources(scored)
+            # Tool answers depend on live data and are never cached
+            await self._store_cached_answer(collection, fingerprint, query_embedding, answer, sources, cacheable)
 
         return QueryResponse(
             question=question,
@@ -74,3 +326,157 @@ class QueryController:
             sources=sources,
             model_used=self.settings.GEMINI_MODEL,
         )
+
+    async def stream_query(
+        self,
+        question: str,
+        top_k: int = None,
+        collection_name: str = None,
+        conversation_id: Optional[str] = None,
+        use_memory: bool = True,
+        min_score: Optional[float] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream agent steps and answer tokens, then the sources, and persist the turn.
+
+        Sources are sent once the answer is known so that, as with /query/,
+        answers a tool produced carry none.
+        """
+
+        k = top_k or self.settings.DEFAULT_TOP_K
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+
+        query_embedding, scored, (summary, conv_history) = await self._retrieve(
+            question, k, collection_name, min_score, conversation_id, use_memory
+        )
+        docs = [doc for doc, _ in scored]
+        sources = self._build_sources(scored)
+
+        fingerprint = context_fingerprint(docs)
+        cacheable = self._cacheable(conv_history, summary)
+        cached = await self._lookup_cached_answer(collection, fingerprint, query_embedding, cacheable)
+        if cached is not None:
+            logger.info("Serving streamed query from answer cache")
+            yield {"event": "token", "data": {"text": cached["answer"]}}
+            yield {"event": "sources", "data": cached["sources"]}
+            await self._save_turn(conversation_id, use_memory, question, cached["answer"])
+            yield {
+                "event": "done",
+                "data": {
+                    "answer": cached["answer"],
+                    "used_tool": False,
+                    "model_used": self.settings.GEMINI_MODEL,
+                    "cached": True,
+                },
+            }
+            return
+
+        context = await self._build_context(scored)
+        result = None
+        async with self.llm_stage.slot():
+            async for event in self.llm_service.stream_answer(
+                context=context,
+                question=question,
+                conversation_history=conv_history,
+                conversation_summary=summary,
+            ):
+                if event["event"] == "final":
+                    result = event["data"]
+                else:
+                    yield event
+
+        answer = result["output"] if result else "No response."
+        used_tool = bool(result and result["used_tool"])
+        await self._save_turn(conversation_id, use_memory, question, answer)
+        if result and not used_tool:
+            await self._store_cached_answer(collection, fingerprint, query_embedding, answer, sources, cacheable)
+
+        yield {
+            "event": "sources",
+            "data": [] if used_tool else [source.model_dump() for source in sources],
+        }
+        yield {
+            "event": "done",
+            "data": {
+                "answer": answer,
+                "used_tool": used_tool,
+                "model_used": self.settings.GEMINI_MODEL,
+                "cached": False,
+            },
+        }
+
+    async def _search_batch(
+        self,
+        questions: List[str],
+        k: int,
+        collection_name: Optional[str],
+        min_score: Optional[float]
+    ) -> Tuple[List[List[float]], List[List[ScoredDocument]]]:
+        """Retrieve for many questions with one embedding batch and one Chroma query"""
+        threshold = self.settings.MIN_RELEVANCE_SCORE if min_score is None else min_score
+        hybrid = self.settings.HYBRID_SEARCH_ENABLED
+        candidates = max(k, self.settings.HYBRID_CANDIDATES) if hybrid else k
+
+        embeddings = await self.retrieval_stage.run(self.vector_store_service.embed_queries, questions)
+        dense = await self.retrieval_stage.run(
+            self.vector_store_service.similarity_search_batch, questions, embeddings, candidates, collection_name
+        )
+        if hybrid:
+            keyword = await asyncio.gather(*(
+                self.retrieval_stage.run(self.vector_store_service.keyword_search, question, candidates, collection_name)
+                for question in questions
+            ))
+            dense = await asyncio.gather(*(
+                self._fuse(k, collection_name, embedding, scored, hits)
+                for embedding, scored, hits in zip(embeddings, dense, keyword)
+            ))
+        return embeddings, [
+            self._filter_relevant(question, scored, threshold, hybrid) for question, scored in zip(questions, dense)
+        ]
+
+    async def batch_query(
+        self,
+        questions: List[str],
+        top_k: int = None,
+        collection_name: str = None,
+        min_score: Optional[float] = None
+    ) -> AsyncIterator[Dict]:
+        """Answer many questions, yielding one result per question in completion order.
+
+        Retrieval for the whole batch is done up front; answers are then
+        generated with at most BATCH_LLM_CONCURRENCY in flight. A failing
+        question yields an item with ``error`` set and does not stop the rest.
+        """
+        k = top_k or self.settings.DEFAULT_TOP_K
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        candidates = max(k, self.settings.RERANK_CANDIDATES) if self.reranker else k
+
+        try:
+            embeddings, scored_lists = await self._search_batch(questions, candidates, collection_name, min_score)
+        except Exception as e:
+            logger.exception("Batched retrieval failed for %d questions: %s", len(questions), e)
+            for index, question in enumerate(questions):
+                yield BatchQueryItem(index=index, question=question, error=str(e)).model_dump()
+            return
+
+        semaphore = asyncio.Semaphore(self.settings.BATCH_LLM_CONCURRENCY)
+
+        async def answer(index: int) -> Dict:
+            question, scored = questions[index], scored_lists[index]
+            try:
+                async with semaphore:
+                    if self.reranker and len(scored) > k:
+                        scored = await self.rerank_stage.run(self.reranker.rerank, question, scored, k)
+                    response = await self._answer(question, collection, embeddings[index], scored)
+                return BatchQueryItem(index=index, **response.model_dump()).model_dump()
+            except Exception as e:
+                logger.warning("Batch question %d failed: %s", index, e)
+                return BatchQueryItem(index=index, question=question, error=str(e)).model_dump()
+
+        tasks = [asyncio.create_task(answer(index)) for index in range(len(questions))]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # The client may disconnect mid-stream; do not keep answering for it
+            for task in tasks:
+                task.cancel()
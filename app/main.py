@@ -1,18 +1,39 @@
 """FastAPI application entry point"""
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import document_routes, query_routes
+from app.routes import document_routes, metrics_routes, query_routes
+from app.routes.dependencies import cache_stats, drain_summarizer, get_vector_store_service, init_services, shutdown_services
 from app.config.config import get_settings
+from app.config.logger import logger
 from app.models.response_models import HealthResponse
-from app.services.vector_store_service import VectorStoreService
+from app.services.metrics import register_cache_stats
+from app.services.pdf_extractors import shutdown_process_pool
+from app.services.stage_executor import shutdown_stage_executors
+from app.services.tools.http_client import ToolHttpClient
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services once and reuse them across requests"""
+    logger.info("Initializing shared services")
+    init_services()
+    yield
+    logger.info("Shutting down shared services")
+    await drain_summarizer()
+    shutdown_services()
+    shutdown_stage_executors()
+    shutdown_process_pool()
+    await ToolHttpClient.aclose()
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Professional RAG Pipeline with LangChain and ChromaDB"
+    description="Professional RAG Pipeline with LangChain and ChromaDB",
+    lifespan=lifespan
 )
 origins = [
     "http://localhost:8501",
@@ -25,9 +46,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(document_routes.UploadLimitMiddleware)
+app.add_middleware(metrics_routes.MetricsMiddleware)
+register_cache_stats(cache_stats)
 
 app.include_router(document_routes.router)
 app.include_router(query_routes.router)
+app.include_router(metrics_routes.router)
 print("DEBUG GEMINI KEY =", get_settings().LLM_API_KEY)
 
 @app.get("/", tags=["root"])
@@ -41,8 +66,9 @@ async def root():
 @app.get("/health", response_model=HealthResponse, tags=["health"])
 async def health_check():
     """Health check endpoint"""
-    vector_store = VectorStoreService()
-    vector_store_status = "healthy" if vector_store.check_health() else "unhealthy"
+    vector_store = get_vector_store_service()
+    is_healthy = await run_in_threadpool(vector_store.check_health)
+    vector_store_status = "healthy" if is_healthy else "unhealthy"
     
     return HealthResponse(
         status="healthy",
@@ -1,7 +1,7 @@
 """Pydantic models for API requests"""
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class QuestionRequest(BaseModel):
     question: str = Field(..., min_length=1, description="Question to ask")
@@ -9,6 +9,7 @@ class QuestionRequest(BaseModel):
     collection_name: Optional[str] = Field(None, description="Collection to query from")
     conversation_id: Optional[str] = None
     use_memory: Optional[bool] = True  
+    min_score: Optional[float] = Field(None, ge=0.0, le=1.0, description="Minimum relevance score of context chunks")
     class Config:
         json_schema_extra = {
             "example": {
@@ -17,6 +18,12 @@ class QuestionRequest(BaseModel):
             }
         }
 
+class BatchQuestionRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1, description="Questions to answer")
+    top_k: Optional[int] = Field(3, ge=1, le=10, description="Number of documents to retrieve per question")
+    collection_name: Optional[str] = Field(None, description="Collection to query from")
+    min_score: Optional[float] = Field(None, ge=0.0, le=1.0, description="Minimum relevance score of context chunks")
+
 class ChunkingConfig(BaseModel):
     chunk_size: Optional[int] = Field(1000, ge=100, le=5000)
     chunk_overlap: Optional[int] = Field(200, ge=0, le=1000)
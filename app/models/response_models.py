@@ -1,7 +1,7 @@
 """Pydantic models for API responses"""
 
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class SourceDocument(BaseModel):
     content: str
@@ -13,6 +13,16 @@ class QueryResponse(BaseModel):
     answer: str
     sources: List[SourceDocument]
     model_used: str
+    cached: bool = False
+
+class BatchQueryItem(BaseModel):
+    index: int
+    question: str
+    answer: Optional[str] = None
+    sources: List[SourceDocument] = []
+    model_used: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
 
 class UploadResponse(BaseModel):
     message: str
@@ -20,6 +30,30 @@ class UploadResponse(BaseModel):
     chunks_created: int
     collection_name: str
 
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    status: str
+    filename: str
+    collection_name: str
+    pages_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_written: int = 0
+    chunks_skipped: int = 0
+    chunks_deleted: int = 0
+    files_total: int = 0
+    files_indexed: int = 0
+    pages_per_sec: float = 0.0
+    chunks_per_sec: float = 0.0
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+class DocumentDeleteResponse(BaseModel):
+    filename: str
+    collection_name: str
+    chunks_deleted: int
+
 class HealthResponse(BaseModel):
     status: str
     app_name: str
@@ -1,36 +1,264 @@
 """Shared API dependencies"""
 
+import os
+import threading
+from typing import Callable, Dict, Optional
 from fastapi import Depends
 from app.controllers.document_controller import DocumentController
 from app.controllers.query_controller import QueryController
 from app.config.config import get_settings
-from app.services.chat_memory_service import RedisChatMemory, BaseChatMemory
+from app.config.logger import logger
+from app.services.ai.context_assembler import TokenCounter
+from app.services.ai.conversation_summarizer import ConversationSummarizer
+from app.services.ai.embeddings_service import EmbeddingsService
+from app.services.ai.llm_service import LLMService
+from app.services.ai.reranker_service import CrossEncoderReranker
+from app.services.answer_cache_service import BaseAnswerCache, InMemoryAnswerCache, RedisAnswerCache
+from app.services.chat_memory_service import BaseChatMemory, InMemoryChatMemory, RedisChatMemory
+from app.services.ingestion_job_service import IngestionJobQueue
+from app.services.stage_executor import get_stage_executor
+from app.services.vector_store_service import VectorStoreService
 
 _memory_instance: BaseChatMemory = None
+_answer_cache: BaseAnswerCache = None
+_reranker: CrossEncoderReranker = None
+_summarizer: ConversationSummarizer = None
+_ingestion_queue: IngestionJobQueue = None
+_llm_service: LLMService = None
+_vector_store_service: VectorStoreService = None
+_services_lock = threading.Lock()
 
 def get_chat_memory() -> BaseChatMemory:
     """
     Singleton provider for chat memory service.
     Call this from FastAPI Depends(...) in endpoints/controllers.
+    CHAT_MEMORY_BACKEND selects Redis ("redis") or process memory ("memory").
     """
     global _memory_instance
     if _memory_instance is not None:
         return _memory_instance
 
     settings = get_settings()
-    if not getattr(settings, "REDIS_URL", None):
-        raise RuntimeError("REDIS_URL is required for RedisChatMemory")
+    with _services_lock:
+        if _memory_instance is None:
+            if settings.CHAT_MEMORY_BACKEND == "redis":
+                if not getattr(settings, "REDIS_URL", None):
+                    raise RuntimeError("REDIS_URL is required for RedisChatMemory")
+                _memory_instance = RedisChatMemory(
+                    redis_url=settings.REDIS_URL,
+                    ttl_seconds=getattr(settings, "CHAT_MEMORY_TTL_SECONDS", 86400),
+                    namespace=getattr(settings, "CHAT_MEMORY_NAMESPACE", "chat_mem:"),
+                    max_messages=settings.CHAT_MEMORY_MAX_MESSAGES
+                )
+            else:
+                _memory_instance = InMemoryChatMemory(
+                    ttl_seconds=settings.CHAT_MEMORY_TTL_SECONDS,
+                    max_messages=settings.CHAT_MEMORY_MAX_MESSAGES,
+                    max_conversations=settings.CHAT_MEMORY_MAX_CONVERSATIONS,
+                    max_total_chars=settings.CHAT_MEMORY_MAX_TOTAL_CHARS
+                )
+            logger.info("Using %s chat memory", settings.CHAT_MEMORY_BACKEND)
+    return _memory_instance
+
+def get_answer_cache() -> Optional[BaseAnswerCache]:
+    """Singleton provider for the semantic answer cache (None when disabled)"""
+    global _answer_cache
+    settings = get_settings()
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    if _answer_cache is not None:
+        return _answer_cache
+
+    with _services_lock:
+        if _answer_cache is None:
+            if settings.ANSWER_CACHE_BACKEND == "redis":
+                if not settings.REDIS_URL:
+                    raise RuntimeError("REDIS_URL is required for RedisAnswerCache")
+                _answer_cache = RedisAnswerCache(
+                    redis_url=settings.REDIS_URL,
+                    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+                    namespace=settings.ANSWER_CACHE_NAMESPACE
+                )
+            else:
+                _answer_cache = InMemoryAnswerCache(
+                    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS
+                )
+            # Any write to a collection makes its cached answers stale
+            VectorStoreService.add_write_listener(_answer_cache.invalidate_collection)
+    return _answer_cache
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """Singleton provider for the cross-encoder reranker (None when disabled)"""
+    global _reranker
+    settings = get_settings()
+    if not settings.RERANKER_ENABLED:
+        return None
+    if _reranker is None:
+        with _services_lock:
+            if _reranker is None:
+                budget_ms = settings.RERANK_LATENCY_BUDGET_MS
+                _reranker = CrossEncoderReranker(
+                    model_name=settings.RERANKER_MODEL,
+                    batch_size=settings.RERANK_BATCH_SIZE,
+                    budget_seconds=budget_ms / 1000 if budget_ms else None,
+                    cache_size=settings.RERANK_SCORE_CACHE_SIZE
+                )
+    return _reranker
+
+def get_summarizer() -> Optional[ConversationSummarizer]:
+    """Singleton provider for conversation summarization (None when disabled)"""
+    global _summarizer
+    settings = get_settings()
+    if not settings.CHAT_SUMMARY_ENABLED:
+        return None
+    if _summarizer is None:
+        llm_service = get_llm_service()
+        with _services_lock:
+            if _summarizer is None:
+                _summarizer = ConversationSummarizer(
+                    llm=llm_service.llm,
+                    token_counter=TokenCounter(settings.GEMINI_MODEL),
+                    trigger_tokens=settings.CHAT_SUMMARY_TRIGGER_TOKENS,
+                    keep_messages=settings.CHAT_HISTORY_MESSAGES,
+                    max_summary_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+                    llm_stage=get_stage_executor("llm")
+                )
+    return _summarizer
+
+def get_llm_service() -> LLMService:
+    """Process-wide LLMService holding the agent executor pool"""
+    global _llm_service
+    if _llm_service is None:
+        with _services_lock:
+            if _llm_service is None:
+                _llm_service = LLMService()
+    return _llm_service
+
+def get_vector_store_service() -> VectorStoreService:
+    """Process-wide VectorStoreService; collections are opened at startup"""
+    global _vector_store_service
+    if _vector_store_service is None:
+        with _services_lock:
+            if _vector_store_service is None:
+                _vector_store_service = VectorStoreService()
+                _vector_store_service.warm_up()
+    return _vector_store_service
 
-    _memory_instance = RedisChatMemory(
-        redis_url=settings.REDIS_URL,
-        ttl_seconds=getattr(settings, "CHAT_MEMORY_TTL_SECONDS", 86400),
-        namespace=getattr(settings, "CHAT_MEMORY_NAMESPACE", "chat_mem:")
+def _run_ingestion_job(job: Dict, progress: Callable[..., None]) -> None:
+    """Worker-side handler indexing the spooled upload of a job"""
+    controller = DocumentController(vector_store_service=get_vector_store_service())
+    options = job.get("options") or {}
+    if options.get("files") is not None:
+        _run_bulk_job(controller, job, progress)
+        return
+    upload_path = get_ingestion_queue().upload_path(job["job_id"])
+    controller.index_pdf_file(
+        file_path=upload_path,
+        filename=job["filename"],
+        collection_name=job["collection_name"],
+        chunk_size=options.get("chunk_size"),
+        chunk_overlap=options.get("chunk_overlap"),
+        progress_callback=progress
     )
-    return _memory_instance
+    controller.keep_original(upload_path, job["collection_name"], job["filename"])
+
+def _run_bulk_job(controller: DocumentController, job: Dict, progress: Callable[..., None]) -> None:
+    """Index the spooled files of a bulk job; files that fail to parse are listed in the job error"""
+    options = job["options"]
+    upload_dir = get_ingestion_queue().upload_dir(job["job_id"])
+    result = controller.index_bulk(
+        [(os.path.join(upload_dir, str(index)), name) for index, name in enumerate(options["files"])],
+        collection_name=job["collection_name"],
+        chunk_size=options.get("chunk_size"),
+        chunk_overlap=options.get("chunk_overlap"),
+        progress_callback=progress
+    )
+    if result["errors"]:
+        progress(error="; ".join(f"{e['filename']}: {e['error']}" for e in result["errors"]))
+
+def get_ingestion_queue() -> IngestionJobQueue:
+    """Singleton provider for the background ingestion queue"""
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        with _services_lock:
+            if _ingestion_queue is None:
+                settings = get_settings()
+                _ingestion_queue = IngestionJobQueue(
+                    handler=_run_ingestion_job,
+                    job_dir=settings.INGESTION_JOB_DIR,
+                    workers=settings.INGESTION_WORKERS,
+                    max_queued=settings.INGESTION_QUEUE_SIZE,
+                    finished_ttl_seconds=settings.INGESTION_JOB_TTL_SECONDS,
+                    max_finished=settings.INGESTION_MAX_FINISHED_JOBS
+                )
+                _ingestion_queue.start()
+    return _ingestion_queue
+
+def init_services() -> None:
+    """Warm up shared services at application startup"""
+    for provider in (get_vector_store_service, get_answer_cache, get_reranker, get_ingestion_queue, get_llm_service):
+        try:
+            provider()
+        except Exception as e:
+            # Startup should not fail on a transient model/LangSmith error;
+            # the first request will retry the initialization.
+            logger.warning("Warm-up of %s failed, will retry lazily: %s", provider.__name__, e)
 
-def get_document_controller() -> DocumentController:
-    return DocumentController()
+async def drain_summarizer() -> None:
+    """Let running conversation compactions finish before shutdown"""
+    if _summarizer is not None:
+        await _summarizer.drain()
 
-def get_query_controller(memory_service: BaseChatMemory = Depends(get_chat_memory)) -> QueryController:
-    """Inject chat memory into QueryController"""
-    return QueryController(memory_service=memory_service)
\ No newline at end of file
+def cache_stats() -> Dict[str, Optional[Dict]]:
+    """Hit/miss counters of the caches held by services created so far"""
+    stats: Dict[str, Optional[Dict]] = {}
+    if _answer_cache is not None:
+        stats["answer"] = _answer_cache.stats()
+    if EmbeddingsService._instance is not None:
+        stats["query_embedding"] = EmbeddingsService._instance.cache_stats()
+    if _vector_store_service is not None:
+        stats["retrieval"] = _vector_store_service.cache_stats()
+    if _reranker is not None:
+        stats["rerank_scores"] = _reranker.stats()["score_cache"]
+    if _llm_service is not None:
+        for name, tool_stats in _llm_service.tool_cache_stats().items():
+            stats[f"tool_{name}"] = tool_stats
+    return stats
+
+def shutdown_services() -> None:
+    """Release shared services at application shutdown"""
+    global _llm_service, _vector_store_service, _ingestion_queue
+    with _services_lock:
+        if _ingestion_queue is not None:
+            _ingestion_queue.stop()
+        _ingestion_queue = None
+        EmbeddingsService.shutdown()
+        _llm_service = None
+        _vector_store_service = None
+
+def get_document_controller(
+    vector_store_service: VectorStoreService = Depends(get_vector_store_service),
+    job_queue: IngestionJobQueue = Depends(get_ingestion_queue)
+) -> DocumentController:
+    return DocumentController(vector_store_service=vector_store_service, job_queue=job_queue)
+
+def get_query_controller(
+    memory_service: BaseChatMemory = Depends(get_chat_memory),
+    llm_service: LLMService = Depends(get_llm_service),
+    vector_store_service: VectorStoreService = Depends(get_vector_store_service),
+    answer_cache: Optional[BaseAnswerCache] = Depends(get_answer_cache),
+    reranker: Optional[CrossEncoderReranker] = Depends(get_reranker),
+    summarizer: Optional[ConversationSummarizer] = Depends(get_summarizer)
+) -> QueryController:
+    """Inject chat memory and shared services into QueryController"""
+    return QueryController(
+        memory_service=memory_service,
+        llm_service=llm_service,
+        vector_store_service=vector_store_service,
+        answer_cache=answer_cache,
+        reranker=reranker,
+        summarizer=summarizer
+    )
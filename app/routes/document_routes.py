@@ -1,26 +1,200 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from typing import Dict
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
 from app.controllers.document_controller import DocumentController
 from app.routes.dependencies import get_document_controller
-from app.models.response_models import UploadResponse
-from app.config.exceptions import RAGException
-from app.config.logger import logger 
+from app.models.response_models import DocumentDeleteResponse, IngestionJobResponse
+from app.config.config import get_settings
+from app.config.exceptions import (
+    DocumentNotFoundError, FileTooLargeError, IngestionQueueFullError, RAGException
+)
+from app.config.logger import logger
+from app.services.upload_service import MultipartFileStream
 router = APIRouter(prefix="/documents", tags=["documents"])
 
-@router.post("/upload", response_model=UploadResponse)
+# Allowance for multipart boundaries and part headers around the file body
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+def upload_limits() -> Dict[str, int]:
+    """Largest accepted request body per upload route"""
+    settings = get_settings()
+    return {
+        "/documents/upload": settings.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/documents/bulk": settings.BULK_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    }
+
+class UploadLimitMiddleware:
+    """
+    Enforces the upload size limits before the route parses the multipart
+    form. A declared Content-Length over the limit is rejected without
+    reading the body; otherwise the body is counted as it arrives and the
+    request fails with 413 as soon as it passes the limit, so chunked or
+    misdeclared uploads are not spooled in full either.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = upload_limits().get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds the maximum size of {limit - MULTIPART_OVERHEAD_BYTES} bytes"
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+def _multipart_body(field: str, many: bool) -> Dict:
+    """OpenAPI request body of a route that streams its multipart form itself"""
+    file_schema = {"type": "string", "format": "binary"}
+    schema = {"type": "array", "items": file_schema} if many else file_schema
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {
+        "schema": {"type": "object", "properties": {field: schema}, "required": [field]}
+    }}}}
+
+async def _first_file(uploads: MultipartFileStream):
+    async for upload, filename in uploads:
+        return upload, filename
+    raise HTTPException(status_code=400, detail="No file was uploaded")
+
+@router.post(
+    "/upload",
+    response_model=IngestionJobResponse,
+    status_code=202,
+    openapi_extra=_multipart_body("file", many=False)
+)
 async def upload_document(
-    file: UploadFile = File(...),
+    request: Request,
     controller: DocumentController = Depends(get_document_controller)
 ):
-    """Upload and index a PDF document"""
+    """Upload a PDF document and queue it for indexing.
+
+    The multipart body is parsed as it arrives and the file written straight
+    to the job's spool file.
+    """
+    filename = None
     try:
-        content = await file.read()
-        result = await controller.process_and_index_pdf(content, file.filename)
-        logger.info(f"Successfully processed and indexed file: {file.filename}")
+        uploads = MultipartFileStream(request.stream(), request.headers.get("content-type", ""), "file")
+        file, filename = await _first_file(uploads)
+        result = await controller.submit_pdf(file, filename)
+        logger.info(f"Queued file for indexing: {filename} (job {result.job_id})")
         return result
-    
+
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        logger.warning(f"Rejected oversized upload '{filename}': {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except IngestionQueueFullError as e:
+        logger.warning(f"Ingestion queue full, rejecting '{filename}': {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except RAGException as e:
+        logger.warning(f"RAGException during file upload '{filename}': {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected error while processing '{filename}': {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post(
+    "/bulk",
+    response_model=IngestionJobResponse,
+    status_code=202,
+    openapi_extra=_multipart_body("files", many=True)
+)
+async def upload_documents_bulk(
+    request: Request,
+    controller: DocumentController = Depends(get_document_controller)
+):
+    """Upload several PDFs, or zip/tar archives of PDFs, and queue them as one ingestion job"""
+    try:
+        uploads = MultipartFileStream(request.stream(), request.headers.get("content-type", ""), "files")
+        result = await controller.submit_bulk(uploads)
+        logger.info(f"Queued files for bulk indexing: {result.filename} (job {result.job_id})")
+        return result
+
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        logger.warning(f"Rejected oversized bulk upload: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except IngestionQueueFullError as e:
+        logger.warning(f"Ingestion queue full, rejecting bulk upload: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except RAGException as e:
+        logger.warning(f"RAGException during bulk upload: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected error during bulk upload: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
+    controller: DocumentController = Depends(get_document_controller)
+):
+    """Status and progress of an ingestion job"""
+    job = controller.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job '{job_id}' not found")
+    return job
+
+@router.post("/{filename}/reindex", response_model=IngestionJobResponse, status_code=202)
+async def reindex_document(
+    filename: str,
+    controller: DocumentController = Depends(get_document_controller)
+):
+    """Queue a stored document for re-indexing; only changed chunks are embedded"""
+    try:
+        result = await controller.reindex_document(filename)
+        logger.info(f"Queued re-index of {filename} (job {result.job_id})")
+        return result
+
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except IngestionQueueFullError as e:
+        logger.warning(f"Ingestion queue full, rejecting re-index of '{filename}': {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except RAGException as e:
+        logger.warning(f"RAGException during re-index of '{filename}': {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected error while re-indexing '{filename}': {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.delete("/{filename}", response_model=DocumentDeleteResponse)
+async def delete_document(
+    filename: str,
+    controller: DocumentController = Depends(get_document_controller)
+):
+    """Remove a document's chunks from the index along with its stored original"""
+    try:
+        result = await run_in_threadpool(controller.delete_document, filename)
+        logger.info(f"Deleted {result.chunks_deleted} chunks of {filename}")
+        return result
+
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except RAGException as e:
-        logger.warning(f"RAGException during file upload '{file.filename}': {e}")
+        logger.warning(f"RAGException while deleting '{filename}': {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.exception(f"Unexpected error while processing '{file.filename}': {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
+        logger.exception(f"Unexpected error while deleting '{filename}': {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
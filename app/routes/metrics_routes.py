@@ -0,0 +1,50 @@
+"""Prometheus scrape endpoint and HTTP request metrics"""
+
+import time
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.services.metrics import HTTP_IN_FLIGHT, HTTP_SECONDS
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Current metrics in the Prometheus text format"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """
+    Times HTTP requests until the last body chunk is sent, so streamed
+    responses are measured end to end. Requests are labelled with the route
+    template (``/documents/jobs/{job_id}``), not the raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        with HTTP_IN_FLIGHT.track_inprogress():
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                HTTP_SECONDS.labels(
+                    method=scope["method"],
+                    route=getattr(route, "path", "unmatched"),
+                    status=status
+                ).observe(time.perf_counter() - start)
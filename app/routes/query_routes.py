@@ -1,11 +1,23 @@
 """Routes for query operations"""
 
+import json
+from typing import AsyncIterator, Optional
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from app.controllers.query_controller import QueryController
-from app.routes.dependencies import get_query_controller
-from app.models.request_models import QuestionRequest
+from app.routes.dependencies import (
+    get_answer_cache, get_llm_service, get_query_controller, get_reranker, get_summarizer, get_vector_store_service
+)
+from app.services.ai.conversation_summarizer import ConversationSummarizer
+from app.services.ai.embeddings_service import EmbeddingsService
+from app.services.ai.llm_service import LLMService
+from app.services.ai.reranker_service import CrossEncoderReranker
+from app.services.answer_cache_service import BaseAnswerCache
+from app.services.vector_store_service import VectorStoreService
+from app.models.request_models import BatchQuestionRequest, QuestionRequest
+from app.config.config import get_settings
 from app.models.response_models import QueryResponse
-from app.config.exceptions import RAGException
+from app.config.exceptions import CollectionNotFoundError, RAGException
 from app.config.logger import logger
 router = APIRouter(prefix="/query", tags=["query"])
 
@@ -21,14 +33,120 @@ async def query_documents(
             top_k=request.top_k,
             collection_name=request.collection_name,
             conversation_id=request.conversation_id,
-            use_memory=request.use_memory  
+            use_memory=request.use_memory,
+            min_score=request.min_score
         )
         logger.info(f"Query executed successfully for: '{request.question}'")
         return result
     
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except RAGException as e:
         logger.warning(f"RAGException during query '{request.question}': {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception(f"Unexpected error during query '{request.question}': {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+async def _require_collection(controller: QueryController, collection_name: Optional[str]) -> None:
+    """404 for an unknown collection while a status code can still be sent"""
+    try:
+        await controller.check_collection(collection_name)
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RAGException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _format_sse(event: str, data) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/stream")
+async def stream_query(
+    request: QuestionRequest,
+    controller: QueryController = Depends(get_query_controller)
+):
+    """Stream the answer as Server-Sent Events (step, token, sources, done)"""
+    await _require_collection(controller, request.collection_name)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in controller.stream_query(
+                question=request.question,
+                top_k=request.top_k,
+                collection_name=request.collection_name,
+                conversation_id=request.conversation_id,
+                use_memory=request.use_memory,
+                min_score=request.min_score
+            ):
+                yield _format_sse(event["event"], event["data"])
+            logger.info(f"Streamed query successfully for: '{request.question}'")
+
+        except RAGException as e:
+            logger.warning(f"RAGException during streamed query '{request.question}': {e}")
+            yield _format_sse("error", {"detail": str(e)})
+        except Exception as e:
+            logger.exception(f"Unexpected error during streamed query '{request.question}': {e}")
+            yield _format_sse("error", {"detail": f"Internal server error: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/batch")
+async def batch_query(
+    request: BatchQuestionRequest,
+    controller: QueryController = Depends(get_query_controller)
+):
+    """Answer many questions, streaming one JSON object per line as each answer completes"""
+    max_questions = get_settings().BATCH_MAX_QUESTIONS
+    if len(request.questions) > max_questions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(request.questions)} questions, the limit is {max_questions}"
+        )
+    await _require_collection(controller, request.collection_name)
+
+    async def item_stream() -> AsyncIterator[str]:
+        try:
+            async for item in controller.batch_query(
+                questions=request.questions,
+                top_k=request.top_k,
+                collection_name=request.collection_name,
+                min_score=request.min_score
+            ):
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+            logger.info(f"Batch of {len(request.questions)} questions answered")
+        except Exception as e:
+            logger.exception(f"Unexpected error during batch query: {e}")
+            yield json.dumps({"error": f"Internal server error: {str(e)}"}) + "\n"
+
+    return StreamingResponse(
+        item_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats")
+async def query_stats(
+    answer_cache: Optional[BaseAnswerCache] = Depends(get_answer_cache),
+    vector_store_service: VectorStoreService = Depends(get_vector_store_service),
+    reranker: Optional[CrossEncoderReranker] = Depends(get_reranker),
+    llm_service: LLMService = Depends(get_llm_service),
+    summarizer: Optional[ConversationSummarizer] = Depends(get_summarizer)
+):
+    """Cache sizes and hit/miss counters for the query pipeline"""
+    return {
+        "answer_cache": answer_cache.stats() if answer_cache else None,
+        "query_embedding_cache": EmbeddingsService().cache_stats(),
+        "embeddings": EmbeddingsService().engine_stats(),
+        "retrieval_cache": vector_store_service.cache_stats(),
+        "collections": vector_store_service.collection_stats(),
+        "reranker": reranker.stats() if reranker else None,
+        "routing": llm_service.router.stats(),
+        "tool_cache": llm_service.tool_cache_stats(),
+        "tools": llm_service.tool_executor.stats(),
+        "summarizer": summarizer.stats() if summarizer else None,
+    }
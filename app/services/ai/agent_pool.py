@@ -0,0 +1,75 @@
+"""Thread-safe pool of ready agent executors"""
+
+import asyncio
+import queue
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, Tuple
+from langchain_classic.agents import AgentExecutor
+from app.config.exceptions import LLMError
+from app.config.logger import logger
+
+
+class AgentExecutorPool:
+    """Keeps a fixed number of prebuilt AgentExecutor instances and hands them
+    out to one async caller at a time."""
+
+    def __init__(
+        self,
+        factory: Callable[[], AgentExecutor],
+        size: int,
+        acquire_timeout: Optional[float] = None
+    ):
+        if size < 1:
+            raise ValueError("Agent pool size must be at least 1")
+
+        self._executors: "queue.Queue[AgentExecutor]" = queue.Queue(maxsize=size)
+        self._size = size
+        self._acquire_timeout = acquire_timeout
+        self._async_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        for _ in range(size):
+            self._executors.put(factory())
+        logger.info("AgentExecutorPool created with %d executors", size)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def available(self) -> int:
+        return self._executors.qsize()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop; rebuild for a new one
+        loop = asyncio.get_running_loop()
+        if self._async_slots is None or self._async_slots[0] is not loop:
+            self._async_slots = (loop, asyncio.Semaphore(self._size))
+        return self._async_slots[1]
+
+    @asynccontextmanager
+    async def acquire_async(self) -> AsyncIterator[AgentExecutor]:
+        """Borrow an executor from async code without blocking the event loop.
+
+        Callers wait on a semaphore sized to the pool, so a returned executor
+        wakes the next waiter immediately, and holding a slot guarantees an
+        executor is free. Nothing is taken from the pool until then, so a
+        cancelled waiter cannot strand an executor.
+        """
+        slots = self._semaphore()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self._acquire_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("No agent executor became available within %s seconds", self._acquire_timeout)
+            raise LLMError("All agent executors are busy, please retry shortly")
+
+        try:
+            try:
+                executor = self._executors.get_nowait()
+            except queue.Empty:
+                # Only when another event loop holds executors of this pool
+                raise LLMError("All agent executors are busy, please retry shortly")
+            try:
+                yield executor
+            finally:
+                self._executors.put(executor)
+        finally:
+            slots.release()
@@ -1,10 +1,32 @@
 """Service for text chunking strategies"""
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List
+from typing import Iterable, Iterator, List
 from langchain_core.documents import Document
 
 class ChunkingService:
+    @staticmethod
+    def _splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""],
+            # Offsets within the page let the context assembler merge overlapping chunks
+            add_start_index=True
+        )
+
+    @staticmethod
+    def chunk_stream(
+        documents: Iterable[Document],
+        chunk_size: int = 500,
+        chunk_overlap: int = 100
+    ) -> Iterator[Document]:
+        """Split documents one at a time, yielding chunks as soon as each page is available"""
+        text_splitter = ChunkingService._splitter(chunk_size, chunk_overlap)
+        for document in documents:
+            yield from text_splitter.split_documents([document])
+
     @staticmethod
     def chunk_documents(
         documents: List[Document],
@@ -12,10 +34,5 @@ class ChunkingService:
         chunk_overlap: int = 100
     ) -> List[Document]:
         """Split documents into chunks"""
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        text_splitter = ChunkingService._splitter(chunk_size, chunk_overlap)
         return text_splitter.split_documents(documents)
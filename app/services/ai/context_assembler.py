@@ -0,0 +1,239 @@
+"""Token-budgeted assembly of retrieved chunks into LLM context"""
+
+import re
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from langchain_core.documents import Document
+from app.config.logger import logger
+
+# Shortest shared text treated as overlap between chunks without start offsets
+_MIN_OVERLAP_CHARS = 20
+
+
+class TokenCounter:
+    """
+    Counts tokens with the Gemini model's local tokenizer (google-genai),
+    falling back to a characters-per-token estimate when it is unavailable.
+    """
+
+    # One shared instance per model, so each tokenizer is loaded once
+    _instances: Dict[str, "TokenCounter"] = {}
+    _instances_lock = threading.Lock()
+    CHARS_PER_TOKEN = 4
+
+    def __new__(cls, model_name: str):
+        with cls._instances_lock:
+            instance = cls._instances.get(model_name)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._model_name = model_name
+                instance._tokenizer = None
+                instance._loaded = False
+                instance._lock = threading.Lock()
+                cls._instances[model_name] = instance
+            return instance
+
+    def _load(self):
+        with self._lock:
+            if not self._loaded:
+                try:
+                    from google.genai.local_tokenizer import LocalTokenizer
+                    self._tokenizer = LocalTokenizer(model_name=self._model_name)
+                    logger.info(f"Using local tokenizer for {self._model_name}")
+                except Exception as e:
+                    logger.warning(f"Local tokenizer unavailable, estimating tokens from characters: {e}")
+                self._loaded = True
+        return self._tokenizer
+
+    @property
+    def exact(self) -> bool:
+        return self._load() is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokenizer = self._load()
+        if tokenizer is None:
+            return -(-len(text) // self.CHARS_PER_TOKEN)
+        return tokenizer.count_tokens(text).total_tokens
+
+
+def _shingles(text: str, size: int = 3) -> FrozenSet[Tuple[str, ...]]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return frozenset([tuple(words)])
+    return frozenset(tuple(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def _jaccard(a: FrozenSet, b: FrozenSet) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _overlap_length(head: str, tail: str, max_chars: int) -> int:
+    """Length of the longest suffix of ``head`` that starts ``tail``"""
+    for length in range(min(len(head), len(tail), max_chars), _MIN_OVERLAP_CHARS - 1, -1):
+        if head.endswith(tail[:length]):
+            return length
+    return 0
+
+
+class _Block:
+    """Contiguous text from one page, built from one or more chunks"""
+
+    def __init__(self, doc: Document, score: float, rank: int):
+        self.source = doc.metadata.get("source")
+        self.page = doc.metadata.get("page")
+        self.start = doc.metadata.get("start_index")
+        self.text = doc.page_content
+        self.score = score
+        self.rank = rank
+        self.chunks = 1
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+    def absorb(self, other: "_Block", max_overlap: int) -> bool:
+        """Merge ``other`` into this block if the two overlap or touch; returns whether they did"""
+        if self.start is not None and other.start is not None:
+            first, second = (self, other) if self.start <= other.start else (other, self)
+            if second.start > first.end:
+                return False
+            text = first.text + second.text[first.end - second.start:] if second.end > first.end else first.text
+            start = first.start
+        elif other.text in self.text:
+            text, start = self.text, self.start
+        elif self.text in other.text:
+            text, start = other.text, other.start
+        else:
+            # Chunks indexed without offsets: look for the splitter's overlap in either order
+            forward = _overlap_length(self.text, other.text, max_overlap)
+            backward = 0 if forward else _overlap_length(other.text, self.text, max_overlap)
+            if forward:
+                text = self.text + other.text[forward:]
+            elif backward:
+                text = other.text + self.text[backward:]
+            else:
+                return False
+            start = None
+
+        self.text, self.start = text, start
+        self.score = max(self.score, other.score)
+        self.rank = min(self.rank, other.rank)
+        self.chunks += other.chunks
+        return True
+
+    def render(self, text: Optional[str] = None) -> str:
+        label = self.source or "document"
+        if isinstance(self.page, int):
+            label = f"{label}, page {self.page + 1}"
+        return f"[{label}]\n{text if text is not None else self.text}"
+
+
+class ContextAssembler:
+    """
+    Turns ranked (chunk, relevance) pairs into a prompt context that fits a
+    token budget: chunks that overlap or touch on the same page are merged,
+    near-duplicate passages are dropped, blocks are optionally reordered
+    with maximal marginal relevance, and blocks are packed best-first, the
+    last one truncated to the remaining budget.
+    """
+
+    def __init__(
+        self,
+        token_counter: TokenCounter,
+        token_budget: int,
+        max_overlap_chars: int = 200,
+        duplicate_threshold: float = 0.9,
+        mmr_lambda: Optional[float] = None
+    ):
+        self.token_counter = token_counter
+        self.token_budget = token_budget
+        self.max_overlap_chars = max_overlap_chars
+        self.duplicate_threshold = duplicate_threshold
+        self.mmr_lambda = mmr_lambda
+
+    def _merge(self, scored: List[Tuple[Document, float]]) -> List[_Block]:
+        pages: Dict[Tuple, List[_Block]] = {}
+        for rank, (doc, score) in enumerate(scored):
+            block = _Block(doc, score, rank)
+            pages.setdefault((block.source, block.page), []).append(block)
+
+        merged = []
+        for blocks in pages.values():
+            blocks.sort(key=lambda block: (block.start is None, block.start or 0, block.rank))
+            # Repeat until stable: a merged block can bridge two that did not touch before
+            changed = True
+            while changed and len(blocks) > 1:
+                changed = False
+                result: List[_Block] = []
+                for block in blocks:
+                    if any(existing.absorb(block, self.max_overlap_chars) for existing in result):
+                        changed = True
+                    else:
+                        result.append(block)
+                blocks = result
+            merged.extend(blocks)
+        merged.sort(key=lambda block: block.rank)
+        return merged
+
+    def _select(self, blocks: List[_Block]) -> List[_Block]:
+        """Drop near-duplicates and, with MMR enabled, order for diversity"""
+        shingles = [_shingles(block.text) for block in blocks]
+        remaining = list(range(len(blocks)))
+        selected: List[int] = []
+        while remaining:
+            if self.mmr_lambda is None:
+                best = remaining[0]
+            else:
+                best = max(remaining, key=lambda i: self.mmr_lambda * blocks[i].score - (1 - self.mmr_lambda) * max(
+                    (_jaccard(shingles[i], shingles[j]) for j in selected), default=0.0
+                ))
+            remaining.remove(best)
+            if any(_jaccard(shingles[best], shingles[j]) >= self.duplicate_threshold for j in selected):
+                continue
+            selected.append(best)
+        return [blocks[i] for i in selected]
+
+    def _truncate(self, block: _Block, budget: int) -> Optional[str]:
+        """Longest prefix of the block, cut at a word boundary, that renders within ``budget`` tokens"""
+        low, high, best = 0, len(block.text), None
+        while low <= high:
+            middle = (low + high) // 2
+            cut = block.text[:middle].rsplit(" ", 1)[0] if middle < len(block.text) else block.text
+            if self.token_counter.count(block.render(cut)) <= budget:
+                best, low = cut, middle + 1
+            else:
+                high = middle - 1
+        return best if best and best.strip() else None
+
+    def assemble(self, scored: List[Tuple[Document, float]]) -> str:
+        """Context text for chunks given in ranked order with their relevance scores"""
+        if not scored:
+            return ""
+        blocks = self._select(self._merge(scored))
+
+        parts, used = [], 0
+        separator_tokens = self.token_counter.count("\n\n")
+        for block in blocks:
+            remaining = self.token_budget - used - (separator_tokens if parts else 0)
+            if remaining <= 0:
+                break
+            rendered = block.render()
+            tokens = self.token_counter.count(rendered)
+            if tokens > remaining:
+                text = self._truncate(block, remaining)
+                if text:
+                    parts.append(block.render(text))
+                    used += self.token_counter.count(parts[-1])
+                break
+            parts.append(rendered)
+            used += tokens + (separator_tokens if len(parts) > 1 else 0)
+
+        logger.info(
+            "Assembled context from %d chunks into %d blocks, %d tokens (budget %d)",
+            len(scored), len(parts), used, self.token_budget
+        )
+        return "\n\n".join(parts)
@@ -0,0 +1,144 @@
+"""Background folding of old chat turns into a running summary"""
+
+import asyncio
+from typing import Dict, List, Optional
+from app.config.logger import logger
+from app.services.ai.context_assembler import TokenCounter
+from app.services.chat_memory_service import BaseChatMemory
+from app.services.stage_executor import StageExecutor
+
+_SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant "
+    "about their documents. Update the summary with the new messages below. Keep facts, "
+    "names, numbers, part codes and open questions the user may refer back to; drop "
+    "greetings and repetition. Write plain prose of at most {max_words} words.\n\n"
+    "Current summary:\n{summary}\n\n"
+    "New messages:\n{messages}\n\n"
+    "Updated summary:"
+)
+
+
+class ConversationSummarizer:
+    """
+    Keeps long conversations within a bounded prompt size. Unfolded messages
+    build up until there are more than twice ``keep_messages`` of them or
+    they exceed ``trigger_tokens``; one LLM call then folds the oldest into
+    the conversation's running summary, down to the newest ``keep_messages``
+    and half of ``trigger_tokens``. Folding in batches like this costs one
+    call every few turns rather than one per turn. Compaction runs as a
+    background task after a turn is saved, at most one per conversation at
+    a time, under the LLM stage limit when ``llm_stage`` is given.
+    """
+
+    def __init__(
+        self,
+        llm,
+        token_counter: TokenCounter,
+        trigger_tokens: int = 2000,
+        keep_messages: int = 6,
+        max_summary_tokens: int = 300,
+        llm_stage: Optional[StageExecutor] = None
+    ):
+        self.llm = llm
+        self.token_counter = token_counter
+        self.trigger_tokens = trigger_tokens
+        self.keep_messages = keep_messages
+        self.max_summary_tokens = max_summary_tokens
+        self.llm_stage = llm_stage
+        self._running: Dict[str, asyncio.Task] = {}
+        self._compactions = 0
+        self._folded = 0
+        self._failures = 0
+
+    def _tokens(self, messages: List[Dict]) -> int:
+        return sum(self.token_counter.count(message.get("text", "")) for message in messages)
+
+    @property
+    def max_messages(self) -> int:
+        """Most unfolded messages a conversation holds, all of which belong in the prompt"""
+        return 2 * self.keep_messages
+
+    def _fold_count(self, messages: List[Dict]) -> int:
+        """How many of the oldest messages to fold; none until the high-water mark is passed"""
+        if len(messages) <= self.max_messages and self._tokens(messages) <= self.trigger_tokens:
+            return 0
+        folded = max(0, len(messages) - self.keep_messages)
+        # Always keep the newest turn verbatim
+        while len(messages) - folded > 2 and self._tokens(messages[folded:]) > self.trigger_tokens // 2:
+            folded += 1
+        return folded
+
+    def schedule(self, memory: BaseChatMemory, conversation_id: str) -> Optional[asyncio.Task]:
+        """Start a compaction check for the conversation unless one is already running"""
+        if conversation_id in self._running:
+            return None
+        task = asyncio.create_task(self._run(memory, conversation_id))
+        self._running[conversation_id] = task
+        task.add_done_callback(lambda _: self._running.pop(conversation_id, None))
+        return task
+
+    async def _run(self, memory: BaseChatMemory, conversation_id: str) -> None:
+        try:
+            await self.compact(memory, conversation_id)
+        except Exception as e:
+            self._failures += 1
+            logger.warning("Summarizing conversation %s failed: %s", conversation_id, e)
+
+    async def compact(self, memory: BaseChatMemory, conversation_id: str) -> bool:
+        """Fold the messages that no longer fit the prompt window into the summary"""
+        summary, messages = await memory.get_history(conversation_id)
+        count = self._fold_count(messages)
+        if not count:
+            return False
+
+        folded = messages[:count]
+        prompt = _SUMMARY_PROMPT.format(
+            max_words=int(self.max_summary_tokens * 0.75),
+            summary=summary or "(none)",
+            messages="\n".join(f"{m.get('role', 'user').capitalize()}: {m.get('text', '')}" for m in folded),
+        )
+        if self.llm_stage:
+            response = await self.llm_stage.run_async(self.llm.ainvoke, prompt)
+        else:
+            response = await self.llm.ainvoke(prompt)
+        content = getattr(response, "content", response)
+        new_summary = content if isinstance(content, str) else "".join(
+            part if isinstance(part, str) else part.get("text", "") for part in content
+        )
+        new_summary = self._clip(new_summary.strip())
+
+        await memory.compact(conversation_id, new_summary, len(folded))
+        self._compactions += 1
+        self._folded += len(folded)
+        logger.info(
+            "Folded %d messages of conversation %s into a %d-token summary",
+            len(folded), conversation_id, self.token_counter.count(new_summary)
+        )
+        return True
+
+    def _clip(self, text: str) -> str:
+        """Cut the summary at a word boundary so it stays within max_summary_tokens"""
+        if self.token_counter.count(text) <= self.max_summary_tokens:
+            return text
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.token_counter.count(" ".join(words[:middle])) <= self.max_summary_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low])
+
+    def stats(self) -> Dict:
+        return {
+            "compactions": self._compactions,
+            "messages_folded": self._folded,
+            "failures": self._failures,
+            "running": len(self._running),
+        }
+
+    async def drain(self) -> None:
+        """Wait for running compactions, e.g. at shutdown"""
+        if self._running:
+            await asyncio.gather(*list(self._running.values()), return_exceptions=True)
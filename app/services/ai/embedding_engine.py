@@ -0,0 +1,123 @@
+"""Sentence-transformers embedding engine with batching, a multi-process pool and ONNX backends"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from app.config.logger import logger
+
+# "onnx-int8" loads a dynamically quantized ONNX export of the same model
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class EmbeddingEngine(Embeddings):
+    """Embeddings backed by a SentenceTransformer with tunable throughput.
+
+    Document batches of at least ``pool_min_texts`` texts are spread over a
+    pool of ``workers`` encode processes; smaller batches, and every query,
+    are encoded in-process where the pool's IPC cost would dominate.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch",
+        batch_size: int = 64,
+        workers: int = 0,
+        pool_min_texts: int = 256,
+        onnx_file_name: Optional[str] = None,
+        normalize: bool = False
+    ):
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}', expected one of {', '.join(EMBEDDING_BACKENDS)}")
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = batch_size
+        self.workers = workers
+        self.pool_min_texts = pool_min_texts
+        self.normalize = normalize
+        self.model = self._load_model(model_name, backend, onnx_file_name)
+
+        self._pool: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._chunks_embedded = 0
+        self._seconds = 0.0
+
+    @staticmethod
+    def _load_model(model_name: str, backend: str, onnx_file_name: Optional[str]):
+        from sentence_transformers import SentenceTransformer
+
+        kwargs: Dict[str, Any] = {"device": "cpu"}
+        if backend == "torch":
+            kwargs["backend"] = "torch"
+        else:
+            kwargs["backend"] = "onnx"
+            if backend == "onnx-int8":
+                kwargs["model_kwargs"] = {"file_name": onnx_file_name}
+        try:
+            model = SentenceTransformer(model_name, **kwargs)
+        except ImportError as e:
+            raise RuntimeError(
+                f"Embedding backend '{backend}' needs extra packages: pip install 'sentence-transformers[onnx]' ({e})"
+            ) from e
+        logger.info(f"Loaded embedding model '{model_name}' with '{backend}' backend")
+        return model
+
+    def _get_pool(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._pool is None:
+                logger.info(f"Starting {self.workers} embedding worker processes")
+                self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+            return self._pool
+
+    def _encode(self, texts: List[str], pool: Optional[Dict[str, Any]] = None) -> List[List[float]]:
+        kwargs: Dict[str, Any] = {
+            "batch_size": self.batch_size,
+            "normalize_embeddings": self.normalize,
+            "show_progress_bar": False,
+        }
+        if pool is not None:
+            kwargs["pool"] = pool
+            kwargs["chunk_size"] = max(1, -(-len(texts) // self.workers))
+        return self.model.encode(texts, **kwargs).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        use_pool = self.workers > 1 and len(texts) >= self.pool_min_texts
+        start = time.perf_counter()
+        embeddings = self._encode(texts, pool=self._get_pool() if use_pool else None)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._chunks_embedded += len(texts)
+            self._seconds += elapsed
+        logger.debug(f"Embedded {len(texts)} chunks at {len(texts) / elapsed if elapsed else 0:.1f} chunks/sec")
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Encode queries in one batch without counting them as document throughput"""
+        return self._encode(texts) if texts else []
+
+    def stats(self) -> Dict:
+        """Backend settings and cumulative document throughput"""
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "backend": self.backend,
+                "batch_size": self.batch_size,
+                "workers": self.workers,
+                "chunks_embedded": self._chunks_embedded,
+                "seconds": round(self._seconds, 3),
+                "chunks_per_sec": round(self._chunks_embedded / self._seconds, 1) if self._seconds else None,
+            }
+
+    def close(self) -> None:
+        """Stop the encode worker processes, if they were started"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            self.model.stop_multi_process_pool(pool)
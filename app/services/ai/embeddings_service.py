@@ -1,20 +1,89 @@
 """Service for generating embeddings"""
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from typing import Dict, List
+from langchain_core.embeddings import Embeddings
 from app.config.config import get_settings
+from app.services.ai.embedding_engine import EmbeddingEngine
+from app.services.lru_cache import LRUCache
+from app.services.metrics import TEXTS_EMBEDDED, stage_timer
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different queries share cache entries"""
+    return " ".join(text.split())
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper keeping an LRU cache of query embeddings"""
+
+    def __init__(self, embeddings: EmbeddingEngine, cache_size: int):
+        self.embeddings = embeddings
+        self.query_cache = LRUCache(cache_size)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with stage_timer("embed_documents"):
+            embeddings = self.embeddings.embed_documents(texts)
+        TEXTS_EMBEDDED.labels(kind="document").inc(len(texts))
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            with stage_timer("embed_query"):
+                embedding = self.embeddings.embed_query(key)
+            TEXTS_EMBEDDED.labels(kind="query").inc()
+            self.query_cache.set(key, embedding)
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed many queries, encoding the uncached ones in a single batch"""
+        keys = [normalize_query(text) for text in texts]
+        found = {key: self.query_cache.get(key) for key in set(keys)}
+        missing = [key for key, embedding in found.items() if embedding is None]
+        if missing:
+            with stage_timer("embed_query"):
+                computed = self.embeddings.embed_queries(missing)
+            TEXTS_EMBEDDED.labels(kind="query").inc(len(missing))
+            for key, embedding in zip(missing, computed):
+                found[key] = embedding
+                self.query_cache.set(key, embedding)
+        return [found[key] for key in keys]
+
 
 class EmbeddingsService:
     _instance = None
-    embeddings: HuggingFaceEmbeddings
+    embeddings: CachedQueryEmbeddings
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             settings = get_settings()
-            cls._instance.embeddings = HuggingFaceEmbeddings(
-                model_name=settings.EMBEDDING_MODEL
+            engine = EmbeddingEngine(
+                settings.EMBEDDING_MODEL,
+                backend=settings.EMBEDDING_BACKEND,
+                batch_size=settings.EMBEDDING_BATCH_SIZE,
+                workers=settings.EMBEDDING_WORKERS,
+                pool_min_texts=settings.EMBEDDING_POOL_MIN_TEXTS,
+                onnx_file_name=settings.EMBEDDING_ONNX_FILE
+            )
+            cls._instance.embeddings = CachedQueryEmbeddings(
+                engine,
+                cache_size=settings.QUERY_EMBEDDING_CACHE_SIZE
             )
         return cls._instance
 
     def get_embeddings(self):
         return self.embeddings
+
+    def cache_stats(self) -> Dict:
+        return self.embeddings.query_cache.stats()
+
+    def engine_stats(self) -> Dict:
+        return self.embeddings.embeddings.stats()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop embedding worker processes if the service was created"""
+        if cls._instance is not None:
+            cls._instance.embeddings.embeddings.close()
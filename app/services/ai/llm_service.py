@@ -1,36 +1,49 @@
-from typing import List, Dict, Optional
-from langchain_community.tools import DuckDuckGoSearchResults
+import json
+import os
+import time
+from typing import AsyncIterator, List, Dict, Optional
 from langchain_classic.agents import AgentExecutor, create_react_agent
 from langsmith import Client
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.tools import tool
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import PromptTemplate
 from app.config.config import get_settings
 from app.services.tools.weather_tool import WeatherTool
 from app.config.exceptions import LLMError
 from app.services.tools.news_tool import NewsTool
-import ddgs
+from app.services.tools.search_tool import SearchTool
+from app.services.tools.tool_executor import ToolExecutor
 from langchain_community.tools import Tool
+from app.services.ai.agent_pool import AgentExecutorPool
+from app.services.ai.query_router import AGENT, DIRECT, ESCALATE_MARKER, QueryRouter
+from app.services.metrics import AGENT_ITERATIONS, ROUTES, STAGE_SECONDS, LLMMetricsCallback, stage_timer
 from app.config.logger import logger
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
 class LLMService:
     """LLMService manages all interactions with the underlying Large Language Model (Gemini)
-    and coordinates with LangChain tools and agent execution"""
-    def __init__(self):
+    and coordinates with LangChain tools and agent execution.
+
+    ``llm`` replaces the Gemini chat model, e.g. with a fake in benchmarks."""
+    def __init__(self, pool_size: Optional[int] = None, llm: Optional[BaseChatModel] = None):
         settings = get_settings()
+        self.settings = settings
         logger.info("Initializing LLMService with model: %s", settings.GEMINI_MODEL)
         try:
-            client = Client(api_key=settings.LANGSMITH_API_KEY)
-
-            self.llm = ChatGoogleGenerativeAI(
+            self.llm = llm or ChatGoogleGenerativeAI(
                 model=settings.GEMINI_MODEL,
                 google_api_key=settings.LLM_API_KEY,
                 temperature=0.7,
             )
+            # Every model call, including those of the agent and the summarizer, reports latency and tokens
+            self.llm.callbacks = [*(self.llm.callbacks or []), LLMMetricsCallback()]
 
             self.tools = self._create_tools()
             logger.info("Successfully initialized %d tools.", len(self.tools))
 
-            self.prompt_template = client.pull_prompt("hwchase17/react:d15fe3c4", include_model=True)
-            logger.debug("Pulled LangSmith prompt template successfully.")
+            self.prompt_template = self._load_react_prompt()
 
             self.agent = create_react_agent(
                 llm=self.llm,
@@ -38,101 +51,379 @@ class LLMService:
                 prompt=self.prompt_template,
             )
 
-            self.agent_executor = AgentExecutor(agent=self.agent, tools=self.tools, verbose=True)
-            logger.info("AgentExecutor successfully created.")
+            self.agent_pool = AgentExecutorPool(
+                factory=self._create_agent_executor,
+                size=pool_size or settings.AGENT_POOL_SIZE,
+                acquire_timeout=settings.AGENT_POOL_ACQUIRE_TIMEOUT_SECONDS,
+            )
+            logger.info("AgentExecutor pool successfully created.")
+
+            self.router = QueryRouter(enabled=settings.FAST_PATH_ENABLED)
 
         except Exception as e:
             logger.exception("Error initializing LLMService: %s", e)
             raise LLMError(f"Failed to initialize LLMService: {str(e)}")
 
+    def _create_agent_executor(self) -> AgentExecutor:
+        """Build one executor around the shared agent and tools."""
+        return AgentExecutor(
+            agent=self.agent,
+            tools=self.tools,
+            verbose=True,
+            max_execution_time=self.settings.AGENT_MAX_EXECUTION_SECONDS,
+        )
+
+    def _load_react_prompt(self) -> PromptTemplate:
+        """Load the ReAct prompt from the local cache, pulling it from LangSmith only once."""
+        cache_path = self.settings.REACT_PROMPT_CACHE_PATH
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("ref") == self.settings.REACT_PROMPT_REF:
+                logger.debug("Loaded ReAct prompt from local cache: %s", cache_path)
+                return PromptTemplate.from_template(cached["template"])
+            logger.info("Cached ReAct prompt is for %s, pulling %s", cached.get("ref"), self.settings.REACT_PROMPT_REF)
+
+        client = Client(api_key=self.settings.LANGSMITH_API_KEY)
+        prompt = client.pull_prompt(self.settings.REACT_PROMPT_REF, include_model=True)
+        logger.debug("Pulled LangSmith prompt template successfully.")
+
+        if not isinstance(prompt, PromptTemplate):
+            logger.warning("Pulled prompt is %s, not a PromptTemplate; skipping local cache", type(prompt).__name__)
+            return prompt
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ref": self.settings.REACT_PROMPT_REF, "template": prompt.template}, f)
+        os.replace(tmp_path, cache_path)
+        logger.info("Cached ReAct prompt at: %s", cache_path)
+        return prompt
+
     def _create_tools(self) -> List[Tool]:
         """Create and return a list of tools for the agent."""
-        weather_service = WeatherTool()
-        news_service = NewsTool()
+        settings = self.settings
+        self.weather_service = WeatherTool()
+        self.news_service = NewsTool()
+        self.search_service = SearchTool()
+        self.tool_executor = ToolExecutor(
+            deadlines={
+                "get_weather": settings.WEATHER_TIMEOUT_SECONDS,
+                "get_news": settings.NEWS_TIMEOUT_SECONDS,
+                "search_web": settings.SEARCH_TIMEOUT_SECONDS,
+            },
+            default_deadline=settings.TOOL_HTTP_DEFAULT_TIMEOUT_SECONDS,
+            failure_threshold=settings.TOOL_BREAKER_FAILURES,
+            reset_seconds=settings.TOOL_BREAKER_RESET_SECONDS,
+        )
+        executor = self.tool_executor
+        # Underlying calls by tool name, also used by run_tools_in_parallel
+        calls = {
+            "get_weather": self.weather_service.get_weather,
+            "get_news": self.news_service.get_news,
+            "search_web": self.search_service.search_web,
+        }
 
         @tool("get_weather", return_direct=False)
-        def get_weather(city: str) -> str:
+        async def get_weather(city: str) -> str:
             """Get real-time weather information for a given city."""
-            try:
-                logger.info("Fetching weather for city: %s", city)
-                return weather_service.get_weather(city)
-            except Exception as e:
-                logger.exception("Error fetching weather for city '%s': %s", city, e)
-                return f"Error fetching weather for {city}: {str(e)}"
+            logger.info("Fetching weather for city: %s", city)
+            return await executor.run("get_weather", calls["get_weather"], city)
     
         @tool("get_news", return_direct=False)
-        def get_news(category: str = "business") -> str:
+        async def get_news(category: str = "business") -> str:
                 """Fetch the latest news for a given category (e.g. business, sports, technology)."""
-                try:
-                    logger.info("Fetching news for category: %s", category)
-                    return news_service.get_news(category)
-                except Exception as e:
-                    logger.exception("Error fetching news for category '%s': %s", category, e)
-                    return f"Error fetching news for {category}: {str(e)}"
+                logger.info("Fetching news for category: %s", category)
+                return await executor.run("get_news", calls["get_news"], category)
         
         @tool("search_web", return_direct=False)
-        def search_web(query: str) -> str:
+        async def search_web(query: str) -> str:
             """Search the web for up-to-date information using DuckDuckGo."""
+            return await executor.run("search_web", calls["search_web"], query)
+
+        @tool("run_tools_in_parallel", return_direct=False)
+        async def run_tools_in_parallel(requests: str) -> str:
+            """Run several independent tool calls at once. Input is a JSON list such as
+            [{"tool": "get_weather", "input": "Pune"}, {"tool": "get_news", "input": "sports"}];
+            tool is one of get_weather, get_news or search_web."""
             try:
-                logger.info("Performing web search for query: %.80s...", query)
-                search = DuckDuckGoSearchResults()
-                result = search.run(query)
-                # print("result",result)
-                logger.debug("DuckDuckGo returned result length: %d", len(result) if result else 0)
-                return result
-            except Exception as e:
-                logger.exception("Error performing web search for query '%s': %s", query, e)
-                return f"Error: {str(e)}"
-
-        return [get_weather, get_news, search_web]
+                parsed = json.loads(requests)
+                if isinstance(parsed, dict):
+                    parsed = [parsed]
+                batch = [(str(item["tool"]), str(item["input"])) for item in parsed]
+            except (ValueError, TypeError, KeyError) as e:
+                return f"Invalid input, expected a JSON list of {{\"tool\", \"input\"}} objects: {e}"
+            unknown = sorted({name for name, _ in batch if name not in calls})
+            if unknown:
+                return f"Unknown tools: {', '.join(unknown)}"
+            batch = batch[:settings.TOOL_PARALLEL_MAX_CALLS]
+
+            logger.info("Running %d tool calls in parallel", len(batch))
+            results = await executor.run_many([(name, calls[name], (arg,)) for name, arg in batch])
+            return "\n\n".join(f"[{name}: {arg}]\n{result}" for (name, arg), result in zip(batch, results))
+
+        return [get_weather, get_news, search_web, run_tools_in_parallel]
+
+    def tool_cache_stats(self) -> Dict:
+        """Hit/miss counters of the per-tool result caches"""
+        return {
+            "get_weather": self.weather_service.cache.stats(),
+            "get_news": self.news_service.cache.stats(),
+            "search_web": self.search_service.cache.stats(),
+        }
     
-    def generate_answer(
+    def _build_prompt(
         self,
         context: str,
         question: str,
         conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None,
+        direct: bool = False,
     ) -> str:
-        """Generate an answer using the agent."""
-        try:
-            logger.info("Generating answer for question: %.80s...", question)
-            history = []
-            if conversation_history:
-                for msg in conversation_history[-5:]:
-                    role = msg.get("role", "user")
-                    text = msg.get("text", "")
-                    history.append(f"{role.capitalize()}: {text}")
-            logger.debug("Loaded %d previous messages from conversation history.", len(history))
+        """Assemble the agent input from system instructions, history, context and question.
 
+        With ``direct`` the tool instructions are replaced by a request to answer
+        from the context alone, or reply with ESCALATE_MARKER when it cannot.
+        """
+        history = []
+        if conversation_history:
+            for msg in conversation_history:
+                role = msg.get("role", "user")
+                text = msg.get("text", "")
+                history.append(f"{role.capitalize()}: {text}")
+        logger.debug("Loaded %d previous messages from conversation history.", len(history))
+
+        system_prompt = (
+            "You are an intelligent, articulate, and reliable assistant. "
+            "Your responses should be thoughtful, precise, and naturally written. "
+            "Rely on the provided context first; if something is unclear, reason carefully or use a tool when available. "
+            "Be confident but not verbose — aim for clarity and depth. "
+            "When relevant, include brief insights or examples that make your answer more useful or intuitive. "
+            "Avoid speculation, filler phrases, or unnecessary repetition. "
+            "If the question involves real-time topics like weather or news, use the appropriate tool. "
+            "Always respond in a natural, conversational tone while maintaining professional quality.\n\n"
+        )
+        if direct:
             system_prompt = (
                 "You are an intelligent, articulate, and reliable assistant. "
-                "Your responses should be thoughtful, precise, and naturally written. "
-                "Rely on the provided context first; if something is unclear, reason carefully or use a tool when available. "
+                "Answer the question using the provided context and conversation history. "
                 "Be confident but not verbose — aim for clarity and depth. "
-                "When relevant, include brief insights or examples that make your answer more useful or intuitive. "
                 "Avoid speculation, filler phrases, or unnecessary repetition. "
-                "If the question involves real-time topics like weather or news, use the appropriate tool. "
+                f"If the context does not contain the answer, or the question needs live data such as "
+                f"weather, news or a web search, reply with exactly {ESCALATE_MARKER} and nothing else. "
                 "Always respond in a natural, conversational tone while maintaining professional quality.\n\n"
             )
 
-            user_prompt = (
-                f"{system_prompt}"
-                f"Conversation history:\n{chr(10).join(history)}\n\n"
-                f"Context:\n{context}\n\n"
-                f"Question:\n{question}\n"
-            )
+        # No relevant chunks: leave the document context out instead of sending an empty section
+        context_section = f"Context:\n{context}\n\n" if context.strip() else ""
+        # Older turns of long conversations are folded into a running summary
+        summary_section = f"Conversation summary:\n{conversation_summary}\n\n" if conversation_summary else ""
+        return (
+            f"{system_prompt}"
+            f"{summary_section}"
+            f"Conversation history:\n{chr(10).join(history)}\n\n"
+            f"{context_section}"
+            f"Question:\n{question}\n"
+        )
+
+    async def _direct_answer(self, prompt: str) -> Optional[str]:
+        """One LLM call without tools; None when the model asks for the agent instead."""
+        message = await self.llm.ainvoke(prompt)
+        output = _chunk_text(message).strip()
+        if output.startswith(ESCALATE_MARKER):
+            return None
+        return output
 
-            result = self.agent_executor.invoke({"input": user_prompt})
-            # print("response agent",result)
-            logger.debug("Agent execution result keys: %s", list(result.keys()))
-            output = result.get("output", "").strip() or "No response."
-            used_tool = False
-            if isinstance(result, dict) and "intermediate_steps" in result:
-                used_tool = any("tool" in str(step).lower() for step in result["intermediate_steps"])
-                logger.info("Tool usage detected during reasoning: %s", used_tool)
+    async def _agent_answer(self, prompt: str) -> Dict:
+        async with self.agent_pool.acquire_async() as agent_executor:
+            result = await agent_executor.ainvoke({"input": prompt})
+        # print("response agent",result)
+        logger.debug("Agent execution result keys: %s", list(result.keys()))
+        output = result.get("output", "").strip() or "No response."
+        AGENT_ITERATIONS.observe(len(result.get("intermediate_steps", [])) + 1)
+        used_tool = False
+        if isinstance(result, dict) and "intermediate_steps" in result:
+            used_tool = any("tool" in str(step).lower() for step in result["intermediate_steps"])
+            logger.info("Tool usage detected during reasoning: %s", used_tool)
+        return {"output": output, "used_tool": used_tool}
 
+    async def generate_answer(
+        self,
+        context: str,
+        question: str,
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None,
+    ) -> str:
+        """Generate an answer with a direct LLM call when the context suffices, else using the agent."""
+        try:
+            logger.info("Generating answer for question: %.80s...", question)
+            start = time.perf_counter()
+            route, _ = self.router.route(question, context)
+
+            with stage_timer("llm"):
+                if route == DIRECT:
+                    output = await self._direct_answer(
+                        self._build_prompt(context, question, conversation_history, conversation_summary, direct=True)
+                    )
+                    if output is not None:
+                        self.router.record(DIRECT, time.perf_counter() - start)
+                        ROUTES.labels(route=DIRECT).inc()
+                        logger.info("Successfully generated response for question.")
+                        return {"output": output or "No response.", "used_tool": False, "route": DIRECT}
+                    logger.info("Direct answer deferred to the agent")
+
+                result = await self._agent_answer(
+                    self._build_prompt(context, question, conversation_history, conversation_summary)
+                )
+            self.router.record(AGENT, time.perf_counter() - start, escalated=route == DIRECT)
+            ROUTES.labels(route=AGENT).inc()
             logger.info("Successfully generated response for question.")
-            return {"output": output, "used_tool": used_tool}
+            return {**result, "route": AGENT}
 
         except Exception as e:
             logger.exception("Error generating answer: %s", e)
-            raise LLMError(f"Error generating answer: {str(e)}")
\ No newline at end of file
+            raise LLMError(f"Error generating answer: {str(e)}")
+
+    async def _stream_direct(self, prompt: str) -> AsyncIterator[Dict]:
+        """Stream a direct LLM call; yields nothing if the model asks for the agent.
+
+        Text is held back until it can no longer be the start of ESCALATE_MARKER.
+        """
+        output = ""
+        sent = 0
+        async for chunk in self.llm.astream(prompt):
+            output += _chunk_text(chunk)
+            if not sent:
+                head = output.lstrip()
+                if ESCALATE_MARKER.startswith(head) or head.startswith(ESCALATE_MARKER):
+                    if head.startswith(ESCALATE_MARKER):
+                        return
+                    continue
+            piece = output[sent:] if sent else output.lstrip()
+            if piece:
+                sent = len(output)
+                yield {"event": "token", "data": {"text": piece}}
+
+        output = output.strip()
+        if output.startswith(ESCALATE_MARKER):
+            return
+        if not sent:
+            output = output or "No response."
+            yield {"event": "token", "data": {"text": output}}
+        yield {"event": "final", "data": {"output": output, "used_tool": False, "route": DIRECT}}
+
+    async def _stream_agent(self, prompt: str) -> AsyncIterator[Dict]:
+        # Per LLM run: accumulated text and offset of the next unsent character
+        buffers: Dict[str, str] = {}
+        offsets: Dict[str, int] = {}
+        streamed_any = False
+        used_tool = False
+        tool_calls = 0
+        output = ""
+
+        async with self.agent_pool.acquire_async() as agent_executor:
+            async for event in agent_executor.astream_events({"input": prompt}, version="v2"):
+                kind = event["event"]
+
+                if kind == "on_chat_model_stream":
+                    run_id = event["run_id"]
+                    buffers[run_id] = buffers.get(run_id, "") + _chunk_text(event["data"].get("chunk"))
+                    text = buffers[run_id]
+                    if run_id not in offsets:
+                        marker_at = text.find(FINAL_ANSWER_MARKER)
+                        if marker_at == -1:
+                            continue
+                        offsets[run_id] = marker_at + len(FINAL_ANSWER_MARKER)
+                    piece = text[offsets[run_id]:]
+                    if not streamed_any:
+                        piece = piece.lstrip()
+                    if piece:
+                        offsets[run_id] = len(text)
+                        streamed_any = True
+                        yield {"event": "token", "data": {"text": piece}}
+
+                elif kind == "on_tool_start":
+                    used_tool = True
+                    tool_calls += 1
+                    tool_input = event["data"].get("input")
+                    yield {
+                        "event": "step",
+                        "data": {"tool": event["name"], "input": str(tool_input) if tool_input else ""},
+                    }
+
+                elif kind == "on_tool_end":
+                    yield {
+                        "event": "step",
+                        "data": {"tool": event["name"], "output": str(event["data"].get("output", ""))[:500]},
+                    }
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    result = event["data"].get("output") or {}
+                    output = (result.get("output", "") if isinstance(result, dict) else str(result)).strip()
+
+        AGENT_ITERATIONS.observe(tool_calls + 1)
+        output = output or "No response."
+        if not streamed_any:
+            yield {"event": "token", "data": {"text": output}}
+        yield {"event": "final", "data": {"output": output, "used_tool": used_tool, "route": AGENT}}
+
+    async def stream_answer(
+        self,
+        context: str,
+        question: str,
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None,
+    ) -> AsyncIterator[Dict]:
+        """Stream agent steps and final-answer tokens as they are produced.
+
+        Yields ``step`` events for tool calls, ``token`` events for text after the
+        ReAct ``Final Answer:`` marker and a closing ``final`` event with the full output.
+        Questions routed to the direct path stream the LLM's tokens as they arrive.
+        """
+        try:
+            logger.info("Streaming answer for question: %.80s...", question)
+            start = time.perf_counter()
+            route, _ = self.router.route(question, context)
+
+            if route == DIRECT:
+                answered = False
+                async for event in self._stream_direct(
+                    self._build_prompt(context, question, conversation_history, conversation_summary, direct=True)
+                ):
+                    answered = answered or event["event"] == "final"
+                    yield event
+                if answered:
+                    self.router.record(DIRECT, time.perf_counter() - start)
+                    STAGE_SECONDS.labels(stage="llm").observe(time.perf_counter() - start)
+                    ROUTES.labels(route=DIRECT).inc()
+                    logger.info("Successfully streamed response for question.")
+                    return
+                logger.info("Direct answer deferred to the agent")
+
+            agent_prompt = self._build_prompt(context, question, conversation_history, conversation_summary)
+            async for event in self._stream_agent(agent_prompt):
+                yield event
+            self.router.record(AGENT, time.perf_counter() - start, escalated=route == DIRECT)
+            STAGE_SECONDS.labels(stage="llm").observe(time.perf_counter() - start)
+            ROUTES.labels(route=AGENT).inc()
+            logger.info("Successfully streamed response for question.")
+
+        except Exception as e:
+            logger.exception("Error streaming answer: %s", e)
+            raise LLMError(f"Error streaming answer: {str(e)}")
+
+
+def _chunk_text(chunk) -> str:
+    """Extract plain text from a streamed message chunk."""
+    if chunk is None:
+        return ""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return str(content)
@@ -0,0 +1,107 @@
+"""Routing between a direct LLM call and the ReAct agent"""
+
+import re
+import threading
+from typing import Dict, Optional, Tuple
+from app.config.logger import logger
+
+DIRECT = "direct"
+AGENT = "agent"
+
+# Phrases that need a live tool (weather, news, web search) rather than the documents
+_TOOL_INTENTS = {
+    "weather": re.compile(
+        r"\b(weather|forecast|temperature outside|rain(ing|y)?|snow(ing|y)?|humidity|sunny|windy)\b"
+    ),
+    "news": re.compile(r"\b(news|headlines?|breaking|latest updates?)\b"),
+    "web": re.compile(
+        r"\b(search (the )?(web|internet|online)|google|look (it |this )?up|on the (web|internet)|"
+        r"online|today|tonight|tomorrow|yesterday|right now|currently|this (week|month|year)|"
+        r"stock price|exchange rate|score of)\b"
+    ),
+}
+
+# Reply the direct prompt asks for when the context cannot answer the question
+ESCALATE_MARKER = "NEED_TOOLS"
+
+
+class QueryRouter:
+    """
+    Decides per question whether a single direct LLM call over the retrieved
+    context is enough or the ReAct agent is needed, and keeps per-route call
+    counts and latencies so the time saved by the direct path can be reported.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict] = {
+            route: {"requests": 0, "seconds": 0.0} for route in (DIRECT, AGENT)
+        }
+        self._reasons: Dict[str, int] = {}
+        self._escalations = 0
+
+    @staticmethod
+    def tool_intent(question: str) -> Optional[str]:
+        """Name of the tool the question appears to need, if any"""
+        text = question.lower()
+        for name, pattern in _TOOL_INTENTS.items():
+            if pattern.search(text):
+                return name
+        return None
+
+    def route(self, question: str, context: str) -> Tuple[str, str]:
+        """(route, reason) for a question and its assembled context"""
+        if not self.enabled:
+            route, reason = AGENT, "fast_path_disabled"
+        elif not context.strip():
+            route, reason = AGENT, "no_context"
+        else:
+            intent = self.tool_intent(question)
+            route, reason = (AGENT, f"{intent}_intent") if intent else (DIRECT, "context")
+
+        with self._lock:
+            self._reasons[reason] = self._reasons.get(reason, 0) + 1
+        logger.info("Routing question to %s path (%s): %.80s", route, reason, question)
+        return route, reason
+
+    def record(self, route: str, seconds: float, escalated: bool = False) -> None:
+        """Count one answered request; ``escalated`` marks a direct attempt handed to the agent"""
+        with self._lock:
+            stats = self._routes[route]
+            stats["requests"] += 1
+            stats["seconds"] += seconds
+            self._escalations += escalated
+            agent_avg = self._average(AGENT)
+        if route == DIRECT and agent_avg is not None:
+            logger.info(
+                "Direct path answered in %.0f ms, about %.0f ms faster than the agent average",
+                seconds * 1000, agent_avg * 1000 - seconds * 1000
+            )
+        else:
+            logger.info("%s path answered in %.0f ms", route.capitalize(), seconds * 1000)
+
+    def _average(self, route: str) -> Optional[float]:
+        stats = self._routes[route]
+        return stats["seconds"] / stats["requests"] if stats["requests"] else None
+
+    def stats(self) -> Dict:
+        """Requests and average latency per route, and the estimated time the direct path saved"""
+        with self._lock:
+            direct_avg, agent_avg = self._average(DIRECT), self._average(AGENT)
+            saved = None
+            if direct_avg is not None and agent_avg is not None:
+                saved = round(max(agent_avg - direct_avg, 0.0) * self._routes[DIRECT]["requests"], 3)
+            return {
+                "enabled": self.enabled,
+                "routes": {
+                    route: {
+                        "requests": stats["requests"],
+                        "avg_ms": round(self._average(route) * 1000, 2) if stats["requests"] else 0.0,
+                    }
+                    for route, stats in self._routes.items()
+                },
+                "reasons": dict(self._reasons),
+                "escalations": self._escalations,
+                "estimated_seconds_saved": saved,
+            }
@@ -0,0 +1,112 @@
+"""Cross-encoder reranking of retrieved chunks"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from app.config.logger import logger
+from app.services.ai.embeddings_service import normalize_query
+from app.services.answer_cache_service import chunk_key
+from app.services.lru_cache import LRUCache
+from app.services.metrics import STAGE_SECONDS
+
+
+class CrossEncoderReranker:
+    """
+    Reorders vector search candidates by cross-encoder score and keeps the
+    best few. Pairs are scored in batches against a latency budget; when the
+    budget runs out the candidates keep their retrieval order. Scores are
+    cached per (query, chunk), so repeated questions only pay for new chunks.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 16,
+        budget_seconds: Optional[float] = None,
+        cache_size: int = 4096
+    ):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.budget_seconds = budget_seconds
+        self.score_cache = LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._fallbacks = 0
+        self._candidates = 0
+        self._kept = 0
+        self._seconds = 0.0
+        logger.info(f"Loaded reranker model '{model_name}'")
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Tuple[Document, float]],
+        top_n: int
+    ) -> List[Tuple[Document, float]]:
+        """Best ``top_n`` candidates by cross-encoder score; retrieval scores are kept"""
+        start = time.perf_counter()
+        deadline = start + self.budget_seconds if self.budget_seconds else None
+        query_key = normalize_query(query)
+
+        scores: Dict[int, float] = {}
+        pending = []
+        for position, (doc, _) in enumerate(candidates):
+            cached = self.score_cache.get((query_key, chunk_key(doc)))
+            if cached is None:
+                pending.append(position)
+            else:
+                scores[position] = cached
+
+        timed_out = False
+        for offset in range(0, len(pending), self.batch_size):
+            if deadline and time.perf_counter() > deadline:
+                timed_out = True
+                break
+            batch = pending[offset:offset + self.batch_size]
+            predicted = self.model.predict(
+                [(query, candidates[position][0].page_content) for position in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            for position, score in zip(batch, predicted):
+                scores[position] = float(score)
+                self.score_cache.set((query_key, chunk_key(candidates[position][0])), float(score))
+
+        if timed_out:
+            ranked = candidates[:top_n]
+            logger.warning(
+                "Reranking exceeded its %.0f ms budget after %d of %d candidates; keeping retrieval order",
+                self.budget_seconds * 1000, len(scores), len(candidates)
+            )
+        else:
+            order = sorted(range(len(candidates)), key=lambda position: scores[position], reverse=True)
+            ranked = [candidates[position] for position in order[:top_n]]
+
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage="rerank").observe(elapsed)
+        with self._lock:
+            self._requests += 1
+            self._fallbacks += timed_out
+            self._candidates += len(candidates)
+            self._kept += len(ranked)
+            self._seconds += elapsed
+        logger.info("Reranked %d candidates to %d in %.1f ms", len(candidates), len(ranked), elapsed * 1000)
+        return ranked
+
+    def stats(self) -> Dict:
+        """Request count, budget fallbacks, candidate reduction and score cache"""
+        with self._lock:
+            requests = self._requests
+            return {
+                "model": self.model_name,
+                "requests": requests,
+                "fallbacks": self._fallbacks,
+                "avg_candidates": round(self._candidates / requests, 2) if requests else 0.0,
+                "avg_kept": round(self._kept / requests, 2) if requests else 0.0,
+                "avg_ms": round(self._seconds * 1000 / requests, 2) if requests else 0.0,
+                "score_cache": self.score_cache.stats(),
+            }
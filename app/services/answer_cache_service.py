@@ -0,0 +1,268 @@
+"""Semantic answer cache placed in front of the agent"""
+
+import hashlib
+import itertools
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import redis as redis_sync
+import redis.asyncio as redis_async
+from langchain_core.documents import Document
+from app.config.logger import logger
+
+
+def chunk_key(doc: Document) -> str:
+    """Stable identity of a retrieved chunk"""
+    if getattr(doc, "id", None):
+        return doc.id
+    if doc.metadata.get("chunk_id"):
+        return str(doc.metadata["chunk_id"])
+    raw = json.dumps(
+        {
+            "source": doc.metadata.get("source"),
+            "page": doc.metadata.get("page"),
+            "content": doc.page_content,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def context_fingerprint(docs: Sequence[Document]) -> str:
+    """Fingerprint of the set of retrieved chunks an answer was grounded on"""
+    digest = hashlib.sha256()
+    for key in sorted(chunk_key(doc) for doc in docs):
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _normalize(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class BaseAnswerCache(ABC):
+    """Abstract answer cache interface.
+
+    An entry is a hit when it belongs to the same collection, was produced
+    from the same context fingerprint, and its question embedding has cosine
+    similarity of at least ``similarity_threshold`` with the new question.
+    """
+
+    backend: str = "base"
+
+    def __init__(self, similarity_threshold: float):
+        self.similarity_threshold = similarity_threshold
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+
+    async def lookup(
+        self,
+        collection: str,
+        fingerprint: str,
+        embedding: Sequence[float]
+    ) -> Optional[Dict]:
+        """Return the cached answer payload for a semantically equal question, if any."""
+        try:
+            answer = await self._find(collection, fingerprint, _normalize(embedding))
+        except Exception as e:
+            logger.warning("Answer cache lookup failed, treating as miss: %s", e)
+            answer = None
+
+        with self._stats_lock:
+            if answer is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        logger.info("Answer cache %s for collection '%s'", "hit" if answer else "miss", collection)
+        return answer
+
+    async def store(
+        self,
+        collection: str,
+        fingerprint: str,
+        embedding: Sequence[float],
+        answer: Dict
+    ) -> None:
+        """Store an answer payload for later lookups."""
+        try:
+            await self._put(collection, fingerprint, _normalize(embedding), answer)
+        except Exception as e:
+            logger.warning("Answer cache store failed: %s", e)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "backend": self.backend,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+    @abstractmethod
+    async def _find(self, collection: str, fingerprint: str, embedding: np.ndarray) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    async def _put(self, collection: str, fingerprint: str, embedding: np.ndarray, answer: Dict) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_collection(self, collection: str) -> None:
+        """Drop every entry of a collection (called synchronously after writes)."""
+        ...
+
+
+class InMemoryAnswerCache(BaseAnswerCache):
+    """
+    Process-local answer cache.
+    Entries expire after ``ttl_seconds`` and the least recently used entry is
+    evicted once ``max_entries`` is reached.
+    """
+
+    backend = "memory"
+
+    def __init__(self, similarity_threshold: float, max_entries: int = 1000, ttl_seconds: Optional[int] = 3600):
+        super().__init__(similarity_threshold)
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, str], List[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        bucket_key = (entry["collection"], entry["fingerprint"])
+        bucket = self._buckets.get(bucket_key, [])
+        if entry_id in bucket:
+            bucket.remove(entry_id)
+        if not bucket:
+            self._buckets.pop(bucket_key, None)
+
+    async def _find(self, collection: str, fingerprint: str, embedding: np.ndarray) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_score = None, self.similarity_threshold
+            for entry_id in list(self._buckets.get((collection, fingerprint), [])):
+                entry = self._entries[entry_id]
+                if entry["expires_at"] is not None and entry["expires_at"] <= now:
+                    self._remove(entry_id)
+                    continue
+                score = float(np.dot(entry["embedding"], embedding))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                return None
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id]["answer"]
+
+    async def _put(self, collection: str, fingerprint: str, embedding: np.ndarray, answer: Dict) -> None:
+        expires_at = time.monotonic() + self._ttl if self._ttl else None
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = {
+                "collection": collection,
+                "fingerprint": fingerprint,
+                "embedding": embedding,
+                "answer": answer,
+                "expires_at": expires_at,
+            }
+            self._buckets.setdefault((collection, fingerprint), []).append(entry_id)
+            while len(self._entries) > self._max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+
+    def invalidate_collection(self, collection: str) -> None:
+        with self._lock:
+            stale = [entry_id for entry_id, entry in self._entries.items() if entry["collection"] == collection]
+            for entry_id in stale:
+                self._remove(entry_id)
+        logger.info("Invalidated %d cached answers for collection '%s'", len(stale), collection)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        with self._lock:
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+class RedisAnswerCache(BaseAnswerCache):
+    """
+    Redis-backed answer cache shared by all workers.
+    Each (collection, generation, fingerprint) key holds a short list of JSON
+    entries. Keys expire after ``ttl_seconds`` (refreshed on hit) and are
+    capped at ``max_entries_per_context`` items; global LRU eviction is left
+    to the Redis ``maxmemory-policy``. Invalidation bumps a per-collection
+    generation counter so old keys are no longer read and simply expire.
+    """
+
+    backend = "redis"
+    max_entries_per_context = 20
+
+    def __init__(
+        self,
+        redis_url: str,
+        similarity_threshold: float,
+        ttl_seconds: Optional[int] = 3600,
+        namespace: str = "answer_cache:"
+    ):
+        super().__init__(similarity_threshold)
+        self._client = redis_async.from_url(redis_url, decode_responses=True)
+        self._sync_client = redis_sync.from_url(redis_url, decode_responses=True)
+        self._ttl = ttl_seconds
+        self._ns = namespace
+
+    def _generation_key(self, collection: str) -> str:
+        return f"{self._ns}gen:{collection}"
+
+    async def _entries_key(self, collection: str, fingerprint: str) -> str:
+        generation = await self._client.get(self._generation_key(collection)) or "0"
+        return f"{self._ns}{collection}:{generation}:{fingerprint}"
+
+    async def _find(self, collection: str, fingerprint: str, embedding: np.ndarray) -> Optional[Dict]:
+        key = await self._entries_key(collection, fingerprint)
+        values = await self._client.lrange(key, 0, -1)
+
+        best, best_score = None, self.similarity_threshold
+        for value in values:
+            entry = json.loads(value)
+            score = float(np.dot(np.asarray(entry["embedding"], dtype=np.float32), embedding))
+            if score >= best_score:
+                best, best_score = entry, score
+
+        if best is None:
+            return None
+        if self._ttl:
+            await self._client.expire(key, self._ttl)
+        return best["answer"]
+
+    async def _put(self, collection: str, fingerprint: str, embedding: np.ndarray, answer: Dict) -> None:
+        key = await self._entries_key(collection, fingerprint)
+        payload = json.dumps({"ts": int(time.time()), "embedding": embedding.tolist(), "answer": answer})
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.lpush(key, payload)
+            pipe.ltrim(key, 0, self.max_entries_per_context - 1)
+            if self._ttl:
+                pipe.expire(key, self._ttl)
+            await pipe.execute()
+
+    def invalidate_collection(self, collection: str) -> None:
+        try:
+            self._sync_client.incr(self._generation_key(collection))
+            logger.info("Invalidated cached answers for collection '%s'", collection)
+        except Exception as e:
+            logger.warning("Failed to invalidate answer cache for '%s': %s", collection, e)
@@ -0,0 +1,269 @@
+"""In-process BM25 keyword index kept alongside a Chroma collection"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from app.config.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single server process is assumed
+    fcntl = None
+
+# Words, numbers and compound codes such as "PN-0042-318", "E.104" or "x_max"
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i in is it my of on or "
+    "our that the their this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms; compound codes yield the whole code plus each of its parts"""
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        terms.append(token)
+        parts = re.split(r"[-_./]", token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def code_terms(text: str) -> Set[str]:
+    """Terms containing a digit, such as part numbers and error codes"""
+    return {term for term in tokenize(text) if any(ch.isdigit() for ch in term)}
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk texts keyed by chunk ID. Documents can be added and
+    removed one at a time.
+
+    On disk the index is a JSON snapshot at ``path`` plus an append-only log
+    of the changes made since (``path + ".log"``). ``flush()`` appends the
+    pending changes, so a write costs O(changed chunks), and rewrites the
+    snapshot only once the log outgrows it. ``refresh()`` replays what other
+    processes appended, which keeps every server worker's copy current.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._total_length = 0
+        # Changes not yet flushed: (doc_id, term frequencies), None frequencies meaning removal
+        self._pending: List[Tuple[str, Optional[Dict[str, int]]]] = []
+        # Identity of the snapshot loaded and how far the log has been replayed
+        self._snapshot_stat: Optional[Tuple[int, int, int]] = None
+        self._log_offset = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def load(cls, path: str, **params) -> "BM25Index":
+        """Load a saved index; a missing file gives an empty index"""
+        index = cls(path, **params)
+        index.refresh()
+        return index
+
+    @property
+    def log_path(self) -> str:
+        return f"{self.path}.log"
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.path) and (os.path.exists(self.path) or os.path.exists(self.log_path))
+
+    @staticmethod
+    def _stat(path: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            return None
+
+    def _clear(self) -> None:
+        self._docs.clear()
+        self._lengths.clear()
+        self._postings.clear()
+        self._total_length = 0
+
+    def refresh(self) -> bool:
+        """Catch up with changes other processes saved since the last load or refresh.
+
+        Replaying the log is idempotent, so changes this process already
+        applied in memory may safely be read back. Returns whether anything
+        was read.
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            snapshot = self._stat(self.path)
+            signature = (snapshot.st_ino, snapshot.st_mtime_ns, snapshot.st_size) if snapshot else None
+            log = self._stat(self.log_path)
+            log_size = log.st_size if log else 0
+            replayed = False
+            if signature != self._snapshot_stat or log_size < self._log_offset:
+                # Compacted by another process (or first load): start again from the snapshot
+                self._clear()
+                if snapshot:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        for doc_id, freqs in json.load(f)["docs"].items():
+                            self._insert(doc_id, freqs)
+                self._snapshot_stat = signature
+                self._log_offset = 0
+                replayed = True
+            if log_size > self._log_offset:
+                with open(self.log_path, "rb") as f:
+                    f.seek(self._log_offset)
+                    data = f.read(log_size - self._log_offset)
+                # A line still being appended is left for the next refresh
+                complete = data[:data.rfind(b"\n") + 1]
+                for line in complete.splitlines():
+                    entry = json.loads(line)
+                    self._apply(entry["id"], entry["tf"])
+                self._log_offset += len(complete)
+                replayed = True
+            if replayed:
+                # Changes not flushed yet are newer than anything saved
+                for doc_id, freqs in self._pending:
+                    self._apply(doc_id, freqs)
+            return replayed
+
+    def _apply(self, doc_id: str, freqs: Optional[Dict[str, int]]) -> None:
+        self._remove(doc_id)
+        if freqs is not None:
+            self._insert(doc_id, freqs)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _insert(self, doc_id: str, freqs: Dict[str, int]) -> None:
+        self._docs[doc_id] = freqs
+        length = sum(freqs.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+        for term, tf in freqs.items():
+            self._postings[term][doc_id] = tf
+
+    def add(self, doc_id: str, text: str) -> None:
+        with self._lock:
+            freqs = dict(Counter(tokenize(text)))
+            self._apply(doc_id, freqs)
+            self._pending.append((doc_id, freqs))
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            for doc_id, text in items:
+                self.add(doc_id, text)
+
+    def _remove(self, doc_id: str) -> None:
+        freqs = self._docs.pop(doc_id, None)
+        if freqs is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in freqs:
+            posting = self._postings[term]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+
+    def remove_many(self, doc_ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in doc_ids:
+                self._remove(doc_id)
+                self._pending.append((doc_id, None))
+
+    def search(self, query: str, k: int, min_score_ratio: float = 0.0) -> List[Tuple[str, float]]:
+        """Top ``k`` chunk IDs by BM25 score.
+
+        Chunks sharing no term are not returned, nor are those scoring below
+        ``min_score_ratio`` times the best score, which keeps chunks that only
+        match near-ubiquitous terms from diluting rank fusion.
+        """
+        with self._lock:
+            count = len(self._docs)
+            if not count:
+                return []
+            avg_length = self._total_length / count
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            if top and min_score_ratio:
+                cutoff = top[0][1] * min_score_ratio
+                top = [(doc_id, score) for doc_id, score in top if score >= cutoff]
+            return top
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Serialise appends and compaction between processes sharing the index files"""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def flush(self) -> None:
+        """Append the changes made since the last flush to the log, compacting it once it outgrows the snapshot"""
+        with self._lock:
+            if not (self.path and self._pending):
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            lines = "".join(
+                json.dumps({"id": doc_id, "tf": freqs}, separators=(",", ":")) + "\n"
+                for doc_id, freqs in self._pending
+            ).encode("utf-8")
+            with self._file_lock():
+                with open(self.log_path, "ab") as f:
+                    caught_up = f.tell() == self._log_offset
+                    f.write(lines)
+                if caught_up:
+                    # Nobody else appended since the last refresh: no need to read these back
+                    self._log_offset += len(lines)
+                self._pending.clear()
+                snapshot = self._stat(self.path)
+                if os.path.getsize(self.log_path) > (snapshot.st_size if snapshot else 0):
+                    self._compact()
+            logger.debug(f"Saved BM25 index with {len(self._docs)} chunks to {self.path}")
+
+    def _compact(self) -> None:
+        """Fold the log into a new snapshot; the caller holds the file lock"""
+        self.refresh()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "docs": self._docs}, f)
+        os.replace(tmp_path, self.path)
+        open(self.log_path, "wb").close()
+        snapshot = os.stat(self.path)
+        self._snapshot_stat = (snapshot.st_ino, snapshot.st_mtime_ns, snapshot.st_size)
+        self._log_offset = 0
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists: each list adds 1 / (k + rank) to the IDs it contains"""
+    fused: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
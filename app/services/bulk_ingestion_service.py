@@ -0,0 +1,387 @@
+"""Pipelined bulk indexing of many PDFs: parse -> chunk -> embed -> write"""
+
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from langchain_core.documents import Document
+from app.config.exceptions import DocumentProcessingError, FileTooLargeError
+from app.config.logger import logger
+from app.services.ai.chunking_service import ChunkingService
+from app.services.metrics import CHUNKS_SKIPPED
+from app.services.pdf_extractors import PDFSource
+from app.services.pdf_service import PDFService
+from app.services.vector_store_service import VectorStoreService, chunk_id
+
+# A named PDF, or the error that stands in for one that could not be read
+BulkSource = Tuple[str, Union[PDFSource, Exception]]
+
+# Marks the end of the stream on every stage queue
+_DONE = object()
+
+# How long a blocked stage waits before checking whether another stage failed
+_POLL_SECONDS = 0.1
+
+# Minimum time between progress reports; job progress is persisted on every report
+_PROGRESS_INTERVAL_SECONDS = 0.5
+
+
+class _Aborted(Exception):
+    """Raised in a stage when another stage has failed"""
+
+
+class _FileEnd:
+    """Follows the last page (or chunk) of a file through the stages"""
+
+    def __init__(self, filename: str, error: Optional[str] = None):
+        self.filename = filename
+        self.error = error
+        self.stale: List[str] = []
+
+
+def iter_pdf_sources(path: str, filename: str, max_member_bytes: int) -> Iterator[BulkSource]:
+    """The PDFs in one input: the file itself, or the PDF members of a zip or tar archive.
+
+    Archive members are read into memory one at a time and named by their
+    basename, the same way single uploads are named. An oversized member, or
+    an archive that turns out to be unreadable, is yielded as an exception in
+    place of its source so the rest of the batch is still indexed.
+    """
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.infolist():
+                    if member.is_dir() or not member.filename.lower().endswith(".pdf"):
+                        continue
+                    name = os.path.basename(member.filename)
+                    if member.file_size > max_member_bytes:
+                        error = FileTooLargeError(f"'{member.filename}' in {filename} exceeds {max_member_bytes} bytes")
+                        yield name, error
+                        continue
+                    with archive.open(member) as f:
+                        data = f.read()
+                    yield name, data
+        elif tarfile.is_tarfile(path):
+            with tarfile.open(path) as archive:
+                for member in archive:
+                    if not member.isfile() or not member.name.lower().endswith(".pdf"):
+                        continue
+                    name = os.path.basename(member.name)
+                    if member.size > max_member_bytes:
+                        error = FileTooLargeError(f"'{member.name}' in {filename} exceeds {max_member_bytes} bytes")
+                        yield name, error
+                        continue
+                    yield name, archive.extractfile(member).read()
+        else:
+            yield filename, path
+    except (zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError, OSError) as e:
+        yield filename, DocumentProcessingError(f"Could not read archive {filename}: {e}")
+
+
+class BulkIngestionPipeline:
+    """
+    Indexes many PDFs with one thread per stage and bounded queues between
+    them, so parsing the next file overlaps with embedding and writing the
+    previous ones. Embedding runs in batches of ``embed_batch_size`` chunks
+    and Chroma writes in batches of ``write_batch_size``, both spanning file
+    boundaries; the keyword index is persisted once at the end.
+
+    Like single uploads, each file replaces any indexed version with the same
+    name: unchanged chunks are skipped and chunks missing from the new version
+    are deleted. A file that fails to parse is reported, and chunks already
+    written from its earlier pages are deleted, so its previous version stays
+    as it was. If the run is aborted, files still in flight are rolled back
+    the same way and the writes made so far are committed.
+    """
+
+    def __init__(
+        self,
+        vector_store_service: VectorStoreService,
+        pdf_service: Optional[PDFService] = None,
+        chunk_size: int = 500,
+        chunk_overlap: int = 100,
+        embed_batch_size: int = 64,
+        write_batch_size: int = 1024,
+        queue_size: int = 256
+    ):
+        self.vector_store_service = vector_store_service
+        self.pdf_service = pdf_service or PDFService()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embed_batch_size = embed_batch_size
+        self.write_batch_size = write_batch_size
+        self.queue_size = queue_size
+
+    def run(
+        self,
+        sources: Iterable[BulkSource],
+        collection_name: Optional[str] = None,
+        progress_callback: Optional[Callable[..., None]] = None,
+        on_file_parsed: Optional[Callable[[str, PDFSource], None]] = None
+    ) -> Dict:
+        """Index ``(filename, source)`` pairs and return counts and throughput.
+
+        A source given as an exception is reported as that file's error.
+        ``on_file_parsed`` is called from the parse stage for every file that
+        was read completely, e.g. to keep its original.
+        """
+        progress = progress_callback or (lambda **counters: None)
+        run = _PipelineRun(self, collection_name, progress, on_file_parsed)
+        return run.execute(sources)
+
+
+class _PipelineRun:
+    """State of one pipeline run shared by its stage threads"""
+
+    def __init__(self, pipeline: BulkIngestionPipeline, collection_name, progress, on_file_parsed):
+        self.pipeline = pipeline
+        self.store = pipeline.vector_store_service
+        self.collection_name = collection_name
+        self.progress = progress
+        self.on_file_parsed = on_file_parsed
+        self.pages: "queue.Queue" = queue.Queue(maxsize=pipeline.queue_size)
+        self.chunks: "queue.Queue" = queue.Queue(maxsize=pipeline.queue_size)
+        self.embedded: "queue.Queue" = queue.Queue(maxsize=max(1, pipeline.queue_size // pipeline.embed_batch_size))
+        self.failed = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.lock = threading.Lock()
+        self.counts = {
+            "files_total": 0, "files_indexed": 0, "pages_parsed": 0, "chunks_total": 0,
+            "chunks_embedded": 0, "chunks_written": 0, "chunks_skipped": 0, "chunks_deleted": 0,
+        }
+        self.file_errors: List[Dict[str, str]] = []
+        self.started = time.perf_counter()
+        self.last_report = 0.0
+
+    def _count(self, **increments) -> None:
+        with self.lock:
+            for field, value in increments.items():
+                self.counts[field] += value
+            now = time.perf_counter()
+            if now - self.last_report < _PROGRESS_INTERVAL_SECONDS:
+                return
+            self.last_report = now
+            snapshot = dict(self.counts)
+        self.progress(**snapshot, **self._rates(snapshot))
+
+    def _rates(self, counts: Dict) -> Dict[str, float]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "pages_per_sec": round(counts["pages_parsed"] / elapsed, 2),
+            "chunks_per_sec": round(counts["chunks_total"] / elapsed, 2),
+        }
+
+    def _put(self, target: "queue.Queue", item) -> None:
+        while not self.failed.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+        raise _Aborted()
+
+    def _get(self, source: "queue.Queue"):
+        while not self.failed.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        raise _Aborted()
+
+    def _stage(self, name: str, work: Callable[[], None]) -> threading.Thread:
+        def target() -> None:
+            try:
+                work()
+            except _Aborted:
+                pass
+            except BaseException as e:
+                logger.exception("Bulk ingestion %s stage failed: %s", name, e)
+                with self.lock:
+                    self.error = self.error or e
+                self.failed.set()
+
+        thread = threading.Thread(target=target, name=f"bulk-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def execute(self, sources: Iterable[BulkSource]) -> Dict:
+        threads = [
+            self._stage("parse", lambda: self._parse(sources)),
+            self._stage("chunk", self._chunk),
+            self._stage("embed", self._embed),
+            self._stage("write", self._write),
+        ]
+        for thread in threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+
+        self.progress(**self.counts, **self._rates(self.counts))
+        elapsed = time.perf_counter() - self.started
+        result = {**self.counts, **self._rates(self.counts), "seconds": round(elapsed, 3), "errors": self.file_errors}
+        logger.info(
+            f"Bulk indexed {result['files_indexed']}/{result['files_total']} files: "
+            f"{result['pages_parsed']} pages, {result['chunks_total']} chunks ({result['chunks_written']} written) "
+            f"in {elapsed:.1f}s "
+            f"({result['pages_per_sec']} pages/sec, {result['chunks_per_sec']} chunks/sec)"
+        )
+        return result
+
+    def _parse(self, sources: Iterable[BulkSource]) -> None:
+        names: Set[str] = set()
+        for filename, source in sources:
+            self._count(files_total=1)
+            if isinstance(source, Exception):
+                self._put(self.pages, _FileEnd(filename, error=str(source)))
+                continue
+            if filename in names:
+                self._put(self.pages, _FileEnd(filename, error="Duplicate filename in bulk request"))
+                continue
+            names.add(filename)
+
+            error = None
+            try:
+                for page in self.pipeline.pdf_service.iter_pages(source, filename):
+                    self._put(self.pages, page)
+                    self._count(pages_parsed=1)
+                if self.on_file_parsed:
+                    self.on_file_parsed(filename, source)
+            except _Aborted:
+                raise
+            except Exception as e:
+                error = str(e)
+            self._put(self.pages, _FileEnd(filename, error=error))
+        self._put(self.pages, _DONE)
+
+    def _chunk(self) -> None:
+        stored: Optional[Set[str]] = None
+        seen: Set[str] = set()
+        while True:
+            item = self._get(self.pages)
+            if item is _DONE:
+                self._put(self.chunks, _DONE)
+                return
+            if isinstance(item, _FileEnd):
+                if item.error is None and stored is not None:
+                    item.stale = sorted(stored - seen)
+                stored, seen = None, set()
+                self._put(self.chunks, item)
+                continue
+
+            if stored is None:
+                stored = self.store.source_chunk_ids(item.metadata["source"], self.collection_name)
+            for chunk in ChunkingService.chunk_stream([item], self.pipeline.chunk_size, self.pipeline.chunk_overlap):
+                doc_id = chunk_id(chunk)
+                self._count(chunks_total=1)
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if doc_id in stored:
+                    CHUNKS_SKIPPED.inc()
+                    self._count(chunks_skipped=1)
+                    continue
+                chunk.metadata = {**chunk.metadata, "chunk_id": doc_id}
+                self._put(self.chunks, (doc_id, chunk))
+
+    def _embed(self) -> None:
+        # File ends travel with the batch holding their last chunk, so the
+        # writer only completes a file after all of its chunks are written
+        batch: List[Tuple[str, Document]] = []
+        ends: List[_FileEnd] = []
+
+        def flush() -> None:
+            embeddings = []
+            if batch:
+                embeddings = self.store.embeddings.embed_documents([doc.page_content for _, doc in batch])
+                self._count(chunks_embedded=len(batch))
+            self._put(self.embedded, (list(batch), embeddings, list(ends)))
+            batch.clear()
+            ends.clear()
+
+        while True:
+            item = self._get(self.chunks)
+            if item is _DONE:
+                flush()
+                self._put(self.embedded, _DONE)
+                return
+            if isinstance(item, _FileEnd):
+                ends.append(item)
+                if not batch:
+                    flush()
+                continue
+            batch.append(item)
+            if len(batch) >= self.pipeline.embed_batch_size:
+                flush()
+
+    def _write(self) -> None:
+        ids: List[str] = []
+        docs: List[Document] = []
+        vectors: List[List[float]] = []
+        ends: List[_FileEnd] = []
+        # IDs written for files whose end has not arrived yet, by filename
+        in_flight: Dict[str, List[str]] = {}
+        wrote = False
+
+        def flush() -> None:
+            nonlocal wrote
+            if ids:
+                for doc_id, doc in zip(ids, docs):
+                    in_flight.setdefault(doc.metadata["source"], []).append(doc_id)
+                wrote = True
+                self.store.write_embedded(list(ids), list(docs), list(vectors), self.collection_name)
+                self._count(chunks_written=len(ids))
+            for end in ends:
+                partial = in_flight.pop(end.filename, [])
+                if end.error is not None:
+                    if partial:
+                        # Only chunks missing from the stored version were written
+                        self.store.delete_ids(partial, self.collection_name)
+                    logger.warning("Skipped '%s' in bulk ingestion: %s", end.filename, end.error)
+                    self.file_errors.append({"filename": end.filename, "error": end.error})
+                    continue
+                if end.stale:
+                    self.store.delete_ids(end.stale, self.collection_name)
+                    self._count(chunks_deleted=len(end.stale))
+                self._count(files_indexed=1)
+            ids.clear()
+            docs.clear()
+            vectors.clear()
+            ends.clear()
+
+        try:
+            while True:
+                item = self._get(self.embedded)
+                if item is _DONE:
+                    flush()
+                    return
+                batch, embeddings, batch_ends = item
+                ids.extend(doc_id for doc_id, _ in batch)
+                docs.extend(doc for _, doc in batch)
+                vectors.extend(embeddings)
+                ends.extend(batch_ends)
+                if len(ids) >= self.pipeline.write_batch_size:
+                    flush()
+        finally:
+            self._finish_writes(wrote, [doc_id for partial in in_flight.values() for doc_id in partial])
+
+    def _finish_writes(self, wrote: bool, partial: List[str]) -> None:
+        """Roll back files left unfinished by an abort and commit whatever was written"""
+        if not wrote:
+            return
+        try:
+            if partial:
+                logger.warning("Rolling back %d chunks of files left unfinished by bulk ingestion", len(partial))
+                self.store.delete_ids(partial, self.collection_name)
+        except Exception as e:
+            logger.exception("Rolling back unfinished bulk ingestion files failed: %s", e)
+        try:
+            self.store.commit_writes(self.collection_name)
+        except Exception as e:
+            logger.exception("Committing bulk ingestion writes failed: %s", e)
+            with self.lock:
+                self.error = self.error or e
+            self.failed.set()
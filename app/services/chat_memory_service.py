@@ -1,8 +1,11 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+import asyncio
 import time
 import json
 import redis.asyncio as redis_async
+from app.services.metrics import REDIS_SECONDS
 
 class BaseChatMemory(ABC):
     """Abstract chat memory interface."""
@@ -11,6 +14,11 @@ class BaseChatMemory(ABC):
     async def append_message(self, conversation_id: str, role: str, text: str) -> None:
         ...
 
+    async def append_turn(self, conversation_id: str, question: str, answer: str) -> None:
+        """Store a user question and the assistant's answer together."""
+        await self.append_message(conversation_id, "user", question)
+        await self.append_message(conversation_id, "assistant", answer)
+
     @abstractmethod
     async def get_messages(self, conversation_id: str, limit: Optional[int] = None) -> List[Dict]:
         ...
@@ -19,47 +27,235 @@ class BaseChatMemory(ABC):
     async def clear_conversation(self, conversation_id: str) -> None:
         ...
 
+    @abstractmethod
+    async def get_summary(self, conversation_id: str) -> Optional[str]:
+        """Running summary of messages folded out of the history, if any."""
+        ...
+
+    @abstractmethod
+    async def compact(self, conversation_id: str, summary: str, folded: int) -> None:
+        """Replace the stored summary and drop the ``folded`` oldest messages it now covers."""
+        ...
+
+    async def get_history(self, conversation_id: str, limit: Optional[int] = None) -> Tuple[Optional[str], List[Dict]]:
+        """Summary and the newest ``limit`` messages."""
+        return await self.get_summary(conversation_id), await self.get_messages(conversation_id, limit)
+
 
 class RedisChatMemory(BaseChatMemory):
     """
     Redis-backed chat memory.
     Uses a Redis list per conversation key. Values are JSON strings.
+    Lists are trimmed to the newest ``max_messages`` entries on every write.
     """
 
     def __init__(
         self,
-        redis_url: str,
+        redis_url: Optional[str] = None,
         ttl_seconds: Optional[int] = 86400,
-        namespace: str = "chat_mem:"
+        namespace: str = "chat_mem:",
+        max_messages: Optional[int] = 200,
+        client: Optional["redis_async.Redis"] = None
     ):
         if not redis_async:
             raise RuntimeError("redis.asyncio is required for RedisChatMemory (install redis>=4.5.0)")
+        if client is None and not redis_url:
+            raise ValueError("RedisChatMemory needs a redis_url or a client")
 
-        self._client = redis_async.from_url(redis_url, decode_responses=True)
+        self._client = client or redis_async.from_url(redis_url, decode_responses=True)
         self._ttl = ttl_seconds
         self._ns = namespace
+        self._max_messages = max_messages
 
     def _key(self, conversation_id: str) -> str:
         """Generate namespaced Redis key."""
         return f"{self._ns}{conversation_id}"
 
+    def _summary_key(self, conversation_id: str) -> str:
+        return f"{self._ns}{conversation_id}:summary"
+
+    @staticmethod
+    def _payload(role: str, text: str) -> str:
+        return json.dumps({"ts": int(time.time()), "role": role, "text": text})
+
+    async def _push(self, conversation_id: str, *payloads: str) -> None:
+        """RPUSH, trim and refresh the TTL as one MULTI/EXEC round-trip."""
+        key = self._key(conversation_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *payloads)
+            if self._max_messages:
+                pipe.ltrim(key, -self._max_messages, -1)
+            if self._ttl:
+                pipe.expire(key, self._ttl)
+                pipe.expire(self._summary_key(conversation_id), self._ttl)
+            with REDIS_SECONDS.labels(operation="append").time():
+                await pipe.execute()
+
     async def append_message(self, conversation_id: str, role: str, text: str) -> None:
         """Append a message to the Redis list."""
-        key = self._key(conversation_id)
-        payload = json.dumps({"ts": int(time.time()), "role": role, "text": text})
-        await self._client.rpush(key, payload)
-        await self._client.expire(key, self._ttl)
+        await self._push(conversation_id, self._payload(role, text))
+
+    async def append_turn(self, conversation_id: str, question: str, answer: str) -> None:
+        """Append a question and its answer in a single round-trip."""
+        await self._push(conversation_id, self._payload("user", question), self._payload("assistant", answer))
 
     async def get_messages(self, conversation_id: str, limit: Optional[int] = None) -> List[Dict]:
         """Retrieve the message history."""
         key = self._key(conversation_id)
-        if limit is None:
-            values = await self._client.lrange(key, 0, -1)
-        else:
-            values = await self._client.lrange(key, -limit, -1)
+        with REDIS_SECONDS.labels(operation="read").time():
+            values = await self._client.lrange(key, 0 if limit is None else -limit, -1)
         return [json.loads(v) for v in values if v]
 
     async def clear_conversation(self, conversation_id: str) -> None:
         """Delete all messages for a conversation."""
         key = self._key(conversation_id)
-        await self._client.delete(key)
+        with REDIS_SECONDS.labels(operation="clear").time():
+            await self._client.delete(key, self._summary_key(conversation_id))
+
+    async def get_summary(self, conversation_id: str) -> Optional[str]:
+        with REDIS_SECONDS.labels(operation="read").time():
+            return await self._client.get(self._summary_key(conversation_id))
+
+    async def get_history(self, conversation_id: str, limit: Optional[int] = None) -> Tuple[Optional[str], List[Dict]]:
+        """Summary and recent messages in one round-trip."""
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.get(self._summary_key(conversation_id))
+            pipe.lrange(self._key(conversation_id), -limit if limit else 0, -1)
+            with REDIS_SECONDS.labels(operation="read").time():
+                summary, values = await pipe.execute()
+        return summary, [json.loads(v) for v in values if v]
+
+    async def compact(self, conversation_id: str, summary: str, folded: int) -> None:
+        """Store the summary and drop the folded messages atomically.
+
+        Messages appended meanwhile go to the tail, so trimming from the head
+        removes only what the summary covers.
+        """
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(self._summary_key(conversation_id), summary, ex=self._ttl or None)
+            pipe.ltrim(self._key(conversation_id), folded, -1)
+            with REDIS_SECONDS.labels(operation="compact").time():
+                await pipe.execute()
+
+
+class _Conversation:
+    __slots__ = ("messages", "summary", "chars", "expires_at")
+
+    def __init__(self, max_messages: Optional[int]):
+        self.messages: deque = deque(maxlen=max_messages or None)
+        self.summary: Optional[str] = None
+        self.chars = 0
+        self.expires_at: Optional[float] = None
+
+
+class InMemoryChatMemory(BaseChatMemory):
+    """
+    Process-local chat memory for single-node deployments and tests.
+    Each conversation keeps its newest ``max_messages`` messages and expires
+    ``ttl_seconds`` after its last write. Once ``max_conversations`` or
+    ``max_total_chars`` of message text is exceeded, the least recently used
+    conversations are evicted.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = 86400,
+        max_messages: Optional[int] = 200,
+        max_conversations: int = 10000,
+        max_total_chars: Optional[int] = None
+    ):
+        self._ttl = ttl_seconds
+        self._max_messages = max_messages
+        self._max_conversations = max_conversations
+        self._max_total_chars = max_total_chars
+        self._conversations: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._total_chars = 0
+        self._lock = asyncio.Lock()
+
+    def _live(self, conversation_id: str) -> Optional[_Conversation]:
+        """Conversation if present and unexpired, marked most recently used."""
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            return None
+        if conversation.expires_at is not None and conversation.expires_at <= time.monotonic():
+            self._drop(conversation_id)
+            return None
+        self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    def _drop(self, conversation_id: str) -> None:
+        conversation = self._conversations.pop(conversation_id, None)
+        if conversation is not None:
+            self._total_chars -= conversation.chars
+
+    def _evict(self) -> None:
+        while self._conversations and (
+            len(self._conversations) > self._max_conversations
+            or (self._max_total_chars and self._total_chars > self._max_total_chars)
+        ):
+            conversation_id = next(iter(self._conversations))
+            self._drop(conversation_id)
+
+    def _append(self, conversation_id: str, messages: List[Dict]) -> None:
+        conversation = self._live(conversation_id)
+        if conversation is None:
+            conversation = self._conversations[conversation_id] = _Conversation(self._max_messages)
+        for message in messages:
+            if conversation.messages.maxlen and len(conversation.messages) == conversation.messages.maxlen:
+                dropped = len(conversation.messages[0]["text"])
+                conversation.chars -= dropped
+                self._total_chars -= dropped
+            conversation.messages.append(message)
+            conversation.chars += len(message["text"])
+            self._total_chars += len(message["text"])
+        conversation.expires_at = time.monotonic() + self._ttl if self._ttl else None
+        self._evict()
+
+    @staticmethod
+    def _message(role: str, text: str) -> Dict:
+        return {"ts": int(time.time()), "role": role, "text": text}
+
+    async def append_message(self, conversation_id: str, role: str, text: str) -> None:
+        async with self._lock:
+            self._append(conversation_id, [self._message(role, text)])
+
+    async def append_turn(self, conversation_id: str, question: str, answer: str) -> None:
+        async with self._lock:
+            self._append(conversation_id, [self._message("user", question), self._message("assistant", answer)])
+
+    async def get_messages(self, conversation_id: str, limit: Optional[int] = None) -> List[Dict]:
+        async with self._lock:
+            conversation = self._live(conversation_id)
+            if conversation is None:
+                return []
+            messages = list(conversation.messages)
+        return messages[-limit:] if limit else messages
+
+    async def clear_conversation(self, conversation_id: str) -> None:
+        async with self._lock:
+            self._drop(conversation_id)
+
+    async def get_summary(self, conversation_id: str) -> Optional[str]:
+        async with self._lock:
+            conversation = self._live(conversation_id)
+            return conversation.summary if conversation else None
+
+    async def compact(self, conversation_id: str, summary: str, folded: int) -> None:
+        async with self._lock:
+            conversation = self._live(conversation_id)
+            if conversation is None:
+                return
+            removed = len(conversation.summary or "") - len(summary)
+            for _ in range(min(folded, len(conversation.messages))):
+                removed += len(conversation.messages.popleft()["text"])
+            conversation.summary = summary
+            conversation.chars -= removed
+            self._total_chars -= removed
+
+    def stats(self) -> Dict:
+        return {
+            "conversations": len(self._conversations),
+            "max_conversations": self._max_conversations,
+            "total_chars": self._total_chars,
+            "max_total_chars": self._max_total_chars,
+        }
@@ -0,0 +1,125 @@
+"""Process-wide registry of open Chroma collections"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import chromadb
+from chromadb.errors import NotFoundError
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+from app.config.exceptions import CollectionNotFoundError
+from app.config.logger import logger
+
+
+class CollectionRegistry:
+    """
+    Open Chroma collections keyed by name, all sharing one persistent client.
+    New collections are created in cosine space.
+    Handles are kept in LRU order; the least recently used ones are dropped
+    once more than ``max_open`` are open or after ``idle_ttl_seconds`` unused.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str,
+        embeddings: Embeddings,
+        max_open: int = 32,
+        idle_ttl_seconds: Optional[float] = None
+    ):
+        if max_open < 1:
+            raise ValueError("At least one open collection is required")
+        self.persist_dir = persist_dir
+        self.embeddings = embeddings
+        self.max_open = max_open
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._client = None
+        self._handles: "OrderedDict[str, Tuple[Chroma, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def client(self):
+        """The persistent Chroma client shared by every collection"""
+        with self._lock:
+            if self._client is None:
+                self._client = chromadb.PersistentClient(path=self.persist_dir)
+            return self._client
+
+    def get(self, name: str, create: bool = True) -> Chroma:
+        """Return the open handle for ``name``, opening the collection on a miss.
+
+        A missing collection is created only when ``create`` is set; otherwise
+        ``CollectionNotFoundError`` is raised.
+        """
+        client = self.client
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._handles.get(name)
+            if entry is not None:
+                self._handles[name] = (entry[0], now)
+                self._handles.move_to_end(name)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        if not create:
+            try:
+                client.get_collection(name)
+            except NotFoundError:
+                raise CollectionNotFoundError(f"Collection '{name}' does not exist")
+        logger.info(f"Opening Chroma collection: {name}")
+        # The metadata only applies when the collection is created
+        vectorstore = Chroma(
+            collection_name=name,
+            embedding_function=self.embeddings,
+            client=client,
+            collection_metadata={"hnsw:space": "cosine"}
+        )
+
+        with self._lock:
+            # Another thread may have opened the same collection meanwhile
+            entry = self._handles.get(name)
+            if entry is not None:
+                vectorstore = entry[0]
+            self._handles[name] = (vectorstore, now)
+            self._handles.move_to_end(name)
+            while len(self._handles) > self.max_open:
+                evicted, _ = self._handles.popitem(last=False)
+                self._evictions += 1
+                logger.debug(f"Closed least recently used collection handle: {evicted}")
+        return vectorstore
+
+    def _evict_idle(self, now: float) -> None:
+        if not self.idle_ttl_seconds:
+            return
+        while self._handles:
+            name, (_, last_used) = next(iter(self._handles.items()))
+            if now - last_used < self.idle_ttl_seconds:
+                break
+            self._handles.popitem(last=False)
+            self._evictions += 1
+            logger.debug(f"Closed idle collection handle: {name}")
+
+    def warm_up(self, names: Iterable[str]) -> None:
+        """Open collections ahead of the first request that needs them"""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Warm-up of collection '{name}' failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "open": len(self._handles),
+                "max_open": self.max_open,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,237 @@
+"""Background ingestion job queue with locally persisted job state"""
+
+import glob
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+from app.config.exceptions import IngestionQueueFullError
+from app.config.logger import logger
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Counters reported while a job runs
+PROGRESS_FIELDS = (
+    "pages_parsed", "chunks_total", "chunks_embedded", "chunks_written", "chunks_skipped", "chunks_deleted",
+    "files_total", "files_indexed", "pages_per_sec", "chunks_per_sec"
+)
+
+# Handler signature: handler(job, progress) where progress(**counters) records progress
+JobHandler = Callable[[Dict, Callable[..., None]], None]
+
+
+class IngestionJobQueue:
+    """
+    Bounded queue of ingestion jobs processed by a fixed pool of worker threads.
+    Every job has a JSON state file and a spooled upload in ``job_dir``
+    (a directory of uploads for bulk jobs);
+    unfinished jobs are re-queued from those files when the queue starts.
+    Finished jobs are kept for ``finished_ttl_seconds`` and at most
+    ``max_finished`` of them, after which their state is removed.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        job_dir: str,
+        workers: int = 2,
+        max_queued: int = 16,
+        finished_ttl_seconds: Optional[float] = None,
+        max_finished: Optional[int] = None
+    ):
+        if workers < 1:
+            raise ValueError("At least one ingestion worker is required")
+
+        self._handler = handler
+        self._job_dir = job_dir
+        self._workers = workers
+        self._finished_ttl = finished_ttl_seconds
+        self._max_finished = max_finished
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_queued)
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        os.makedirs(job_dir, exist_ok=True)
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self._job_dir, f"{job_id}.json")
+
+    def upload_path(self, job_id: str) -> str:
+        """Where the spooled upload of a job is stored"""
+        return os.path.join(self._job_dir, f"{job_id}.pdf")
+
+    def upload_dir(self, job_id: str) -> str:
+        """Where the spooled uploads of a bulk job are stored"""
+        return os.path.join(self._job_dir, f"{job_id}.files")
+
+    def _has_upload(self, job_id: str) -> bool:
+        return os.path.exists(self.upload_path(job_id)) or os.path.isdir(self.upload_dir(job_id))
+
+    def _remove_upload(self, job_id: str) -> None:
+        upload = self.upload_path(job_id)
+        if os.path.exists(upload):
+            os.unlink(upload)
+        shutil.rmtree(self.upload_dir(job_id), ignore_errors=True)
+
+    def _persist(self, job: Dict) -> None:
+        path = self._state_path(job["job_id"])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def _update(self, job_id: str, **fields) -> Dict:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            job["updated_at"] = time.time()
+            self._persist(job)
+            return dict(job)
+
+    def start(self) -> None:
+        """Start the workers and re-queue jobs left unfinished by a previous run"""
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._work, name=f"ingestion-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        pending = self._load_jobs()
+        if pending:
+            logger.info("Recovering %d unfinished ingestion jobs", len(pending))
+            # Blocking puts run off the caller's thread since the queue is bounded
+            threading.Thread(
+                target=lambda: [self._queue.put(job_id) for job_id in pending],
+                name="ingestion-recovery",
+                daemon=True
+            ).start()
+        logger.info("IngestionJobQueue started with %d workers", self._workers)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the workers to exit after their current job"""
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads.clear()
+
+    def _load_jobs(self) -> List[str]:
+        """Load persisted job states, returning IDs of jobs that must run again"""
+        pending = []
+        for path in sorted(glob.glob(os.path.join(self._job_dir, "*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable job state '%s': %s", path, e)
+                continue
+
+            with self._lock:
+                self._jobs[job["job_id"]] = job
+            if job["status"] in (QUEUED, RUNNING):
+                if self._has_upload(job["job_id"]):
+                    self._update(job["job_id"], status=QUEUED, **{field: 0 for field in PROGRESS_FIELDS})
+                    pending.append(job["job_id"])
+                else:
+                    self._update(job["job_id"], status=FAILED, error="Upload was lost before processing")
+        self._prune_finished()
+        return pending
+
+    def _prune_finished(self) -> None:
+        """Forget finished jobs past the TTL or beyond the retained count, oldest first"""
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job["status"] in (COMPLETED, FAILED)),
+                key=lambda job: job["updated_at"]
+            )
+            expired = []
+            if self._finished_ttl is not None:
+                cutoff = time.time() - self._finished_ttl
+                expired = [job for job in finished if job["updated_at"] < cutoff]
+            if self._max_finished is not None:
+                expired = finished[:max(len(expired), len(finished) - self._max_finished)]
+            for job in expired:
+                del self._jobs[job["job_id"]]
+
+        for job in expired:
+            try:
+                os.unlink(self._state_path(job["job_id"]))
+            except FileNotFoundError:
+                pass
+        if expired:
+            logger.info("Pruned %d finished ingestion jobs", len(expired))
+
+    def create_job(self, filename: str, collection_name: str, options: Optional[Dict] = None) -> Dict:
+        """Register a job whose upload will be written to ``upload_path(job_id)``"""
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "filename": filename,
+            "collection_name": collection_name,
+            "options": options or {},
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            **{field: 0 for field in PROGRESS_FIELDS},
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._persist(job)
+        return dict(job)
+
+    def describe_job(self, job_id: str, filename: str, options: Dict) -> Dict:
+        """Set the name and options of a job whose uploads were only known while spooling"""
+        return self._update(job_id, filename=filename, options=options)
+
+    def enqueue(self, job_id: str) -> Dict:
+        """Hand a created job to the workers, rejecting it when the queue is full"""
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            self.discard(job_id)
+            raise IngestionQueueFullError("Ingestion queue is full, please retry later")
+        logger.info("Queued ingestion job %s", job_id)
+        return self.get(job_id)
+
+    def discard(self, job_id: str) -> None:
+        """Forget a job that never ran and remove its files"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+        state = self._state_path(job_id)
+        if os.path.exists(state):
+            os.unlink(state)
+        self._remove_upload(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            job = self._update(job_id, status=RUNNING, error=None)
+            logger.info("Ingestion job %s started for '%s'", job_id, job["filename"])
+            try:
+                self._handler(job, lambda **counters: self._update(job_id, **counters))
+                self._update(job_id, status=COMPLETED)
+                logger.info("Ingestion job %s completed", job_id)
+            except Exception as e:
+                logger.exception("Ingestion job %s failed: %s", job_id, e)
+                self._update(job_id, status=FAILED, error=str(e))
+            finally:
+                self._remove_upload(job_id)
+                self._prune_finished()
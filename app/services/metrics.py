@@ -0,0 +1,149 @@
+"""Prometheus metrics for the ingestion and query pipelines.
+
+Label values always come from fixed sets defined in code (stage, tool and
+cache names, route templates), never from request content, so the number of
+series stays bounded.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Pipeline stages timed by ``stage_timer``
+STAGES = (
+    "embed_query", "embed_documents", "dense_search", "keyword_search", "rerank", "context",
+    "answer_cache", "llm", "memory_load", "memory_save", "pdf_parse",
+)
+
+# Latency buckets in seconds, from cache hits to slow agent runs
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds", "Time spent in one pipeline stage", ["stage"], buckets=_LATENCY_BUCKETS
+)
+STAGE_IN_FLIGHT = Gauge("rag_stage_in_flight", "Work items holding a stage executor slot", ["stage"])
+HTTP_SECONDS = Histogram(
+    "rag_http_request_duration_seconds", "HTTP request time until the response body is sent",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("rag_http_requests_in_flight", "HTTP requests being processed")
+
+LLM_CALL_SECONDS = Histogram(
+    "rag_llm_call_duration_seconds", "Duration of one chat model call", buckets=_LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("rag_llm_tokens_total", "Chat model tokens, as reported or estimated", ["kind"])
+AGENT_ITERATIONS = Histogram(
+    "rag_agent_iterations", "Reasoning steps taken per agent run", buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15)
+)
+ROUTES = Counter("rag_answer_route_total", "Answers by route", ["route"])
+TOOL_SECONDS = Histogram(
+    "rag_tool_duration_seconds", "Duration of agent tool calls", ["tool", "outcome"], buckets=_LATENCY_BUCKETS
+)
+
+PAGES_PARSED = Counter("rag_pages_parsed_total", "PDF pages parsed")
+TEXTS_EMBEDDED = Counter("rag_texts_embedded_total", "Texts run through the embedding model", ["kind"])
+CHUNKS_WRITTEN = Counter("rag_chunks_written_total", "Chunks written to the vector store")
+CHUNKS_SKIPPED = Counter("rag_chunks_skipped_total", "Chunks skipped because they were already indexed")
+CHUNKS_DELETED = Counter("rag_chunks_deleted_total", "Stale chunks deleted from the vector store")
+
+REDIS_SECONDS = Histogram(
+    "rag_redis_chat_memory_duration_seconds", "Redis chat memory round trips", ["operation"],
+    buckets=_LATENCY_BUCKETS
+)
+
+for _stage in STAGES:
+    STAGE_SECONDS.labels(stage=_stage)
+
+
+def stage_timer(stage: str):
+    """Context manager observing the duration of one pipeline stage"""
+    if stage not in STAGES:
+        raise ValueError(f"Unknown metrics stage: {stage}")
+    return STAGE_SECONDS.labels(stage=stage).time()
+
+
+def _estimate_tokens(text: str) -> int:
+    # Same rough ratio as the context assembler's fallback counter
+    return max(1, len(text) // 4) if text else 0
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records chat model call latency and token counts.
+
+    Uses the usage metadata the model reports and falls back to a character
+    estimate for models that report none.
+    """
+
+    def __init__(self):
+        self._started: Dict[UUID, float] = {}
+        self._prompt_chars: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any) -> None:
+        chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+            self._prompt_chars[run_id] = chars
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            prompt_chars = self._prompt_chars.pop(run_id, 0)
+        if started is not None:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started)
+
+        generations = [generation for batch in response.generations for generation in batch]
+        usage = next(
+            (getattr(g.message, "usage_metadata", None) for g in generations if hasattr(g, "message")), None
+        )
+        if usage:
+            LLM_TOKENS.labels(kind="prompt").inc(usage.get("input_tokens", 0))
+            LLM_TOKENS.labels(kind="completion").inc(usage.get("output_tokens", 0))
+        else:
+            LLM_TOKENS.labels(kind="prompt").inc(prompt_chars // 4)
+            LLM_TOKENS.labels(kind="completion").inc(sum(_estimate_tokens(g.text) for g in generations))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._started.pop(run_id, None)
+            self._prompt_chars.pop(run_id, None)
+
+
+class CacheStatsCollector(Collector):
+    """Exposes hits, misses and hit ratio of the caches reported by ``provider`` at scrape time"""
+
+    def __init__(self, provider: Callable[[], Dict[str, Optional[Dict]]]):
+        self.provider = provider
+
+    def collect(self) -> Iterator:
+        hits = CounterMetricFamily("rag_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("rag_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("rag_cache_hit_ratio", "Cache hits over lookups", labels=["cache"])
+        for name, stats in self.provider().items():
+            if not stats:
+                continue
+            hits.add_metric([name], stats.get("hits", 0))
+            misses.add_metric([name], stats.get("misses", 0))
+            ratio.add_metric([name], stats.get("hit_ratio", 0.0))
+        yield hits
+        yield misses
+        yield ratio
+
+
+_collector: Optional[CacheStatsCollector] = None
+_collector_lock = threading.Lock()
+
+
+def register_cache_stats(provider: Callable[[], Dict[str, Optional[Dict]]]) -> None:
+    """Register the cache stats provider once per process"""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            _collector = CacheStatsCollector(provider)
+            REGISTRY.register(_collector)
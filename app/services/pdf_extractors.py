@@ -0,0 +1,165 @@
+"""Pluggable PDF text extractors and parallel page extraction"""
+
+import io
+import mmap
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
+from pypdf import PdfReader
+from app.config.logger import logger
+
+# A PDF held in memory, or the path of one on disk (which is memory-mapped)
+PDFSource = Union[str, bytes, bytearray, memoryview]
+
+
+class BasePDFExtractor(ABC):
+    """Extracts the text of a page range from an in-memory PDF buffer."""
+
+    name: str = "base"
+
+    @abstractmethod
+    def page_count(self, buffer) -> int:
+        ...
+
+    @abstractmethod
+    def iter_pages(self, buffer, start: int, stop: int) -> Iterator[str]:
+        """Lazily yield the text of pages ``start`` (inclusive) to ``stop`` (exclusive)."""
+        ...
+
+    def extract_pages(self, buffer, start: int, stop: int) -> List[str]:
+        return list(self.iter_pages(buffer, start, stop))
+
+
+class PyPDFExtractor(BasePDFExtractor):
+    """Pure-Python extractor built on pypdf (same backend as PyPDFLoader)."""
+
+    name = "pypdf"
+
+    @staticmethod
+    def _reader(buffer) -> PdfReader:
+        # mmap objects are file-like and are read in place; plain bytes are wrapped
+        stream = buffer if isinstance(buffer, mmap.mmap) else io.BytesIO(buffer)
+        return PdfReader(stream)
+
+    def page_count(self, buffer) -> int:
+        return len(self._reader(buffer).pages)
+
+    def iter_pages(self, buffer, start: int, stop: int) -> Iterator[str]:
+        reader = self._reader(buffer)
+        for i in range(start, stop):
+            yield reader.pages[i].extract_text() or ""
+
+
+class PyMuPDFExtractor(BasePDFExtractor):
+    """Faster MuPDF-based extractor; requires the optional ``pymupdf`` package."""
+
+    name = "pymupdf"
+
+    @staticmethod
+    def _open(buffer):
+        try:
+            import pymupdf
+        except ImportError as e:
+            raise RuntimeError("pymupdf is required for the 'pymupdf' PDF extractor (pip install pymupdf)") from e
+        return pymupdf.open(stream=memoryview(buffer), filetype="pdf")
+
+    def page_count(self, buffer) -> int:
+        with self._open(buffer) as doc:
+            return doc.page_count
+
+    def iter_pages(self, buffer, start: int, stop: int) -> Iterator[str]:
+        with self._open(buffer) as doc:
+            for i in range(start, stop):
+                yield doc[i].get_text()
+
+
+EXTRACTORS: Dict[str, Type[BasePDFExtractor]] = {
+    PyPDFExtractor.name: PyPDFExtractor,
+    PyMuPDFExtractor.name: PyMuPDFExtractor,
+}
+
+
+def get_extractor(name: str) -> BasePDFExtractor:
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor '{name}'. Available: {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name]()
+
+
+@contextmanager
+def open_buffer(source: PDFSource) -> Iterator[Union[mmap.mmap, bytes, bytearray, memoryview]]:
+    """Yield a zero-copy view of the PDF: a read-only mmap for paths, the buffer itself otherwise"""
+    if not isinstance(source, str):
+        yield source
+        return
+
+    with open(source, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _extract_range_from_file(extractor_name: str, path: str, start: int, stop: int) -> List[str]:
+    """Process-pool task: each worker maps the file itself, so no page data is copied in"""
+    with open_buffer(path) as buffer:
+        return get_extractor(extractor_name).extract_pages(buffer, start, stop)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """Process-wide pool used to extract page ranges in parallel"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def iter_page_texts(
+    source: PDFSource,
+    extractor_name: str = "pypdf",
+    workers: int = 0,
+    pages_per_task: int = 8,
+    parallel_min_pages: int = 16
+) -> Iterator[Tuple[int, int, str]]:
+    """Yield ``(page_index, total_pages, text)`` in page order as soon as each range is extracted.
+
+    Files with at least ``parallel_min_pages`` pages are split into ranges of
+    ``pages_per_task`` pages that are extracted concurrently on a process pool;
+    in-memory buffers and small files are extracted in this process.
+    """
+    extractor = get_extractor(extractor_name)
+    with open_buffer(source) as buffer:
+        total = extractor.page_count(buffer)
+
+        if not isinstance(source, str) or total < parallel_min_pages:
+            for page, text in enumerate(extractor.iter_pages(buffer, 0, total)):
+                yield page, total, text
+            return
+
+    pool = get_process_pool(workers)
+    starts = list(range(0, total, pages_per_task))
+    futures = [
+        pool.submit(_extract_range_from_file, extractor_name, source, start, min(start + pages_per_task, total))
+        for start in starts
+    ]
+    logger.debug("Extracting %d pages in %d parallel tasks", total, len(futures))
+    try:
+        for start, future in zip(starts, futures):
+            for offset, text in enumerate(future.result()):
+                yield start + offset, total, text
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,85 @@
+"""Bounded executors for the stages of the query pipeline"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+from app.config.config import get_settings
+from app.config.logger import logger
+from app.services.metrics import STAGE_IN_FLIGHT
+
+
+class StageExecutor:
+    """Runs work for one pipeline stage with a fixed concurrency limit.
+
+    Blocking callables are pushed onto a dedicated thread pool so they never
+    run on the event loop; native coroutines only share the concurrency limit.
+    """
+
+    def __init__(self, name: str, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError(f"Concurrency limit for stage '{name}' must be at least 1")
+
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix=f"{name}-stage"
+        )
+        self._in_flight = STAGE_IN_FLIGHT.labels(stage=name)
+        logger.info("StageExecutor '%s' created with concurrency %d", name, max_concurrency)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable on the stage thread pool."""
+        async with self.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def run_async(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await a coroutine function under the stage concurrency limit."""
+        async with self.slot():
+            return await func(*args, **kwargs)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Async context manager holding one concurrency slot, for streamed work."""
+        async with self._semaphore:
+            with self._in_flight.track_inprogress():
+                yield
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Maps each stage to the Settings field holding its concurrency limit
+_STAGE_LIMITS = {
+    "retrieval": "RETRIEVAL_MAX_CONCURRENCY",
+    "rerank": "RERANK_MAX_CONCURRENCY",
+    "llm": "LLM_MAX_CONCURRENCY",
+}
+
+_stages: Dict[str, StageExecutor] = {}
+_stages_lock = threading.Lock()
+
+
+def get_stage_executor(name: str) -> StageExecutor:
+    """Process-wide StageExecutor for the named stage"""
+    if name not in _STAGE_LIMITS:
+        raise ValueError(f"Unknown pipeline stage: {name}")
+
+    with _stages_lock:
+        if name not in _stages:
+            limit = getattr(get_settings(), _STAGE_LIMITS[name])
+            _stages[name] = StageExecutor(name, limit)
+        return _stages[name]
+
+
+def shutdown_stage_executors() -> None:
+    """Stop all stage thread pools (called at application shutdown)"""
+    with _stages_lock:
+        for stage in _stages.values():
+            stage.shutdown()
+        _stages.clear()
@@ -0,0 +1,50 @@
+"""Keep-alive HTTP client shared by the agent tools"""
+
+import re
+import threading
+from typing import Optional
+import httpx
+from app.config.config import get_settings
+from app.config.logger import logger
+
+
+class ToolHttpClient:
+    """
+    Process-wide ``httpx.AsyncClient`` so tool calls reuse pooled keep-alive
+    connections instead of opening one per call. Timeouts are passed per
+    request by each tool.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            with cls._lock:
+                if cls._client is None or cls._client.is_closed:
+                    settings = get_settings()
+                    cls._client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.TOOL_HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.TOOL_HTTP_MAX_KEEPALIVE,
+                            keepalive_expiry=settings.TOOL_HTTP_KEEPALIVE_SECONDS,
+                        ),
+                        timeout=settings.TOOL_HTTP_DEFAULT_TIMEOUT_SECONDS,
+                    )
+                    logger.info("Created shared tool HTTP client")
+        return cls._client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        with cls._lock:
+            client, cls._client = cls._client, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("Closed shared tool HTTP client")
+
+
+def normalize_argument(value: str) -> str:
+    """Cache key form of a tool argument: trimmed, lowercased, single-spaced"""
+    return re.sub(r"\s+", " ", value.strip().lower())
+
@@ -1,38 +1,51 @@
-import http.client
-import json
+from typing import Optional
+from urllib.parse import urlparse
+import httpx
 from app.config.config import get_settings
+from app.config.exceptions import ToolError
 from app.config.logger import logger
+from app.services.lru_cache import LRUCache
+from app.services.tools.http_client import ToolHttpClient, normalize_argument
 
 class NewsTool:
     """Fetch latest business news headlines using RapidAPI's Google News API."""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         settings = get_settings()
         self.api_key = settings.RAPIDAPI_KEY
-        self.host = "google-news13.p.rapidapi.com"
+        self.base_url = settings.NEWS_API_BASE_URL.rstrip("/")
+        self.host = urlparse(self.base_url).netloc
+        self.timeout = settings.NEWS_TIMEOUT_SECONDS
+        self.client = client
+        self.cache = LRUCache(settings.TOOL_CACHE_SIZE, ttl_seconds=settings.NEWS_CACHE_TTL_SECONDS)
         logger.info("Initialized NewsTool with host: %s", self.host)
 
-    def get_news(self, category: str = "business", language: str = "en-US") -> str:
+    async def get_news(self, category: str = "business", language: str = "en-US") -> str:
         """Fetch latest news headlines for a given category."""
         logger.info("Fetching news for category: %s (language: %s)", category, language)
+        key = (normalize_argument(category), normalize_argument(language))
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("Serving %s news from cache", category)
+            return cached
+
         try:
-            conn = http.client.HTTPSConnection(self.host)
             headers = {
                 "x-rapidapi-key": self.api_key,
                 "x-rapidapi-host": self.host,
             }
 
-            endpoint = f"/{category}?lr={language}"
+            endpoint = f"{self.base_url}/{category}"
             logger.debug("Sending GET request to endpoint: %s", endpoint)
-            conn.request("GET", endpoint, headers=headers)
-            res = conn.getresponse()
-            data = res.read()
-            conn.close()
-            if res.status != 200:
-                logger.warning("Non-200 response: %d %s", res.status, res.reason)
-                return f"Failed to fetch {category} news. API responded with status {res.status}."
-
-            result = json.loads(data.decode("utf-8"))
+            client = self.client or ToolHttpClient.get()
+            res = await client.get(endpoint, params={"lr": language}, headers=headers, timeout=self.timeout)
+            if res.status_code >= 500 or res.status_code == 429:
+                raise ToolError(f"news API responded with status {res.status_code}")
+            if res.status_code != 200:
+                logger.warning("Non-200 response: %d %s", res.status_code, res.reason_phrase)
+                return f"Failed to fetch {category} news. API responded with status {res.status_code}."
+
+            result = res.json()
             logger.debug("API response received successfully for category: %s", category)
             # print("news",result)
             articles = result.get("items", [])[:5]
@@ -44,8 +57,14 @@ class NewsTool:
                 [f"- {a.get('title', 'No title')} ({a.get('link', '')})" for a in articles]
             )
             logger.info("Fetched %d news articles for category: %s", len(articles), category)
-            return f"📰 Top {category.capitalize()} News:\n{news_text}"
+            news = f"📰 Top {category.capitalize()} News:\n{news_text}"
+            self.cache.set(key, news)
+            return news
+
+        except httpx.TimeoutException as e:
+            logger.error("Timed out after %ss fetching %s news: %s", self.timeout, category, e)
+            raise ToolError(f"timed out fetching {category} news")
 
-        except Exception as e:
-            logger.exception("Error fetching %s news: %s", category, e)
-            return f"Error fetching {category} news: {str(e)}"
+        except httpx.HTTPError as e:
+            logger.error("Network error fetching %s news: %s", category, e)
+            raise ToolError(f"network error fetching {category} news: {e}")
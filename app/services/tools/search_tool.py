@@ -0,0 +1,35 @@
+import asyncio
+from typing import Callable, Optional
+from langchain_community.tools import DuckDuckGoSearchResults
+from app.config.config import get_settings
+from app.config.logger import logger
+from app.services.lru_cache import LRUCache
+from app.services.tools.http_client import normalize_argument
+
+
+class SearchTool:
+    """Web search through DuckDuckGo with a per-query TTL cache.
+
+    The DuckDuckGo client is synchronous and manages its own HTTP session,
+    so one instance is reused and each search runs in a worker thread; the
+    tool executor bounds how long a search may take.
+    """
+
+    def __init__(self, search: Optional[Callable[[str], str]] = None):
+        settings = get_settings()
+        self.search = search or DuckDuckGoSearchResults().run
+        self.cache = LRUCache(settings.TOOL_CACHE_SIZE, ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS)
+
+    async def search_web(self, query: str) -> str:
+        key = normalize_argument(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("Serving web search from cache for query: %.80s...", query)
+            return cached
+
+        logger.info("Performing web search for query: %.80s...", query)
+        result = await asyncio.to_thread(self.search, query)
+        logger.debug("DuckDuckGo returned result length: %d", len(result) if result else 0)
+        if result:
+            self.cache.set(key, result)
+        return result
@@ -0,0 +1,162 @@
+"""Deadlines, circuit breakers and concurrent execution for agent tool calls"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config.exceptions import ToolError
+from app.config.logger import logger
+from app.services.metrics import TOOL_SECONDS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_seconds``; then a single trial call is let through, which
+    closes the breaker on success or reopens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self) -> None:
+        """Give up a call's slot without a verdict, e.g. when it was cancelled"""
+        with self._lock:
+            self._trial_running = False
+
+
+class ToolExecutor:
+    """
+    Runs tool coroutines under a per-tool deadline and circuit breaker.
+
+    Failures (a ToolError, any other exception, or the deadline passing)
+    are turned into a short message for the agent instead of propagating,
+    and count towards the tool's breaker. While a breaker is open the tool
+    answers "unavailable" immediately.
+    """
+
+    def __init__(
+        self,
+        deadlines: Dict[str, float],
+        default_deadline: float = 10.0,
+        failure_threshold: int = 3,
+        reset_seconds: float = 30.0
+    ):
+        self.deadlines = deadlines
+        self.default_deadline = default_deadline
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+                self._counters[name] = {"calls": 0, "failures": 0, "timeouts": 0, "rejected": 0}
+            return self._breakers[name]
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            self._counters[name][counter] += 1
+
+    async def run(self, name: str, call: Callable[..., Awaitable[str]], *args: Any) -> str:
+        """Result of ``call(*args)``, or a message saying why the tool gave none"""
+        breaker = self._breaker(name)
+        if not breaker.allow():
+            self._count(name, "rejected")
+            TOOL_SECONDS.labels(tool=name, outcome="rejected").observe(0)
+            logger.warning("Circuit open for tool %s; rejecting call", name)
+            return f"Tool {name} is temporarily unavailable after repeated failures. Do not retry it now."
+
+        self._count(name, "calls")
+        deadline = self.deadlines.get(name, self.default_deadline)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await asyncio.wait_for(call(*args), timeout=deadline)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            self._count(name, "timeouts")
+            self._count(name, "failures")
+            breaker.record_failure()
+            logger.error("Tool %s exceeded its %.1fs deadline", name, deadline)
+            return f"Tool {name} did not respond within {deadline:g} seconds."
+        except ToolError as e:
+            self._count(name, "failures")
+            breaker.record_failure()
+            logger.error("Tool %s failed: %s", name, e)
+            return f"Tool {name} failed: {e}"
+        except Exception as e:
+            self._count(name, "failures")
+            breaker.record_failure()
+            logger.exception("Unexpected error in tool %s: %s", name, e)
+            return f"Tool {name} failed: {e}"
+        except asyncio.CancelledError:
+            # Cancellation says nothing about the tool; let the next call be the trial
+            outcome = "cancelled"
+            breaker.release()
+            raise
+        finally:
+            TOOL_SECONDS.labels(tool=name, outcome=outcome).observe(time.perf_counter() - start)
+
+        breaker.record_success()
+        return result
+
+    async def run_many(self, calls: List[Tuple[str, Callable[..., Awaitable[str]], Tuple]]) -> List[str]:
+        """Run independent ``(name, call, args)`` tool calls concurrently, results in input order"""
+        return await asyncio.gather(*(self.run(name, call, *args) for name, call, args in calls))
+
+    def stats(self) -> Dict:
+        """Per tool: breaker state, calls, failures, timeouts and calls rejected by an open breaker"""
+        with self._lock:
+            return {
+                name: {"state": breaker.state, **self._counters[name]}
+                for name, breaker in self._breakers.items()
+            }
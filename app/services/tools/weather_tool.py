@@ -1,23 +1,42 @@
 from datetime import datetime
-import requests
+from typing import Optional
+import httpx
 from app.config.config import get_settings
+from app.config.exceptions import ToolError
 from app.config.logger import logger
+from app.services.lru_cache import LRUCache
+from app.services.tools.http_client import ToolHttpClient, normalize_argument
 
 
 class WeatherTool:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         settings = get_settings()
         self.api_key = settings.OPENWEATHER_API_KEY
+        self.base_url = settings.WEATHER_API_BASE_URL.rstrip("/")
+        self.timeout = settings.WEATHER_TIMEOUT_SECONDS
+        self.client = client
+        self.cache = LRUCache(settings.TOOL_CACHE_SIZE, ttl_seconds=settings.WEATHER_CACHE_TTL_SECONDS)
         logger.info("Initialized WeatherTool with OpenWeather API key: %s...", self.api_key[:5] + "***")
-    def get_weather(self, city: str) -> str:
+
+    async def get_weather(self, city: str) -> str:
         """Fetch real-time weather data for a given city."""
+        key = normalize_argument(city)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("Serving weather for %s from cache", city)
+            return cached
+
         try:
-            url = (
-                f"http://api.openweathermap.org/data/2.5/weather?"
-                f"q={city}&appid={self.api_key}&units=metric"
+            url = f"{self.base_url}/weather"
+            logger.debug("Sending request to OpenWeather API: %s?q=%s", url, city)
+            client = self.client or ToolHttpClient.get()
+            resp = await client.get(
+                url,
+                params={"q": city, "appid": self.api_key, "units": "metric"},
+                timeout=self.timeout,
             )
-            logger.debug("Sending request to OpenWeather API: %s", url)
-            resp = requests.get(url, timeout=10)
+            if resp.status_code >= 500 or resp.status_code == 429:
+                raise ToolError(f"OpenWeather responded with status {resp.status_code}")
             data = resp.json()
 
             if resp.status_code != 200:
@@ -41,18 +60,20 @@ class WeatherTool:
                 desc,
                 temp,
             )
-            return (
+            report = (
                 f"🌤️ **Weather in {city_name}:** {desc}\n\n"
                 f"🌡️ Temperature: {temp}°C (feels like {feels}°C)\n"
                 f"💧 Humidity: {humidity}%\n"
                 f"💨 Wind Speed: {wind} m/s\n"
                 f"🕒 Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             )
+            self.cache.set(key, report)
+            return report
 
-        except requests.exceptions.RequestException as e:
-            logger.error("Network error while fetching weather for %s: %s", city, e)
-            return f"⚠️ Network error while fetching weather for **{city}**: {e}"
+        except httpx.TimeoutException as e:
+            logger.error("Timed out after %ss fetching weather for %s: %s", self.timeout, city, e)
+            raise ToolError(f"timed out fetching weather for {city}")
 
-        except Exception as e:
-            logger.exception("Unexpected error fetching weather for %s: %s", city, e)
-            return f"⚠️ Error fetching weather for **{city}**: {e}"
+        except httpx.HTTPError as e:
+            logger.error("Network error while fetching weather for %s: %s", city, e)
+            raise ToolError(f"network error fetching weather for {city}: {e}")
@@ -0,0 +1,186 @@
+"""Streaming of uploaded files to disk in fixed-size blocks"""
+
+import asyncio
+import os
+from collections import deque
+from typing import AsyncIterator, Awaitable, Deque, Optional, Protocol, Tuple
+from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+from app.config.exceptions import FileTooLargeError, InvalidFileTypeError
+from app.config.logger import logger
+
+PDF_MAGIC = b"%PDF-"
+
+# Leading bytes of the archive formats accepted by bulk ingestion; plain tar has no magic at offset 0
+ARCHIVE_MAGIC = {
+    ".zip": b"PK\x03\x04",
+    ".tar": b"",
+    ".tar.gz": b"\x1f\x8b",
+    ".tgz": b"\x1f\x8b",
+}
+
+
+def archive_suffix(filename: str) -> Optional[str]:
+    """The archive suffix of a filename, or None when it is not an accepted archive"""
+    name = filename.lower()
+    return next((suffix for suffix in sorted(ARCHIVE_MAGIC, key=len, reverse=True) if name.endswith(suffix)), None)
+
+
+class AsyncReadable(Protocol):
+    """Anything with an async ``read(size)``, such as FastAPI's UploadFile"""
+
+    def read(self, size: int = -1) -> Awaitable[bytes]:
+        ...
+
+
+async def spool_upload(
+    upload: AsyncReadable,
+    dest_path: str,
+    max_bytes: int,
+    block_size: int = 1024 * 1024,
+    magic: bytes = PDF_MAGIC,
+    kind: str = "PDF"
+) -> int:
+    """Copy an upload to ``dest_path`` one block at a time and return its size.
+
+    At most one block is held in memory, so memory use does not grow with the
+    file size. The upload is rejected as soon as its first bytes do not match
+    ``magic`` or its size passes ``max_bytes``; the partial file is removed.
+    """
+    written = 0
+    try:
+        with open(dest_path, "wb") as out:
+            header = await upload.read(len(magic) or block_size)
+            if not header.startswith(magic):
+                raise InvalidFileTypeError(f"Uploaded file is not a valid {kind}")
+            block = header
+
+            while block:
+                written += len(block)
+                if written > max_bytes:
+                    raise FileTooLargeError(f"File exceeds the maximum upload size of {max_bytes} bytes")
+                await asyncio.to_thread(out.write, block)
+                block = await upload.read(block_size)
+
+        logger.debug(f"Spooled {written} bytes to {dest_path}")
+        return written
+
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.unlink(dest_path)
+        raise
+
+
+class MultipartFileStream:
+    """
+    The file parts of a multipart/form-data request body, parsed as the body
+    arrives. Each part is handed out as an ``AsyncReadable`` reading straight
+    from the request, so an upload is written to disk once, by
+    ``spool_upload``, instead of being spooled by the framework first.
+    At most one received chunk is buffered at a time.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], content_type: str, field_name: str):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise InvalidFileTypeError("Upload must be sent as multipart/form-data")
+
+        self._chunks = chunks
+        self._field_name = field_name
+        self._events: Deque[Tuple[str, bytes]] = deque()
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._finished = False
+        self._parser = MultipartParser(boundary, {
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": lambda: self._events.append(("part", self._headers.pop(b"content-disposition", b""))),
+            "on_part_begin": self._headers.clear,
+            "on_part_data": lambda data, start, end: self._events.append(("data", bytes(data[start:end]))),
+            "on_part_end": lambda: self._events.append(("end", b"")),
+        })
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    async def _next_event(self) -> Optional[Tuple[str, bytes]]:
+        while not self._events:
+            if self._finished:
+                return None
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._finished = True
+                chunk = b""
+            try:
+                if chunk:
+                    self._parser.write(chunk)
+                else:
+                    self._parser.finalize()
+            except MultipartParseError as e:
+                raise InvalidFileTypeError(f"Malformed multipart body: {e}")
+        return self._events.popleft()
+
+    async def __aiter__(self) -> AsyncIterator[Tuple["MultipartPart", str]]:
+        """Yield ``(part, filename)`` for each file in ``field_name``; other fields are skipped"""
+        while True:
+            event = await self._next_event()
+            if event is None:
+                return
+            kind, disposition = event
+            if kind != "part":
+                continue
+            _, options = parse_options_header(disposition)
+            filename = options.get(b"filename")
+            if options.get(b"name", b"").decode("utf-8", "replace") == self._field_name and filename is not None:
+                part = MultipartPart(self)
+                yield part, os.path.basename(filename.decode("utf-8", "replace"))
+                await part.drain()
+            else:
+                await MultipartPart(self).drain()
+
+
+class MultipartPart:
+    """One file of a ``MultipartFileStream``; reads must finish before the next file is requested"""
+
+    def __init__(self, stream: MultipartFileStream):
+        self._stream = stream
+        self._buffer = bytearray()
+        self._ended = False
+
+    async def _pull(self) -> Optional[bytes]:
+        """The next block of the part, or None at its end"""
+        if self._ended:
+            return None
+        event = await self._stream._next_event()
+        if event is None or event[0] == "end":
+            self._ended = True
+            return None
+        return event[1]
+
+    async def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            block = await self._pull()
+            if block is None:
+                break
+            self._buffer += block
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def drain(self) -> None:
+        """Skip the rest of the part without keeping it"""
+        self._buffer.clear()
+        while await self._pull() is not None:
+            pass
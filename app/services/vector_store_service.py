@@ -1,86 +1,603 @@
 """Service for ChromaDB vector store operations"""
 
 from langchain_community.vectorstores import Chroma
-from typing import List, Optional
+import hashlib
+import os
+import threading
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
 from langchain_core.documents import Document
 from app.config.config import get_settings
-from app.config.exceptions import VectorStoreError
-from app.services.ai.embeddings_service import EmbeddingsService
+from app.config.exceptions import CollectionNotFoundError, RAGException, VectorStoreError
+from app.services.ai.embeddings_service import EmbeddingsService, normalize_query
+from app.services.bm25_index import BM25Index
+from app.services.collection_registry import CollectionRegistry
+from app.services.lru_cache import LRUCache
+from app.services.metrics import CHUNKS_DELETED, CHUNKS_SKIPPED, CHUNKS_WRITTEN, stage_timer
 from app.config.logger import logger
 
+def chunk_id(doc: Document) -> str:
+    """Deterministic chunk ID from the source filename, page and chunk text"""
+    key = "\x1f".join((
+        str(doc.metadata.get("source", "")),
+        str(doc.metadata.get("page", "")),
+        doc.page_content,
+    ))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+# Chroma's distance for each hnsw:space, as returned by a collection query
+_DISTANCES = {
+    "l2": lambda a, b: float(np.sum((a - b) ** 2)),
+    "cosine": lambda a, b: float(1 - np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))),
+    "ip": lambda a, b: float(1 - np.dot(a, b)),
+}
+
+# Cosine similarity from each space's distance; l2 distances are squared,
+# so 1 - d/2 is the cosine for unit-length embeddings
+_RELEVANCE = {
+    "l2": lambda distance: 1 - distance / 2,
+    "cosine": lambda distance: 1 - distance,
+    "ip": lambda distance: 1 - distance,
+}
+
+
+def _space(vectorstore: Chroma) -> str:
+    """Distance space of a collection; collections created before cosine became the default use l2"""
+    return (vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def _clamp(score: float) -> float:
+    # Opposite or unnormalized vectors can fall outside [0, 1]
+    return min(1.0, max(0.0, score))
+
+
 class VectorStoreService:
+    # Process-wide callbacks invoked with the collection name after every write
+    _write_listeners: List[Callable[[str], None]] = []
+    # Process-wide per-collection write counters; part of every result cache key
+    _collection_versions: Dict[str, int] = {}
+    _versions_lock = threading.Lock()
+    # Process-wide registry of open collection handles, created on first use
+    _registry: Optional[CollectionRegistry] = None
+    _registry_lock = threading.Lock()
+    # Process-wide BM25 indexes over the same chunks, loaded per collection on first use
+    _keyword_indexes: Dict[str, BM25Index] = {}
+    _keyword_lock = threading.Lock()
+
     def __init__(self):
         self.settings = get_settings()
         self.embeddings = EmbeddingsService().get_embeddings()
-        self._vectorstore = None
+        self._result_cache = LRUCache(self.settings.RETRIEVAL_CACHE_SIZE)
         logger.info("VectorStoreService initialized with embeddings and configuration")
 
+    @classmethod
+    def add_write_listener(cls, listener: Callable[[str], None]) -> None:
+        """Register a callback run after documents are written to a collection"""
+        if listener not in cls._write_listeners:
+            cls._write_listeners.append(listener)
+
+    @classmethod
+    def registry(cls) -> CollectionRegistry:
+        """Collection handles shared by every VectorStoreService in the process"""
+        with cls._registry_lock:
+            if cls._registry is None:
+                settings = get_settings()
+                cls._registry = CollectionRegistry(
+                    persist_dir=settings.CHROMA_PERSIST_DIR,
+                    embeddings=EmbeddingsService().get_embeddings(),
+                    max_open=settings.CHROMA_MAX_OPEN_COLLECTIONS,
+                    idle_ttl_seconds=settings.CHROMA_COLLECTION_IDLE_SECONDS
+                )
+            return cls._registry
+
+    def warm_up(self) -> None:
+        """Open the default collection and any configured in CHROMA_WARM_COLLECTIONS, with their BM25 indexes"""
+        names = dict.fromkeys([self.settings.CHROMA_COLLECTION_NAME, *self.settings.CHROMA_WARM_COLLECTIONS])
+        self.registry().warm_up(names)
+        if self.settings.HYBRID_SEARCH_ENABLED:
+            for name in names:
+                try:
+                    self.keyword_index(name)
+                except Exception as e:
+                    logger.warning(f"Loading BM25 index of '{name}' failed: {e}")
+
+    def keyword_index(self, collection_name: Optional[str] = None) -> BM25Index:
+        """BM25 index of a collection, built from the stored chunks if it was never saved.
+
+        An index already loaded first replays what other server workers
+        saved since; such writes also invalidate this process's caches.
+        """
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        with self._keyword_lock:
+            index = self._keyword_indexes.get(collection)
+            if index is None:
+                path = os.path.join(self.settings.BM25_INDEX_DIR, f"{collection}.json")
+                index = BM25Index.load(path)
+                if not index.exists:
+                    self._build_keyword_index(index, collection)
+                self._keyword_indexes[collection] = index
+                return index
+        if index.refresh():
+            self._notify_write(collection)
+        return index
+
+    def _build_keyword_index(self, index: BM25Index, collection: str) -> None:
+        chroma_collection = self.get_or_create_vectorstore(collection)._collection
+        start = time.perf_counter()
+        batch_size = 1000
+        for offset in range(0, chroma_collection.count(), batch_size):
+            rows = chroma_collection.get(include=["documents"], limit=batch_size, offset=offset)
+            index.add_many(zip(rows["ids"], rows["documents"]))
+        index.flush()
+        logger.info(
+            f"Built BM25 index for collection {collection}: {len(index)} chunks "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    def keyword_search(
+        self,
+        query: str,
+        k: int = 3,
+        collection_name: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Chunk IDs and BM25 scores of the best keyword matches"""
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        try:
+            self.get_vectorstore(collection)
+            with stage_timer("keyword_search"):
+                return self.keyword_index(collection).search(query, k, self.settings.BM25_MIN_SCORE_RATIO)
+        except CollectionNotFoundError:
+            raise
+        except Exception as e:
+            logger.exception("Error in keyword search on '%s': %s", collection, e)
+            raise VectorStoreError(f"Error searching documents: {str(e)}")
+
+    @classmethod
+    def collection_version(cls, collection: str) -> int:
+        with cls._versions_lock:
+            return cls._collection_versions.get(collection, 0)
+
+    def _notify_write(self, collection: str) -> None:
+        """Bump the collection version and run write listeners"""
+        with self._versions_lock:
+            self._collection_versions[collection] = self._collection_versions.get(collection, 0) + 1
+        for listener in list(self._write_listeners):
+            try:
+                listener(collection)
+            except Exception as e:
+                logger.warning("Write listener failed for collection '%s': %s", collection, e)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the shared embedding model"""
+        return self.embeddings.embed_query(query)
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries in one batch with the shared embedding model"""
+        return self.embeddings.embed_queries(queries)
+
     def get_or_create_vectorstore(self, collection_name: Optional[str] = None) -> Chroma:
         """Get or create vector store"""
+        return self._open_vectorstore(collection_name, create=True)
+
+    def get_vectorstore(self, collection_name: Optional[str] = None) -> Chroma:
+        """Get an existing vector store; read paths use this so unknown names are never created"""
+        return self._open_vectorstore(collection_name, create=False)
+
+    def _open_vectorstore(self, collection_name: Optional[str], create: bool) -> Chroma:
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
         try:
-            collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
-            
-            if self._vectorstore is None:
-                logger.info(f"Creating new Chroma vector store for collection: {collection}")
-                self._vectorstore = Chroma(
-                    collection_name=collection,
-                    embedding_function=self.embeddings,
-                    persist_directory=self.settings.CHROMA_PERSIST_DIR
-                )
-            else:
-                logger.debug(f"Using existing vector store for collection: {collection}")
-            return self._vectorstore
-        
+            return self.registry().get(collection, create=create)
+
+        except CollectionNotFoundError:
+            raise
         except Exception as e:
             logger.exception(f"Error accessing or creating vector store '{collection}': {e}")
             raise VectorStoreError(f"Error accessing vector store: {str(e)}")
-    
-    def add_documents(self, documents: List[Document], collection_name: Optional[str] = None):
-        """Add documents to vector store"""
+
+    def add_documents(
+        self,
+        documents: Iterable[Document],
+        collection_name: Optional[str] = None,
+        progress_callback: Optional[Callable[..., None]] = None,
+        source: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Index documents under content-derived IDs, embedding only chunks not already stored.
+
+        ``documents`` may be a lazy iterator, so embedding starts while later
+        pages are still being parsed and chunked. When ``source`` is given the
+        documents are the complete new version of that source, and its stored
+        chunks that no longer appear are deleted afterwards, and if indexing
+        fails part way the chunks this call added are removed again, leaving
+        the previous version in place.
+        Returns the written, skipped and deleted chunk counts.
+        """
         collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        batch_size = self.settings.INGESTION_BATCH_SIZE
+        progress = progress_callback or (lambda **counters: None)
+        vectorstore = keyword_index = None
+        added: List[str] = []
         try:
-            logger.info(f"Adding {len(documents)} documents to collection: {collection}")
+            logger.info(f"Adding documents to collection: {collection}")
             vectorstore = self.get_or_create_vectorstore(collection_name)
-            
-            if vectorstore._collection.count() == 0:
-                logger.debug(f"Collection '{collection}' is empty — creating new Chroma index")
-                self._vectorstore = Chroma.from_documents(
-                    documents=documents,
-                    embedding=self.embeddings,
-                    persist_directory=self.settings.CHROMA_PERSIST_DIR,
-                    collection_name=collection_name or self.settings.CHROMA_COLLECTION_NAME
+            keyword_index = self.keyword_index(collection)
+            stored = self._source_chunk_ids(vectorstore, source) if source else set()
+
+            documents = iter(documents)
+            seen = set()
+            embedded = written = skipped = 0
+            embed_seconds = 0.0
+            while True:
+                batch = list(islice(documents, batch_size))
+                if not batch:
+                    break
+
+                pending = []
+                for doc in batch:
+                    doc_id = chunk_id(doc)
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    if doc_id in stored:
+                        skipped += 1
+                        continue
+                    doc.metadata = {**doc.metadata, "chunk_id": doc_id}
+                    pending.append((doc_id, doc))
+                progress(chunks_skipped=skipped)
+                if not pending:
+                    continue
+                texts = [doc.page_content for _, doc in pending]
+
+                start = time.perf_counter()
+                embeddings = self.embeddings.embed_documents(texts)
+                embed_seconds += time.perf_counter() - start
+                embedded += len(pending)
+                progress(chunks_embedded=embedded)
+
+                vectorstore._collection.upsert(
+                    ids=[doc_id for doc_id, _ in pending],
+                    embeddings=embeddings,
+                    metadatas=[doc.metadata for _, doc in pending],
+                    documents=texts
                 )
-            else:
-                logger.debug(f"Collection '{collection}' already exists — adding documents")
-                vectorstore.add_documents(documents)
-            
-            self._vectorstore.persist()
-            logger.info(f"Successfully persisted collection: {collection}")
-        
+                added.extend(doc_id for doc_id, _ in pending)
+                keyword_index.add_many((doc_id, doc.page_content) for doc_id, doc in pending)
+                written += len(pending)
+                CHUNKS_WRITTEN.inc(len(pending))
+                progress(chunks_written=written)
+                logger.debug(f"Wrote {written} chunks to collection '{collection}'")
+
+            stale = sorted(stored - seen)
+            if stale:
+                vectorstore._collection.delete(ids=stale)
+                keyword_index.remove_many(stale)
+                CHUNKS_DELETED.inc(len(stale))
+                progress(chunks_deleted=len(stale))
+            CHUNKS_SKIPPED.inc(skipped)
+
+            if written or stale:
+                keyword_index.flush()
+                self._notify_write(collection)
+            rate = embedded / embed_seconds if embed_seconds else 0.0
+            logger.info(
+                f"Indexed collection {collection}: {written} chunks written, {skipped} unchanged, "
+                f"{len(stale)} deleted (embedding: {rate:.1f} chunks/sec)"
+            )
+            return {"chunks_written": written, "chunks_skipped": skipped, "chunks_deleted": len(stale)}
+
+        except RAGException:
+            # Errors raised while producing the documents (e.g. PDF parsing) keep their type
+            self._abort_add(collection, vectorstore, keyword_index, added, source)
+            raise
         except Exception as e:
             logger.exception(f"Error adding documents to collection '{collection}': {e}")
+            self._abort_add(collection, vectorstore, keyword_index, added, source)
             raise VectorStoreError(f"Error adding documents: {str(e)}")
-    
-    def similarity_search(
-        self, 
-        query: str, 
-        k: int = 3,
+
+    def _abort_add(
+        self,
+        collection: str,
+        vectorstore: Optional[Chroma],
+        keyword_index: Optional[BM25Index],
+        added: List[str],
+        source: Optional[str]
+    ) -> None:
+        """Undo a failed ``add_documents`` call and commit what is left of its writes.
+
+        Only a call with a ``source`` can be rolled back: its new chunks were
+        not stored before, whereas without one they may have replaced
+        identical chunks that must stay.
+        """
+        if not added:
+            return
+        try:
+            if source:
+                logger.warning(f"Rolling back {len(added)} chunks of '{source}' after a failed upload")
+                vectorstore._collection.delete(ids=added)
+                keyword_index.remove_many(added)
+                CHUNKS_DELETED.inc(len(added))
+        except Exception as e:
+            logger.exception(f"Rolling back chunks of '{source}' failed: {e}")
+        try:
+            keyword_index.flush()
+        except Exception as e:
+            logger.exception(f"Error persisting keyword index of collection '{collection}': {e}")
+        self._notify_write(collection)
+
+    @staticmethod
+    def _source_chunk_ids(vectorstore: Chroma, source: str) -> Set[str]:
+        return set(vectorstore._collection.get(where={"source": source}, include=[])["ids"])
+
+    def delete_source(self, source: str, collection_name: Optional[str] = None) -> int:
+        """Delete every chunk of a source document; returns how many were removed"""
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        try:
+            vectorstore = self.get_vectorstore(collection_name)
+            ids = sorted(self._source_chunk_ids(vectorstore, source))
+            if ids:
+                vectorstore._collection.delete(ids=ids)
+                keyword_index = self.keyword_index(collection)
+                keyword_index.remove_many(ids)
+                keyword_index.flush()
+                self._notify_write(collection)
+            logger.info(f"Deleted {len(ids)} chunks of '{source}' from collection: {collection}")
+            return len(ids)
+        except CollectionNotFoundError:
+            return 0
+        except Exception as e:
+            logger.exception(f"Error deleting '{source}' from collection '{collection}': {e}")
+            raise VectorStoreError(f"Error deleting documents: {str(e)}")
+
+    def migrate_legacy_chunks(self, collection_name: Optional[str] = None) -> int:
+        """Re-key chunks indexed before content-derived IDs; returns how many were migrated.
+
+        Those chunks have random IDs and the upload's temporary path as
+        ``source``, so re-uploading a file never replaced them. They are
+        rewritten under ``chunk_id`` with the original filename as source,
+        keeping their stored embeddings.
+        """
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        batch_size = self.settings.INGESTION_BATCH_SIZE
+        try:
+            chroma_collection = self.get_vectorstore(collection_name)._collection
+            legacy = []
+            for offset in range(0, chroma_collection.count(), 1000):
+                rows = chroma_collection.get(include=["metadatas"], limit=1000, offset=offset)
+                legacy.extend(
+                    doc_id for doc_id, metadata in zip(rows["ids"], rows["metadatas"])
+                    if not (metadata or {}).get("chunk_id")
+                )
+            if not legacy:
+                return 0
+
+            keyword_index = self.keyword_index(collection)
+            for start in range(0, len(legacy), batch_size):
+                rows = chroma_collection.get(
+                    ids=legacy[start:start + batch_size], include=["documents", "metadatas", "embeddings"]
+                )
+                # The same file uploaded twice collapses into one set of chunks
+                migrated = {}
+                for text, metadata, embedding in zip(rows["documents"], rows["metadatas"], rows["embeddings"]):
+                    doc = Document(page_content=text, metadata={
+                        **metadata, "source": metadata.get("filename") or metadata.get("source", "")
+                    })
+                    doc_id = chunk_id(doc)
+                    doc.metadata["chunk_id"] = doc_id
+                    migrated[doc_id] = (doc, embedding)
+
+                chroma_collection.upsert(
+                    ids=list(migrated),
+                    embeddings=[embedding for _, embedding in migrated.values()],
+                    metadatas=[doc.metadata for doc, _ in migrated.values()],
+                    documents=[doc.page_content for doc, _ in migrated.values()]
+                )
+                chroma_collection.delete(ids=rows["ids"])
+                keyword_index.remove_many(rows["ids"])
+                keyword_index.add_many((doc_id, doc.page_content) for doc_id, (doc, _) in migrated.items())
+
+            keyword_index.flush()
+            self._notify_write(collection)
+            logger.info(f"Migrated {len(legacy)} legacy chunks in collection: {collection}")
+            return len(legacy)
+        except CollectionNotFoundError:
+            return 0
+        except Exception as e:
+            logger.exception(f"Error migrating chunks of collection '{collection}': {e}")
+            raise VectorStoreError(f"Error migrating documents: {str(e)}")
+
+    def source_chunk_ids(self, source: str, collection_name: Optional[str] = None) -> Set[str]:
+        """IDs of the chunks currently stored for a source document"""
+        return self._source_chunk_ids(self.get_or_create_vectorstore(collection_name), source)
+
+    def write_embedded(
+        self,
+        ids: List[str],
+        documents: List[Document],
+        embeddings: List[List[float]],
         collection_name: Optional[str] = None
-    ) -> List[Document]:
-        """Search for similar documents"""
+    ) -> None:
+        """Upsert already-embedded chunks without persisting the keyword index.
+
+        For bulk writers that group many chunks per call; ``commit_writes``
+        must follow once the batch of work is done.
+        """
         collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
         try:
-            logger.info("Performing similarity search on '%s' for query: %.80s...", collection, query)
             vectorstore = self.get_or_create_vectorstore(collection_name)
-            results = vectorstore.similarity_search(query, k=k)
+            texts = [doc.page_content for doc in documents]
+            vectorstore._collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                metadatas=[doc.metadata for doc in documents],
+                documents=texts
+            )
+            self.keyword_index(collection).add_many(zip(ids, texts))
+            CHUNKS_WRITTEN.inc(len(ids))
+        except Exception as e:
+            logger.exception(f"Error writing chunks to collection '{collection}': {e}")
+            raise VectorStoreError(f"Error adding documents: {str(e)}")
+
+    def delete_ids(self, ids: List[str], collection_name: Optional[str] = None) -> None:
+        """Delete chunks by ID without persisting the keyword index"""
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        try:
+            self.get_or_create_vectorstore(collection_name)._collection.delete(ids=ids)
+            self.keyword_index(collection).remove_many(ids)
+            CHUNKS_DELETED.inc(len(ids))
+        except Exception as e:
+            logger.exception(f"Error deleting chunks from collection '{collection}': {e}")
+            raise VectorStoreError(f"Error deleting documents: {str(e)}")
+
+    def commit_writes(self, collection_name: Optional[str] = None) -> None:
+        """Persist the keyword index once and invalidate caches after bulk writes"""
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        self.keyword_index(collection).flush()
+        self._notify_write(collection)
+
+    def similarity_search_with_scores(
+        self,
+        query: str,
+        k: int = 3,
+        collection_name: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Search for similar documents with relevance scores in [0, 1], higher meaning closer.
+
+        Scores are the cosine similarity, recovered from the collection's
+        distance space and clamped at 0, so the scale is the same whatever
+        space a collection was created with.
+        """
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        cache_key = (collection, self.collection_version(collection), normalize_query(query), k)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Retrieval cache hit on '%s' for query: %.80s...", collection, query)
+            return list(cached)
+
+        try:
+            logger.info("Performing similarity search on '%s' for query: %.80s...", collection, query)
+            vectorstore = self.get_vectorstore(collection_name)
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
+            with stage_timer("dense_search"):
+                rows = vectorstore._collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=k,
+                    include=["documents", "metadatas", "distances"]
+                )
+            results = self._scored_rows(rows, 0, _RELEVANCE[_space(vectorstore)])
             logger.info("Found %d similar documents in collection: %s", len(results), collection)
-            return results
-        
+            self._result_cache.set(cache_key, results)
+            return list(results)
+
+        except CollectionNotFoundError:
+            raise
         except Exception as e:
-            
             logger.exception("Error searching documents in '%s': %s", collection, e)
             raise VectorStoreError(f"Error searching documents: {str(e)}")
+
+    @staticmethod
+    def _scored_rows(rows: Dict, position: int, relevance: Callable[[float], float]) -> List[Tuple[Document, float]]:
+        """(Document, relevance) pairs for one query of a Chroma query result"""
+        return [
+            (Document(id=doc_id, page_content=text, metadata=metadata or {}), _clamp(relevance(distance)))
+            for doc_id, text, metadata, distance in zip(
+                rows["ids"][position], rows["documents"][position],
+                rows["metadatas"][position], rows["distances"][position]
+            )
+        ]
+
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        collection_name: Optional[str] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """Scored results for many queries, sending every uncached query to Chroma in one call"""
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        version = self.collection_version(collection)
+        keys = [(collection, version, normalize_query(query), k) for query in queries]
+        results: List[Optional[List[Tuple[Document, float]]]] = [self._result_cache.get(key) for key in keys]
+        pending = [position for position, cached in enumerate(results) if cached is None]
+        if not pending:
+            return [list(cached) for cached in results]
+
+        try:
+            vectorstore = self.get_vectorstore(collection_name)
+            with stage_timer("dense_search"):
+                rows = vectorstore._collection.query(
+                    query_embeddings=[query_embeddings[position] for position in pending],
+                    n_results=k,
+                    include=["documents", "metadatas", "distances"]
+                )
+            relevance = _RELEVANCE[_space(vectorstore)]
+            for row, position in enumerate(pending):
+                results[position] = self._scored_rows(rows, row, relevance)
+                self._result_cache.set(keys[position], results[position])
+            logger.info(
+                "Batched similarity search of %d queries (%d cached) on '%s'",
+                len(queries), len(queries) - len(pending), collection
+            )
+            return [list(scored) for scored in results]
+
+        except CollectionNotFoundError:
+            raise
+        except Exception as e:
+            logger.exception("Error in batched search of '%s': %s", collection, e)
+            raise VectorStoreError(f"Error searching documents: {str(e)}")
+
+    def get_scored_by_ids(
+        self,
+        ids: List[str],
+        query_embedding: List[float],
+        collection_name: Optional[str] = None
+    ) -> Dict[str, Tuple[Document, float]]:
+        """Fetch chunks by ID with the relevance score a vector search would have given them"""
+        collection = collection_name or self.settings.CHROMA_COLLECTION_NAME
+        try:
+            vectorstore = self.get_vectorstore(collection_name)
+            rows = vectorstore._collection.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+            space = _space(vectorstore)
+            distance_fn, relevance = _DISTANCES[space], _RELEVANCE[space]
+            query = np.asarray(query_embedding, dtype=float)
+            return {
+                doc_id: (
+                    Document(id=doc_id, page_content=text, metadata=meta or {}),
+                    _clamp(relevance(distance_fn(query, np.asarray(embedding, dtype=float))))
+                )
+                for doc_id, text, meta, embedding in zip(
+                    rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"]
+                )
+            }
+        except CollectionNotFoundError:
+            raise
+        except Exception as e:
+            logger.exception("Error fetching chunks from '%s': %s", collection, e)
+            raise VectorStoreError(f"Error fetching documents: {str(e)}")
+
+    def similarity_search(
+        self, 
+        query: str, 
+        k: int = 3,
+        collection_name: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Document]:
+        """Search for similar documents, reusing a precomputed query embedding when given"""
+        return [
+            doc for doc, _ in self.similarity_search_with_scores(query, k, collection_name, query_embedding)
+        ]
     
+    def cache_stats(self) -> Dict:
+        """Size and hit rate of the retrieval result cache"""
+        return self._result_cache.stats()
+
+    def collection_stats(self) -> Dict:
+        """Open collection handles and registry hit rate"""
+        return self.registry().stats()
+
     def check_health(self) -> bool:
         """Check if vector store is accessible"""
         try:
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from app.services.bm25_index import BM25Index
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+class TestBM25IndexPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "docs.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_flush_appends_changes_and_compacts_once_the_log_outgrows_the_snapshot(self):
+        index = BM25Index.load(self.path)
+        index.add_many((f"c{i}", f"pump model {i} maintenance guide") for i in range(50))
+        index.flush()
+        snapshot_size = os.path.getsize(self.path)
+        self.assertEqual(os.path.getsize(index.log_path), 0)
+
+        index.add("c50", "valve seal replacement")
+        index.flush()
+        self.assertEqual(os.path.getsize(self.path), snapshot_size)
+        self.assertGreater(os.path.getsize(index.log_path), 0)
+
+        index.remove_many(f"c{i}" for i in range(40))
+        index.add_many((f"d{i}", f"impeller {i} inspection checklist") for i in range(60))
+        index.flush()
+        self.assertEqual(os.path.getsize(index.log_path), 0)
+
+        reloaded = BM25Index.load(self.path)
+        self.assertEqual(len(reloaded), 71)
+        self.assertEqual(ids(reloaded.search("valve", 3)), ["c50"])
+
+    def test_refresh_picks_up_writes_of_another_process(self):
+        writer = BM25Index.load(self.path)
+        writer.add_many([("a", "centrifugal pump"), ("b", "gear pump")])
+        writer.flush()
+        reader = BM25Index.load(self.path)
+        self.assertFalse(reader.refresh())
+
+        writer.add("c", "pressure relief valve")
+        writer.remove_many(["a"])
+        writer.flush()
+        self.assertTrue(reader.refresh())
+        self.assertEqual(ids(reader.search("valve", 3)), ["c"])
+        self.assertEqual(ids(reader.search("centrifugal", 3)), [])
+
+        # Compaction replaces the snapshot; the reader starts again from it
+        writer.add_many((f"n{i}", f"nozzle {i}") for i in range(20))
+        writer.flush()
+        self.assertEqual(os.path.getsize(writer.log_path), 0)
+        self.assertTrue(reader.refresh())
+        self.assertEqual(len(reader), len(writer))
+
+    def test_unflushed_changes_survive_a_refresh(self):
+        first = BM25Index.load(self.path)
+        second = BM25Index.load(self.path)
+        second.add("x", "impeller wear")
+        first.add("y", "impeller crack")
+        first.flush()
+
+        second.refresh()
+        self.assertEqual(sorted(ids(second.search("impeller", 3))), ["x", "y"])
+        second.flush()
+        first.refresh()
+        self.assertEqual(sorted(ids(first.search("impeller", 3))), ["x", "y"])
@@ -0,0 +1,173 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from langchain_core.documents import Document
+from app.config.exceptions import DocumentProcessingError, VectorStoreError
+from app.services.bulk_ingestion_service import BulkIngestionPipeline, iter_pdf_sources
+
+
+class FakePDFService:
+    """Pages are the form-feed separated parts of the source; a page reading BROKEN fails to parse"""
+
+    def iter_pages(self, source, filename):
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                source = f.read()
+        for number, text in enumerate(bytes(source).decode("utf-8").split("\f"), start=1):
+            if text == "BROKEN":
+                raise DocumentProcessingError(f"Error processing PDF '{filename}'")
+            yield Document(page_content=text, metadata={"source": filename, "page": number})
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+class FakeStore:
+    """In-memory stand-in for the VectorStoreService bulk-write methods"""
+
+    def __init__(self, fail_on_write=None):
+        self.embeddings = FakeEmbeddings()
+        self.rows = {}
+        self.commits = 0
+        self.writes = 0
+        self.fail_on_write = fail_on_write
+
+    def source_chunk_ids(self, source, collection_name=None):
+        return {doc_id for doc_id, doc in self.rows.items() if doc.metadata["source"] == source}
+
+    def write_embedded(self, ids, documents, embeddings, collection_name=None):
+        self.writes += 1
+        if self.writes == self.fail_on_write:
+            self.rows.update(zip(ids[:1], documents[:1]))
+            raise VectorStoreError("Error adding documents: disk full")
+        self.rows.update(zip(ids, documents))
+
+    def delete_ids(self, ids, collection_name=None):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def commit_writes(self, collection_name=None):
+        self.commits += 1
+
+    def texts(self, source):
+        return sorted(doc.page_content for doc in self.rows.values() if doc.metadata["source"] == source)
+
+
+def pdf(*pages: str) -> bytes:
+    return "\f".join(pages).encode("utf-8")
+
+
+def corrupt_zip() -> bytes:
+    """A readable zip directory whose member fails its CRC check"""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("x.pdf", pdf("hello"))
+    return archive.getvalue().replace(b"hello", b"jello", 1)
+
+
+class TestBulkIngestionPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FakeStore()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_pipeline(self, sources, store=None, **options):
+        pipeline = BulkIngestionPipeline(
+            store or self.store, pdf_service=FakePDFService(), chunk_size=50, chunk_overlap=0,
+            embed_batch_size=options.get("embed_batch_size", 2), write_batch_size=options.get("write_batch_size", 3)
+        )
+        return pipeline.run(sources)
+
+    def path(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_indexes_files_and_archives_and_reports_bad_ones(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("manuals/b.pdf", pdf("bravo one", "bravo two"))
+            zf.writestr("manuals/notes.txt", "ignored")
+            zf.writestr("c.pdf", pdf("charlie one"))
+        tar_path = os.path.join(self.tmp_dir.name, "d.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as tf:
+            data = pdf("delta one")
+            info = tarfile.TarInfo("d.pdf")
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+        sources = [
+            *iter_pdf_sources(self.path("a.pdf", pdf("alpha one", "alpha two")), "a.pdf", 1024),
+            *iter_pdf_sources(self.path("m.zip", archive.getvalue()), "m.zip", 1024),
+            *iter_pdf_sources(tar_path, "d.tar.gz", 1024),
+            ("a.pdf", pdf("alpha again")),
+            ("e.pdf", pdf("echo one", "BROKEN")),
+            *iter_pdf_sources(self.path("bad.zip", corrupt_zip()), "bad.zip", 1024),
+        ]
+        result = self.run_pipeline(sources)
+
+        self.assertEqual(result["files_total"], 7)
+        self.assertEqual(result["files_indexed"], 4)
+        self.assertEqual(self.store.texts("b.pdf"), ["bravo one", "bravo two"])
+        self.assertEqual(self.store.texts("d.pdf"), ["delta one"])
+        self.assertEqual(self.store.texts("a.pdf"), ["alpha one", "alpha two"])
+        self.assertEqual(self.store.texts("e.pdf"), [])
+        self.assertEqual(
+            [(error["filename"], "Duplicate" in error["error"]) for error in result["errors"]],
+            [("a.pdf", True), ("e.pdf", False), ("bad.zip", False)]
+        )
+        self.assertEqual(self.store.commits, 1)
+
+    def test_oversized_archive_member_is_reported_without_stopping_the_archive(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("big.pdf", pdf("x" * 100))
+            zf.writestr("small.pdf", pdf("small"))
+
+        result = self.run_pipeline(iter_pdf_sources(self.path("m.zip", archive.getvalue()), "m.zip", 50))
+
+        self.assertEqual(result["files_indexed"], 1)
+        self.assertEqual(result["errors"][0]["filename"], "big.pdf")
+        self.assertEqual(self.store.texts("small.pdf"), ["small"])
+
+    def test_reingesting_skips_unchanged_chunks_and_deletes_stale_ones(self):
+        self.run_pipeline([("a.pdf", pdf("one", "two", "three"))])
+        unchanged = self.run_pipeline([("a.pdf", pdf("one", "two", "three"))])
+        self.assertEqual((unchanged["chunks_written"], unchanged["chunks_skipped"]), (0, 3))
+
+        changed = self.run_pipeline([("a.pdf", pdf("one", "two", "four"))])
+        self.assertEqual((changed["chunks_written"], changed["chunks_deleted"]), (1, 1))
+        self.assertEqual(self.store.texts("a.pdf"), ["four", "one", "two"])
+
+    def test_failing_new_version_leaves_previous_version_intact(self):
+        self.run_pipeline([("a.pdf", pdf("one", "two"))])
+        before = dict(self.store.rows)
+
+        result = self.run_pipeline([("a.pdf", pdf("one", "changed", "more", "BROKEN"))], embed_batch_size=1,
+                                   write_batch_size=1)
+
+        self.assertEqual(result["files_indexed"], 0)
+        self.assertEqual(self.store.rows, before)
+
+    def test_aborted_run_rolls_back_unfinished_files_and_commits(self):
+        store = FakeStore(fail_on_write=3)
+        sources = [(f"{name}.pdf", pdf(f"{name} one", f"{name} two")) for name in "abcd"]
+
+        with self.assertRaises(VectorStoreError):
+            self.run_pipeline(sources, store=store, embed_batch_size=1, write_batch_size=1)
+
+        self.assertEqual(store.commits, 1)
+        for name in "abcd":
+            self.assertIn(len(store.texts(f"{name}.pdf")), (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
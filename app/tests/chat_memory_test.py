@@ -0,0 +1,161 @@
+import asyncio
+import unittest
+import fakeredis
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from app.services.ai.context_assembler import TokenCounter
+from app.services.ai.conversation_summarizer import ConversationSummarizer
+from app.services.chat_memory_service import InMemoryChatMemory, RedisChatMemory
+from app.services.stage_executor import StageExecutor
+
+
+class CountingStage(StageExecutor):
+    """Stage executor that counts the coroutines run under its limit"""
+
+    calls = 0
+
+    async def run_async(self, func, *args, **kwargs):
+        self.calls += 1
+        return await super().run_async(func, *args, **kwargs)
+
+
+class CountingPipelines(fakeredis.FakeAsyncRedis):
+    """Fake Redis that counts the pipelines it hands out"""
+
+    pipelines = 0
+
+    def pipeline(self, *args, **kwargs):
+        type(self).pipelines += 1
+        return super().pipeline(*args, **kwargs)
+
+
+class TestRedisChatMemory(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        CountingPipelines.pipelines = 0
+        self.client = CountingPipelines(decode_responses=True)
+        self.memory = RedisChatMemory(client=self.client, ttl_seconds=600, namespace="test:", max_messages=4)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_append_turn_stores_both_messages_in_one_pipeline(self):
+        await self.memory.append_turn("c1", "What is PN-1?", "A pump seal.")
+
+        messages = await self.memory.get_messages("c1")
+        self.assertEqual([(m["role"], m["text"]) for m in messages], [
+            ("user", "What is PN-1?"), ("assistant", "A pump seal."),
+        ])
+        self.assertEqual(CountingPipelines.pipelines, 1)
+        self.assertGreater(await self.client.ttl("test:c1"), 0)
+
+    async def test_list_is_trimmed_to_max_messages(self):
+        for turn in range(5):
+            await self.memory.append_turn("c1", f"q{turn}", f"a{turn}")
+
+        self.assertEqual(await self.client.llen("test:c1"), 4)
+        messages = await self.memory.get_messages("c1")
+        self.assertEqual([m["text"] for m in messages], ["q3", "a3", "q4", "a4"])
+
+    async def test_limited_read_returns_newest_messages(self):
+        for turn in range(2):
+            await self.memory.append_turn("c1", f"q{turn}", f"a{turn}")
+
+        messages = await self.memory.get_messages("c1", limit=3)
+        self.assertEqual([m["text"] for m in messages], ["a0", "q1", "a1"])
+
+    async def test_compact_stores_summary_and_drops_folded_messages(self):
+        for turn in range(2):
+            await self.memory.append_turn("c1", f"q{turn}", f"a{turn}")
+        await self.memory.compact("c1", "Asked q0 and q1.", 3)
+
+        summary, messages = await self.memory.get_history("c1", limit=6)
+        self.assertEqual(summary, "Asked q0 and q1.")
+        self.assertEqual([m["text"] for m in messages], ["a1"])
+        self.assertGreater(await self.client.ttl("test:c1:summary"), 0)
+
+    async def test_disabled_ttl_and_bound_are_not_applied(self):
+        memory = RedisChatMemory(client=self.client, ttl_seconds=None, namespace="test:", max_messages=None)
+        for index in range(6):
+            await memory.append_message("c2", "user", f"m{index}")
+
+        self.assertEqual(await self.client.llen("test:c2"), 6)
+        self.assertEqual(await self.client.ttl("test:c2"), -1)
+
+
+class TestInMemoryChatMemory(unittest.IsolatedAsyncioTestCase):
+    async def test_turns_are_bounded_and_read_newest_first(self):
+        memory = InMemoryChatMemory(max_messages=4)
+        for turn in range(3):
+            await memory.append_turn("c1", f"q{turn}", f"a{turn}")
+
+        self.assertEqual([m["text"] for m in await memory.get_messages("c1")], ["q1", "a1", "q2", "a2"])
+        self.assertEqual([m["role"] for m in await memory.get_messages("c1", limit=1)], ["assistant"])
+
+    async def test_least_recently_used_conversation_is_evicted(self):
+        memory = InMemoryChatMemory(max_conversations=2)
+        await memory.append_turn("old", "q", "a")
+        await memory.append_turn("used", "q", "a")
+        await memory.get_messages("old")
+        await memory.append_turn("new", "q", "a")
+
+        self.assertEqual(await memory.get_messages("used"), [])
+        self.assertEqual(len(await memory.get_messages("old")), 2)
+
+    async def test_summarizer_folds_old_turns_in_background(self):
+        memory = InMemoryChatMemory()
+        summarizer = ConversationSummarizer(
+            FakeListChatModel(responses=["The user asked about seals."]),
+            TokenCounter("gemini-2.5-flash-lite"),
+            trigger_tokens=50,
+            keep_messages=2
+        )
+        for turn in range(6):
+            await memory.append_turn("c1", f"question {turn} " + "x" * 40, f"answer {turn} " + "y" * 40)
+            task = summarizer.schedule(memory, "c1")
+            if task:
+                await task
+
+        summary, messages = await memory.get_history("c1")
+        self.assertEqual(summary, "The user asked about seals.")
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[-1]["text"].startswith("answer 5"))
+
+    async def test_short_turns_are_folded_in_batches_under_the_llm_limit(self):
+        memory = InMemoryChatMemory()
+        stage = CountingStage("summary-test", 1)
+        self.addCleanup(stage.shutdown)
+        summarizer = ConversationSummarizer(
+            FakeListChatModel(responses=["The user asked about PN-1.", "The user asked about PN-1 and PN-2."]),
+            TokenCounter("gemini-2.5-flash-lite"),
+            trigger_tokens=2000,
+            keep_messages=4,
+            llm_stage=stage
+        )
+        history = []
+        for turn in range(8):
+            await memory.append_turn("c1", f"q{turn}", f"a{turn}")
+            task = summarizer.schedule(memory, "c1")
+            if task:
+                await task
+            summary, messages = await memory.get_history("c1")
+            history.append((summary, len(messages)))
+
+        # Nothing is folded until there are more than twice keep_messages, then down to keep_messages
+        self.assertEqual([count for _, count in history], [2, 4, 6, 8, 4, 6, 8, 4])
+        self.assertEqual(history[3][0], None)
+        self.assertEqual(history[4][0], "The user asked about PN-1.")
+        self.assertEqual(history[7][0], "The user asked about PN-1 and PN-2.")
+        self.assertEqual(summarizer.stats()["compactions"], 2)
+        self.assertEqual(stage.calls, 2)
+        self.assertEqual([m["text"] for m in messages], ["q6", "a6", "q7", "a7"])
+
+    async def test_conversations_expire_after_ttl(self):
+        memory = InMemoryChatMemory(ttl_seconds=0.1)
+        await memory.append_turn("c1", "q", "a")
+        await asyncio.sleep(0.15)
+
+        self.assertEqual(await memory.get_messages("c1"), [])
+        self.assertEqual(memory.stats()["total_chars"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
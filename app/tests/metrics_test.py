@@ -0,0 +1,53 @@
+import unittest
+import httpx
+from fastapi import FastAPI
+from prometheus_client import CollectorRegistry, generate_latest
+from app.routes import metrics_routes
+from app.services.metrics import HTTP_SECONDS, CacheStatsCollector, stage_timer
+
+
+class TestMetricsMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_are_labelled_with_the_route_template(self):
+        app = FastAPI()
+        app.add_middleware(metrics_routes.MetricsMiddleware)
+        app.include_router(metrics_routes.router)
+
+        @app.get("/jobs/{job_id}")
+        async def job(job_id: str):
+            return {"job_id": job_id}
+
+        labels = {"method": "GET", "route": "/jobs/{job_id}", "status": "200"}
+        before = _count(labels)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/jobs/a1")
+            await client.get("/jobs/b2")
+            scrape = await client.get("/metrics")
+
+        self.assertEqual(_count(labels) - before, 2)
+        self.assertIn('route="/jobs/{job_id}"', scrape.text)
+        self.assertNotIn('route="/jobs/a1"', scrape.text)
+
+
+class TestCacheStatsCollector(unittest.TestCase):
+    def test_reports_hits_misses_and_ratio_per_cache(self):
+        registry = CollectorRegistry()
+        registry.register(CacheStatsCollector(lambda: {
+            "retrieval": {"hits": 3, "misses": 1, "hit_ratio": 0.75},
+            "answer": None,
+        }))
+
+        text = generate_latest(registry).decode()
+        self.assertIn('rag_cache_hits_total{cache="retrieval"} 3.0', text)
+        self.assertIn('rag_cache_hit_ratio{cache="retrieval"} 0.75', text)
+        self.assertNotIn('cache="answer"', text)
+
+    def test_unknown_stage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            stage_timer("user_supplied")
+
+
+def _count(labels) -> float:
+    return sum(
+        sample.value for metric in HTTP_SECONDS.collect() for sample in metric.samples
+        if sample.name.endswith("_count") and all(sample.labels.get(k) == v for k, v in labels.items())
+    )
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+for _key in ("LLM_API_KEY", "OPENWEATHER_API_KEY", "LANGSMITH_API_KEY", "RAPIDAPI_KEY"):
+    os.environ.setdefault(_key, "test")
+
+from app.config.config import get_settings
+from app.config.exceptions import ToolError
+from app.services.tools.http_client import ToolHttpClient
+from app.services.tools.news_tool import NewsTool
+from app.services.tools.search_tool import SearchTool
+from app.services.tools.tool_executor import ToolExecutor
+from app.services.tools.weather_tool import WeatherTool
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers like OpenWeather (/weather) and Google News (/<category>); /slow/... stalls"""
+
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    ports_seen = set()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        type(self).requests_seen.append(url.path)
+        type(self).ports_seen.add(self.client_address[1])
+        if url.path.startswith("/slow"):
+            time.sleep(1)
+        if url.path.endswith("/weather"):
+            city = query["q"][0]
+            if city.lower() == "atlantis":
+                return self._send(404, {"message": "city not found"})
+            return self._send(200, {
+                "name": city.title(),
+                "main": {"temp": 21.5, "feels_like": 20.0, "humidity": 40},
+                "weather": [{"description": "clear sky"}],
+                "wind": {"speed": 3.2},
+            })
+        category = url.path.rsplit("/", 1)[-1]
+        self._send(200, {"items": [{"title": f"{category} headline", "link": "http://example.com/1"}]})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTools(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.settings = get_settings()
+        self.saved = self.settings.model_dump()
+        self.settings.WEATHER_API_BASE_URL = self.base_url
+        self.settings.NEWS_API_BASE_URL = self.base_url
+        StandInHandler.requests_seen = []
+        StandInHandler.ports_seen = set()
+
+    async def asyncTearDown(self):
+        await ToolHttpClient.aclose()
+        for key, value in self.saved.items():
+            setattr(self.settings, key, value)
+
+    async def test_weather_is_cached_by_normalized_city(self):
+        tool = WeatherTool()
+        first = await tool.get_weather("Pune")
+        second = await tool.get_weather("  PUNE ")
+
+        self.assertIn("Weather in Pune", first)
+        self.assertEqual(first, second)
+        self.assertEqual(StandInHandler.requests_seen, ["/weather"])
+
+    async def test_errors_are_not_cached(self):
+        tool = WeatherTool()
+        self.assertIn("city not found", await tool.get_weather("Atlantis"))
+        await tool.get_weather("Atlantis")
+        self.assertEqual(len(StandInHandler.requests_seen), 2)
+
+    async def test_news_is_cached_per_category(self):
+        tool = NewsTool()
+        self.assertIn("sports headline", await tool.get_news("sports"))
+        await tool.get_news("Sports")
+        self.assertIn("business headline", await tool.get_news("business"))
+        self.assertEqual(StandInHandler.requests_seen, ["/sports", "/business"])
+
+    async def test_tools_share_keep_alive_connections(self):
+        weather, news = WeatherTool(), NewsTool()
+        for city in ("Pune", "Delhi", "Mumbai"):
+            await weather.get_weather(city)
+        await news.get_news("technology")
+
+        self.assertEqual(len(StandInHandler.requests_seen), 4)
+        self.assertEqual(len(StandInHandler.ports_seen), 1)
+
+    async def test_weather_timeout_raises_tool_error(self):
+        self.settings.WEATHER_API_BASE_URL = f"{self.base_url}/slow"
+        self.settings.WEATHER_TIMEOUT_SECONDS = 0.2
+        tool = WeatherTool()
+
+        started = time.perf_counter()
+        with self.assertRaises(ToolError):
+            await tool.get_weather("Pune")
+        self.assertLess(time.perf_counter() - started, 0.9)
+
+    async def test_search_is_cached_by_normalized_query(self):
+        calls = []
+
+        def search(query):
+            calls.append(query)
+            return f"results for {query}"
+
+        tool = SearchTool(search=search)
+        self.assertEqual(await tool.search_web("FastAPI  docs"), "results for FastAPI  docs")
+        await tool.search_web("fastapi docs")
+        self.assertEqual(calls, ["FastAPI  docs"])
+
+
+class TestToolExecutor(unittest.IsolatedAsyncioTestCase):
+    async def test_deadline_bounds_a_hung_tool(self):
+        executor = ToolExecutor(deadlines={"slow": 0.1})
+
+        async def hang(_):
+            await asyncio.sleep(5)
+
+        started = time.perf_counter()
+        result = await executor.run("slow", hang, "x")
+
+        self.assertIn("did not respond", result)
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(executor.stats()["slow"]["timeouts"], 1)
+
+    async def test_breaker_opens_after_repeated_failures_and_recovers(self):
+        executor = ToolExecutor(deadlines={}, failure_threshold=2, reset_seconds=0.2)
+        attempts = []
+
+        async def flaky(arg):
+            attempts.append(arg)
+            if arg == "fail":
+                raise ToolError("upstream returned 503")
+            return "ok"
+
+        for _ in range(2):
+            self.assertIn("503", await executor.run("news", flaky, "fail"))
+        self.assertIn("temporarily unavailable", await executor.run("news", flaky, "ok"))
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(executor.stats()["news"]["state"], "open")
+
+        await asyncio.sleep(0.25)
+        self.assertEqual(await executor.run("news", flaky, "ok"), "ok")
+        self.assertEqual(executor.stats()["news"]["state"], "closed")
+
+    async def test_failed_trial_call_reopens_breaker(self):
+        executor = ToolExecutor(deadlines={}, failure_threshold=1, reset_seconds=0.1)
+
+        async def broken(_):
+            raise RuntimeError("connection refused")
+
+        await executor.run("weather", broken, "x")
+        await asyncio.sleep(0.15)
+        self.assertIn("failed", await executor.run("weather", broken, "x"))
+        self.assertIn("temporarily unavailable", await executor.run("weather", broken, "x"))
+
+    async def test_cancelled_trial_call_frees_the_trial(self):
+        executor = ToolExecutor(deadlines={}, failure_threshold=1, reset_seconds=0.1)
+
+        async def broken(_):
+            raise RuntimeError("connection refused")
+
+        async def hang(_):
+            await asyncio.sleep(5)
+
+        async def healthy(_):
+            return "ok"
+
+        await executor.run("weather", broken, "x")
+        await asyncio.sleep(0.15)
+        trial = asyncio.create_task(executor.run("weather", hang, "x"))
+        await asyncio.sleep(0.05)
+        trial.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await trial
+
+        self.assertEqual(executor.stats()["weather"]["state"], "half_open")
+        self.assertEqual(await executor.run("weather", healthy, "x"), "ok")
+        self.assertEqual(executor.stats()["weather"]["state"], "closed")
+
+    async def test_run_many_runs_calls_concurrently(self):
+        executor = ToolExecutor(deadlines={})
+
+        async def slow_echo(arg):
+            await asyncio.sleep(0.2)
+            return arg
+
+        started = time.perf_counter()
+        results = await executor.run_many([
+            ("a", slow_echo, ("one",)), ("b", slow_echo, ("two",)), ("c", slow_echo, ("three",))
+        ])
+
+        self.assertEqual(results, ["one", "two", "three"])
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
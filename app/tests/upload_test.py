@@ -0,0 +1,190 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+import httpx
+from fastapi import FastAPI, Request
+from app.config.config import get_settings
+from app.config.exceptions import FileTooLargeError, InvalidFileTypeError
+from app.controllers.document_controller import DocumentController
+from app.routes import document_routes
+from app.routes.dependencies import get_document_controller
+from app.routes.document_routes import UploadLimitMiddleware
+from app.services.ingestion_job_service import IngestionJobQueue
+from app.services.upload_service import ARCHIVE_MAGIC, MultipartFileStream, archive_suffix, spool_upload
+
+BLOCK_SIZE = 64 * 1024
+
+
+class FakeUpload:
+    """Async reader that produces ``total`` bytes on demand without holding them"""
+
+    def __init__(self, total: int, header: bytes = b"%PDF-1.7\n"):
+        self.total = total
+        self.header = header
+        self.position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        remaining = self.total - self.position
+        if size < 0 or size > remaining:
+            size = remaining
+        start = self.position
+        self.position += size
+        if start < len(self.header):
+            head = self.header[start:start + size]
+            return head + b"x" * (size - len(head))
+        return b"x" * size
+
+
+class TestSpoolUpload(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp_dir.name, "upload.pdf")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_large_upload_uses_bounded_memory(self):
+        total = 32 * 1024 * 1024
+        tracemalloc.start()
+        try:
+            written = await spool_upload(FakeUpload(total), self.dest, max_bytes=total, block_size=BLOCK_SIZE)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(written, total)
+        self.assertEqual(os.path.getsize(self.dest), total)
+        self.assertLess(peak, 8 * BLOCK_SIZE)
+
+    async def test_rejects_non_pdf(self):
+        with self.assertRaises(InvalidFileTypeError):
+            await spool_upload(FakeUpload(1024, header=b"PK\x03\x04"), self.dest, max_bytes=4096)
+        self.assertFalse(os.path.exists(self.dest))
+
+    async def test_rejects_oversized_upload_and_removes_partial_file(self):
+        with self.assertRaises(FileTooLargeError):
+            await spool_upload(FakeUpload(10 * BLOCK_SIZE), self.dest, max_bytes=3 * BLOCK_SIZE, block_size=BLOCK_SIZE)
+        self.assertFalse(os.path.exists(self.dest))
+
+    async def test_archive_without_magic_is_spooled_completely(self):
+        written = await spool_upload(
+            FakeUpload(3 * BLOCK_SIZE + 7, header=b"tar"), self.dest,
+            max_bytes=4 * BLOCK_SIZE, block_size=BLOCK_SIZE, magic=ARCHIVE_MAGIC[".tar"], kind="archive"
+        )
+        self.assertEqual(written, 3 * BLOCK_SIZE + 7)
+        self.assertEqual(os.path.getsize(self.dest), written)
+        self.assertEqual(archive_suffix("Manuals.TAR.GZ"), ".tar.gz")
+        self.assertIsNone(archive_suffix("manual.pdf"))
+
+
+class TestUploadLimitMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.settings = get_settings()
+        self.saved_limit = self.settings.MAX_UPLOAD_BYTES
+        self.settings.MAX_UPLOAD_BYTES = 4 * BLOCK_SIZE
+        self.parsed = 0
+
+        app = FastAPI()
+        app.add_middleware(UploadLimitMiddleware)
+
+        @app.post("/documents/upload")
+        async def upload(request: Request):
+            uploads = MultipartFileStream(request.stream(), request.headers["content-type"], "file")
+            async for file, filename in uploads:
+                await file.read()
+                self.parsed += 1
+                return {"filename": filename}
+
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        self.settings.MAX_UPLOAD_BYTES = self.saved_limit
+        await self.client.aclose()
+
+    async def test_declared_oversized_body_is_rejected_unread(self):
+        response = await self.client.post("/documents/upload", files={"file": ("a.pdf", b"x" * 10 * BLOCK_SIZE)})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.parsed, 0)
+
+    async def test_undeclared_body_stops_being_read_at_the_limit(self):
+        pulled = 0
+
+        async def body():
+            nonlocal pulled
+            yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n\r\n%PDF-1.7\n'
+            for _ in range(100):
+                pulled += 1
+                yield b"x" * BLOCK_SIZE
+
+        response = await self.client.post(
+            "/documents/upload", content=body(), headers={"content-type": "multipart/form-data; boundary=b"}
+        )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.parsed, 0)
+        self.assertLessEqual(pulled, 6)
+
+    async def test_small_upload_passes(self):
+        response = await self.client.post("/documents/upload", files={"file": ("a.pdf", b"%PDF-1.7\n")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.parsed, 1)
+
+
+class TestUploadRoutes(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue = IngestionJobQueue(handler=lambda job, progress: None, job_dir=self.tmp_dir.name, max_queued=4)
+        controller = DocumentController(vector_store_service=object(), job_queue=self.queue)
+
+        app = FastAPI()
+        app.include_router(document_routes.router)
+        app.dependency_overrides[get_document_controller] = lambda: controller
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.tmp_dir.cleanup()
+
+    async def test_upload_is_written_once_to_the_job_spool_file(self):
+        body = b"%PDF-1.7\n" + b"x" * 3 * BLOCK_SIZE
+        response = await self.client.post(
+            "/documents/upload", data={"note": "ignored"}, files={"file": ("../manual.pdf", body)}
+        )
+
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual(job["filename"], "manual.pdf")
+        self.assertEqual(read_file(self.queue.upload_path(job["job_id"])), body)
+
+    async def test_bulk_files_are_spooled_in_order_and_described_on_the_job(self):
+        files = [("files", ("a.pdf", b"%PDF-a")), ("files", ("m.zip", b"PK\x03\x04zip")), ("files", ("b.pdf", b"%PDF-b"))]
+        response = await self.client.post("/documents/bulk", files=files)
+
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual(job["filename"], "a.pdf and 2 more")
+        self.assertEqual(self.queue.get(job["job_id"])["options"]["files"], ["a.pdf", "m.zip", "b.pdf"])
+        upload_dir = self.queue.upload_dir(job["job_id"])
+        self.assertEqual([read_file(os.path.join(upload_dir, str(i))) for i in range(3)],
+                         [content for _, (_, content) in files])
+
+    async def test_rejected_bulk_file_discards_the_job(self):
+        files = [("files", ("a.pdf", b"%PDF-a")), ("files", ("notes.txt", b"hello"))]
+        response = await self.client.post("/documents/bulk", files=files)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("notes.txt", response.json()["detail"])
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    async def test_request_without_a_file_is_rejected(self):
+        response = await self.client.post("/documents/upload", data={"note": "x"}, files={"other": ("a.pdf", b"%PDF-")})
+        self.assertEqual(response.status_code, 400)
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
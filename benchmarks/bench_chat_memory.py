@@ -0,0 +1,124 @@
+"""Compare the in-process and Redis chat memory backends.
+
+Usage:
+    python -m benchmarks.bench_chat_memory [--conversations 200] [--turns 20] [--concurrency 16]
+                                           [--redis-url redis://localhost:6379] [--output results.json]
+
+Each simulated request reads the recent history of a conversation
+(CHAT_HISTORY_MESSAGES messages) and then appends a question/answer turn,
+as /query does. Requests for different conversations run concurrently.
+Reported per backend: requests/sec and p50/p95/p99 latency of one
+read+append. The Redis backend is skipped when the server is unreachable.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from typing import Dict, List, Optional
+import redis.asyncio as redis_async
+from app.config.config import get_settings
+from app.services.chat_memory_service import BaseChatMemory, InMemoryChatMemory, RedisChatMemory
+
+
+def _percentile(values: List[float], share: float) -> float:
+    return round(values[int(share * (len(values) - 1))], 3)
+
+
+async def _run(memory: BaseChatMemory, args, history: int) -> Dict:
+    rng = random.Random(0)
+    answer = "Replace the seal as described in section 4. " * 8
+    conversations = [f"bench-{uuid.uuid4().hex}" for _ in range(args.conversations)]
+    requests = [conv for conv in conversations for _ in range(args.turns)]
+    rng.shuffle(requests)
+
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def request(conversation_id: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await memory.get_messages(conversation_id, limit=history)
+            await memory.append_turn(conversation_id, "How do I replace the pump seal?", answer)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(conversation_id) for conversation_id in requests))
+    elapsed = time.perf_counter() - start
+
+    for conversation_id in conversations:
+        await memory.clear_conversation(conversation_id)
+
+    latencies.sort()
+    return {
+        "requests": len(requests),
+        "requests_per_sec": round(len(requests) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+async def _redis_memory(url: str, settings) -> Optional[RedisChatMemory]:
+    client = redis_async.from_url(url, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as e:
+        print(f"Skipping Redis backend, {url} is unreachable: {e}")
+        await client.aclose()
+        return None
+    return RedisChatMemory(
+        client=client,
+        ttl_seconds=settings.CHAT_MEMORY_TTL_SECONDS,
+        namespace="bench_chat_mem:",
+        max_messages=settings.CHAT_MEMORY_MAX_MESSAGES
+    )
+
+
+async def run(args) -> Dict:
+    settings = get_settings()
+    history = settings.CHAT_HISTORY_MESSAGES
+    results = {
+        "conversations": args.conversations,
+        "turns": args.turns,
+        "concurrency": args.concurrency,
+        "backends": {},
+    }
+
+    memory = InMemoryChatMemory(
+        ttl_seconds=settings.CHAT_MEMORY_TTL_SECONDS,
+        max_messages=settings.CHAT_MEMORY_MAX_MESSAGES,
+        max_conversations=settings.CHAT_MEMORY_MAX_CONVERSATIONS,
+        max_total_chars=settings.CHAT_MEMORY_MAX_TOTAL_CHARS
+    )
+    results["backends"]["memory"] = await _run(memory, args, history)
+
+    redis_url = args.redis_url or settings.REDIS_URL
+    redis_memory = await _redis_memory(redis_url, settings) if redis_url else None
+    if redis_memory is not None:
+        results["backends"]["redis"] = await _run(redis_memory, args, history)
+        await redis_memory._client.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--redis-url", help="defaults to REDIS_URL")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
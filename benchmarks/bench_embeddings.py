@@ -0,0 +1,130 @@
+"""Compare embedding backends on throughput and retrieval recall.
+
+Usage:
+    python -m benchmarks.bench_embeddings [--backends torch onnx onnx-int8] [--chunks 2000]
+                                          [--batch-sizes 32 64 128] [--workers 0 2] [--output results.json]
+
+The corpus is generated manual text split with the app's chunker. Queries are
+single lines taken from random chunks; recall@k is the share of queries whose
+source chunk is in the top k, and overlap@k is the share of the torch
+backend's top k that each backend also returns.
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+import numpy as np
+from langchain_core.documents import Document
+from app.config.config import get_settings
+from app.services.ai.chunking_service import ChunkingService
+from app.services.ai.embedding_engine import EmbeddingEngine
+from benchmarks.pdf_fixtures import generate_pages
+
+
+def _corpus(chunk_count: int) -> List[str]:
+    settings = get_settings()
+    chunks: List[str] = []
+    page = 0
+    while len(chunks) < chunk_count:
+        pages = [Document(page_content=text, metadata={"page": page + i})
+                 for i, text in enumerate(generate_pages(50, seed=page))]
+        chunks.extend(doc.page_content for doc in ChunkingService().chunk_stream(
+            pages, chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP
+        ))
+        page += 50
+    return chunks[:chunk_count]
+
+
+def _queries(chunks: List[str], count: int, seed: int = 0) -> List[tuple]:
+    rng = random.Random(seed)
+    queries = []
+    for index in rng.sample(range(len(chunks)), min(count, len(chunks))):
+        lines = [line for line in chunks[index].split("\n") if len(line.split()) >= 6]
+        if lines:
+            queries.append((rng.choice(lines), index))
+    return queries
+
+
+def _top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+
+
+def run(args) -> List[Dict]:
+    model_name = args.model or get_settings().EMBEDDING_MODEL
+    chunks = _corpus(args.chunks)
+    queries = _queries(chunks, args.queries)
+    query_texts = [text for text, _ in queries]
+    expected = np.array([index for _, index in queries])
+
+    results = []
+    baseline_top = None
+    for backend in args.backends:
+        try:
+            engine = EmbeddingEngine(model_name, backend=backend, onnx_file_name=args.onnx_file)
+        except Exception as e:
+            print(f"skipping backend '{backend}': {e}")
+            continue
+
+        try:
+            doc_vectors = np.array(engine.embed_documents(chunks))
+            top = _top_k(doc_vectors, np.array([engine.embed_query(q) for q in query_texts]), args.k)
+            if baseline_top is None and backend == "torch":
+                baseline_top = top
+            recall = float(np.mean([expected[i] in top[i] for i in range(len(queries))]))
+            overlap = None
+            if baseline_top is not None:
+                overlap = float(np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, baseline_top)]))
+
+            for batch_size in args.batch_sizes:
+                for workers in args.workers:
+                    engine.batch_size = batch_size
+                    engine.workers = workers
+                    engine.pool_min_texts = 1
+                    if workers > 1:
+                        engine.embed_documents(chunks[:workers])  # start the pool outside the timing
+                    start = time.perf_counter()
+                    engine.embed_documents(chunks)
+                    elapsed = time.perf_counter() - start
+                    engine.close()
+
+                    results.append({
+                        "backend": backend,
+                        "batch_size": batch_size,
+                        "workers": workers,
+                        "chunks": len(chunks),
+                        "seconds": round(elapsed, 3),
+                        "chunks_per_sec": round(len(chunks) / elapsed, 1),
+                        f"recall@{args.k}": round(recall, 4),
+                        f"overlap@{args.k}_with_torch": round(overlap, 4) if overlap is not None else None,
+                    })
+                    print(json.dumps(results[-1]))
+        finally:
+            engine.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="embedding model (defaults to EMBEDDING_MODEL)")
+    parser.add_argument("--backends", nargs="*", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--onnx-file", default=get_settings().EMBEDDING_ONNX_FILE, help="quantized ONNX file for onnx-int8")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=[32, 64, 128])
+    parser.add_argument("--workers", nargs="*", type=int, default=[0], help="encode process counts to try")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare PDF extractor backends on the same corpus.
+
+Usage:
+    python -m benchmarks.bench_pdf_extractors [--pdf FILE ...] [--pages 50 300] [--output results.json]
+
+Without ``--pdf`` a corpus of generated PDFs is used. For every extractor the
+script reports pages/sec for in-memory (sequential) and file (memory-mapped,
+process pool) extraction, plus text agreement with the pypdf baseline.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+from app.services.pdf_extractors import EXTRACTORS, iter_page_texts, shutdown_process_pool
+from benchmarks.pdf_fixtures import generate_pdf
+
+
+def _extract(source, extractor: str, workers: int, pages_per_task: int) -> List[str]:
+    return [text for _, _, text in iter_page_texts(
+        source,
+        extractor_name=extractor,
+        workers=workers,
+        pages_per_task=pages_per_task,
+        parallel_min_pages=1,
+    )]
+
+
+def _agreement(baseline: List[str], candidate: List[str]) -> float:
+    """Mean per-page similarity of whitespace-normalized text"""
+    if not baseline:
+        return 1.0
+    ratios = [
+        difflib.SequenceMatcher(None, " ".join(a.split()), " ".join(b.split())).ratio()
+        for a, b in zip(baseline, candidate)
+    ]
+    return sum(ratios) / len(baseline)
+
+
+def _available_extractors() -> List[str]:
+    names = []
+    for name in EXTRACTORS:
+        try:
+            _extract(generate_pdf(1), name, workers=1, pages_per_task=1)
+            names.append(name)
+        except RuntimeError as e:
+            print(f"skipping extractor '{name}': {e}")
+    return names
+
+
+def run(paths: List[str], workers: int, pages_per_task: int) -> List[Dict]:
+    results = []
+    extractors = _available_extractors()
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+        baseline = _extract(content, "pypdf", workers, pages_per_task)
+
+        for name in extractors:
+            for mode, source in (("memory", content), ("mmap+processes", path)):
+                start = time.perf_counter()
+                texts = _extract(source, name, workers, pages_per_task)
+                elapsed = time.perf_counter() - start
+                results.append({
+                    "file": os.path.basename(path),
+                    "pages": len(texts),
+                    "extractor": name,
+                    "mode": mode,
+                    "seconds": round(elapsed, 4),
+                    "pages_per_sec": round(len(texts) / elapsed, 1) if elapsed else None,
+                    "agreement_with_pypdf": round(_agreement(baseline, texts), 4),
+                })
+                print(json.dumps(results[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", nargs="*", default=[], help="PDF files to benchmark")
+    parser.add_argument("--pages", nargs="*", type=int, default=[50, 300], help="sizes of generated PDFs")
+    parser.add_argument("--workers", type=int, default=0, help="process pool size (0 = all cores)")
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = list(args.pdf)
+        if not paths:
+            for count in args.pages:
+                path = os.path.join(tmp_dir, f"generated_{count}p.pdf")
+                with open(path, "wb") as f:
+                    f.write(generate_pdf(count))
+                paths.append(path)
+
+        try:
+            results = run(paths, args.workers, args.pages_per_task)
+        finally:
+            shutdown_process_pool()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
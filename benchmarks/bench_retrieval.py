@@ -0,0 +1,154 @@
+"""Compare dense-only and hybrid (dense + BM25, rank-fused) retrieval.
+
+Usage:
+    python -m benchmarks.bench_retrieval [--pages 300] [--queries 200] [--k 3] [--rerank]
+                                         [--hash-embeddings] [--output results.json]
+
+Generated manual pages are chunked and indexed into a temporary Chroma
+directory. The script reports vector indexing time against BM25 index build
+time, then query latency (p50/p95) and hit@k for two query sets: exact part
+numbers, and text lines taken from random chunks. ``--rerank`` adds a mode
+that retrieves RERANK_CANDIDATES hybrid candidates and keeps the cross-encoder's
+top k.
+
+``--hash-embeddings`` swaps the embedding model for a deterministic hash so
+the benchmark runs offline; dense recall is then meaningless but latency and
+the BM25 side are still measured.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from app.config.config import get_settings
+from app.controllers.query_controller import QueryController
+from app.services.ai.chunking_service import ChunkingService
+from app.services.ai.reranker_service import CrossEncoderReranker
+from app.services.bm25_index import BM25Index
+from app.services.vector_store_service import VectorStoreService
+from benchmarks.fakes import use_hash_embeddings
+from benchmarks.pdf_fixtures import generate_pages
+
+COLLECTION = "bench_retrieval"
+
+
+def _chunks(page_count: int) -> List[Document]:
+    settings = get_settings()
+    pages = [
+        Document(page_content=text, metadata={"source": "bench.pdf", "page": page})
+        for page, text in enumerate(generate_pages(page_count))
+    ]
+    return list(ChunkingService().chunk_stream(pages, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP))
+
+
+def _query_sets(chunks: List[Document], count: int, seed: int = 0) -> Dict[str, List[Tuple[str, int]]]:
+    """Queries paired with the page that answers them"""
+    rng = random.Random(seed)
+    part_numbers, lines = [], []
+    for chunk in chunks:
+        first = chunk.page_content.split("\n")[0]
+        if "PN-" in first:
+            part_numbers.append((f"What is part {first.split()[-1]} used for?", chunk.metadata["page"]))
+    for chunk in rng.sample(chunks, min(count, len(chunks))):
+        line = rng.choice(chunk.page_content.split("\n")[1:] or [chunk.page_content])
+        lines.append((line, chunk.metadata["page"]))
+    return {"part_number": rng.sample(part_numbers, min(count, len(part_numbers))), "text_line": lines}
+
+
+async def _evaluate(
+    controller: QueryController,
+    queries: List[Tuple[str, int]],
+    k: int,
+    hybrid: bool,
+    reranker: Optional[CrossEncoderReranker] = None
+) -> Dict:
+    latencies, hits = [], 0
+    candidates = max(k, get_settings().RERANK_CANDIDATES) if reranker else k
+    for question, page in queries:
+        start = time.perf_counter()
+        _, scored = await controller.search(question, candidates, COLLECTION, min_score=0.0, hybrid=hybrid)
+        if reranker:
+            scored = reranker.rerank(question, scored, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += any(doc.metadata.get("page") == page for doc, _ in scored)
+    latencies.sort()
+    return {
+        "queries": len(queries),
+        "hit_at_k": round(hits / len(queries), 4) if queries else None,
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None,
+    }
+
+
+async def run(args) -> Dict:
+    settings = get_settings()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings.CHROMA_PERSIST_DIR = f"{tmp_dir}/chroma"
+        settings.BM25_INDEX_DIR = f"{tmp_dir}/bm25"
+        settings.RETRIEVAL_CACHE_SIZE = 0
+        if args.hash_embeddings:
+            use_hash_embeddings()
+
+        service = VectorStoreService()
+        chunks = _chunks(args.pages)
+
+        start = time.perf_counter()
+        service.add_documents(chunks, collection_name=COLLECTION)
+        index_seconds = time.perf_counter() - start
+
+        rebuilt = BM25Index()
+        start = time.perf_counter()
+        service._build_keyword_index(rebuilt, COLLECTION)
+        bm25_seconds = time.perf_counter() - start
+
+        controller = QueryController(llm_service=object(), vector_store_service=service)
+        reranker = None
+        if args.rerank:
+            reranker = CrossEncoderReranker(
+                settings.RERANKER_MODEL, batch_size=settings.RERANK_BATCH_SIZE, cache_size=0
+            )
+        results = {
+            "pages": args.pages,
+            "chunks": len(chunks),
+            "k": args.k,
+            "embedding": "hash" if args.hash_embeddings else settings.EMBEDDING_MODEL,
+            "index_seconds_dense_and_bm25": round(index_seconds, 3),
+            "bm25_rebuild_seconds": round(bm25_seconds, 3),
+            "query_sets": {},
+        }
+        for name, queries in _query_sets(chunks, args.queries).items():
+            results["query_sets"][name] = {
+                "dense": await _evaluate(controller, queries, args.k, hybrid=False),
+                "hybrid": await _evaluate(controller, queries, args.k, hybrid=True),
+            }
+            if reranker:
+                results["query_sets"][name]["hybrid+rerank"] = await _evaluate(
+                    controller, queries, args.k, hybrid=True, reranker=reranker
+                )
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rerank", action="store_true", help="also measure cross-encoder reranking")
+    parser.add_argument("--hash-embeddings", action="store_true", help="use hash vectors instead of the model")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Offline end-to-end benchmark of ingestion and /query/.
+
+Usage:
+    python -m benchmarks.bench_suite [--pdf-pages 10,100,400] [--bulk-files 20] [--requests 200]
+                                     [--concurrency 1,8,32] [--llm-latency-ms 50] [--ms-per-token 2]
+                                     [--tool-latency-ms 50] [--agent-share 0.1] [--answer-cache]
+                                     [--embeddings hash] [--route-tolerance 0.05] [--strict-routing]
+                                     [--seed 0] [--output results.json]
+
+Runs with no network: Gemini is replaced by a chat model that answers after
+a configurable latency, embeddings by a deterministic hash (``--embeddings
+model`` loads the configured model instead, if it is available locally), the
+weather/news/search tools by in-process stubs, and chat memory uses the
+in-process backend. All data goes to a temporary directory.
+
+Ingestion: one generated PDF per ``--pdf-pages`` size is indexed through the
+upload path, then ``--bulk-files`` PDFs through the bulk pipeline; pages/sec
+and chunks/sec are reported for each.
+
+Query: ``--requests`` POSTs to /query/ through the ASGI app at each
+``--concurrency`` level, reporting requests/sec and p50/p95/p99 latency.
+``--agent-share`` of the questions ask for the weather so they take the agent
+path with a tool call; the rest can be answered from the documents. The
+measured route mix is reported under ``query.routing``; when its agent share is
+more than ``--route-tolerance`` away from the share of weather questions sent,
+a warning is printed, or the run fails with ``--strict-routing``.
+
+Results are JSON; compare two runs with ``python -m benchmarks.compare``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+import httpx
+from app.config.config import get_settings
+from app.controllers.document_controller import DocumentController
+from app.services.vector_store_service import VectorStoreService
+from benchmarks.fakes import CITIES, LatencyChatModel, use_hash_embeddings, use_offline_tools, write_react_prompt
+from benchmarks.pdf_fixtures import generate_pages, generate_pdf
+
+COLLECTION = "bench_suite"
+
+
+def _percentile(values: List[float], share: float) -> float:
+    return round(values[int(share * (len(values) - 1))], 2)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _configure(tmp_dir: str, args) -> None:
+    settings = get_settings()
+    settings.CHROMA_PERSIST_DIR = f"{tmp_dir}/chroma"
+    settings.BM25_INDEX_DIR = f"{tmp_dir}/bm25"
+    settings.DOCUMENT_STORE_DIR = f"{tmp_dir}/documents"
+    settings.INGESTION_JOB_DIR = f"{tmp_dir}/jobs"
+    settings.REACT_PROMPT_CACHE_PATH = f"{tmp_dir}/prompts/react_prompt.json"
+    settings.CHROMA_COLLECTION_NAME = COLLECTION
+    settings.CHAT_MEMORY_BACKEND = "memory"
+    settings.ANSWER_CACHE_ENABLED = args.answer_cache
+    write_react_prompt()
+    if args.embeddings == "hash":
+        use_hash_embeddings(cache_size=settings.QUERY_EMBEDDING_CACHE_SIZE)
+
+
+def _ingestion(tmp_dir: str, args, service: VectorStoreService) -> Dict:
+    controller = DocumentController(vector_store_service=service)
+    results = {"single": {}, "bulk": {}}
+
+    for index, pages in enumerate(args.pdf_pages):
+        path = f"{tmp_dir}/single-{pages}.pdf"
+        with open(path, "wb") as f:
+            f.write(generate_pdf(pages, seed=args.seed + index))
+        start = time.perf_counter()
+        chunks = controller.index_pdf_file(path, os.path.basename(path), collection_name=COLLECTION)
+        elapsed = time.perf_counter() - start
+        results["single"][f"{pages}_pages"] = {
+            "seconds": round(elapsed, 3),
+            "pages_per_sec": round(pages / elapsed, 2),
+            "chunks_per_sec": round(chunks / elapsed, 2),
+        }
+
+    inputs = []
+    for index in range(args.bulk_files):
+        pages = args.pdf_pages[index % len(args.pdf_pages)]
+        path = f"{tmp_dir}/bulk-{index}.pdf"
+        with open(path, "wb") as f:
+            f.write(generate_pdf(pages, seed=args.seed + 1000 + index))
+        inputs.append((path, os.path.basename(path)))
+    if inputs:
+        bulk = controller.index_bulk(inputs, collection_name=COLLECTION)
+        results["bulk"] = {
+            "files": bulk["files_indexed"],
+            "pages": bulk["pages_parsed"],
+            "seconds": bulk["seconds"],
+            "pages_per_sec": bulk["pages_per_sec"],
+            "chunks_per_sec": bulk["chunks_per_sec"],
+        }
+    return results
+
+
+def _questions(args) -> List[Tuple[str, str]]:
+    """(question, conversation_id) pairs; documents questions are lines of the indexed pages"""
+    rng = random.Random(args.seed)
+    lines = [
+        line
+        for index, pages in enumerate(args.pdf_pages)
+        for page in generate_pages(pages, seed=args.seed + index)
+        for line in page.split("\n")[1:]
+        if line.strip()
+    ]
+    conversations = [f"bench-{i}" for i in range(max(args.concurrency) * 2)]
+    questions = []
+    for _ in range(args.requests):
+        if rng.random() < args.agent_share:
+            question = f"What is the weather in {rng.choice(CITIES)} today?"
+        else:
+            question = rng.choice(lines)
+        questions.append((question, rng.choice(conversations)))
+    return questions
+
+
+def _is_agent_question(question: str) -> bool:
+    return question.startswith("What is the weather in ")
+
+
+def _agent_share(routing: Dict) -> float:
+    requests = {route: stats["requests"] for route, stats in routing["routes"].items()}
+    total = sum(requests.values())
+    return round(requests.get("agent", 0) / total, 3) if total else 0.0
+
+
+def _route_mix_warning(results: Dict, tolerance: float) -> str:
+    """Why the measured route mix does not match the questions sent, or an empty string"""
+    routing = results["query"]["routing"]
+    if abs(routing["agent_share"] - routing["expected_agent_share"]) <= tolerance:
+        return ""
+    return (
+        f"{routing['agent_share']:.0%} of /query/ requests took the agent path but "
+        f"{routing['expected_agent_share']:.0%} of the questions asked for it (routing reasons: "
+        f"{routing['reasons']}); latencies do not reflect the --agent-share mix"
+    )
+
+
+async def _load(client: httpx.AsyncClient, questions: List[Tuple[str, str]], concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(question: str, conversation_id: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/query/", json={"question": question, "conversation_id": conversation_id})
+            if response.status_code == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(question, conversation_id) for question, conversation_id in questions))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(questions),
+        "errors": errors,
+        "requests_per_sec": round(len(questions) / elapsed, 2),
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else None,
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": _percentile(latencies, 0.95) if latencies else None,
+        "p99_ms": _percentile(latencies, 0.99) if latencies else None,
+    }
+
+
+async def _queries(args, service: VectorStoreService) -> Dict:
+    # Imported here so the settings above are in place before the app is built
+    from app.main import app
+    from app.routes import dependencies
+    from app.services.ai.llm_service import LLMService
+
+    llm = LatencyChatModel(
+        latency_seconds=args.llm_latency_ms / 1000,
+        seconds_per_token=args.ms_per_token / 1000,
+        seed=args.seed
+    )
+    llm_service = LLMService(llm=llm)
+    use_offline_tools(llm_service, latency_seconds=args.tool_latency_ms / 1000)
+    dependencies._llm_service = llm_service
+    dependencies._vector_store_service = service
+
+    questions = _questions(args)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await _load(client, questions[:min(10, len(questions))], 1)
+        for concurrency in args.concurrency:
+            results[f"concurrency_{concurrency}"] = await _load(client, questions, concurrency)
+    warm_up = questions[:min(10, len(questions))]
+    agent_questions = sum(_is_agent_question(q) for q, _ in warm_up + questions * len(args.concurrency))
+    results["routing"] = llm_service.router.stats()
+    results["routing"]["expected_agent_share"] = round(
+        agent_questions / (len(warm_up) + len(questions) * len(args.concurrency)), 3
+    )
+    results["routing"]["agent_share"] = _agent_share(results["routing"])
+    await dependencies.drain_summarizer()
+    return results
+
+
+async def run(args) -> Dict:
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key != "output"},
+        }
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _configure(tmp_dir, args)
+        service = VectorStoreService()
+        results["ingestion"] = await asyncio.to_thread(_ingestion, tmp_dir, args, service)
+        results["query"] = await _queries(args, service)
+
+        from app.routes.dependencies import shutdown_services
+        from app.services.stage_executor import shutdown_stage_executors
+        from app.services.tools.http_client import ToolHttpClient
+        shutdown_services()
+        shutdown_stage_executors()
+        await ToolHttpClient.aclose()
+    return results
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-pages", type=_int_list, default=[10, 100, 400])
+    parser.add_argument("--bulk-files", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--ms-per-token", type=float, default=2)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    parser.add_argument("--agent-share", type=float, default=0.1)
+    parser.add_argument("--answer-cache", action="store_true", help="leave the semantic answer cache on")
+    parser.add_argument("--embeddings", choices=["hash", "model"], default="hash")
+    parser.add_argument("--route-tolerance", type=float, default=0.05,
+                        help="largest allowed gap between the measured and requested agent share")
+    parser.add_argument("--strict-routing", action="store_true",
+                        help="exit with an error when the measured route mix is off instead of warning")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    warning = _route_mix_warning(results, args.route_tolerance)
+    if warning:
+        print(f"warning: {warning}", file=sys.stderr)
+        if args.strict_routing:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
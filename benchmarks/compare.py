@@ -0,0 +1,95 @@
+"""Compare two benchmark result files, e.g. from the parent commit and this one.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 0.1] [--fail-on-regression]
+
+Numeric results are matched by their path in the JSON (``meta`` is
+skipped). Metrics ending in ``_per_sec`` are better when higher, those ending
+in ``_ms`` or named ``seconds`` when lower; anything else is listed without
+a verdict. A change beyond ``--threshold`` (relative) in the wrong direction
+is a regression, and ``--fail-on-regression`` exits with status 1 if there
+is one.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Optional
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by their dotted path"""
+    values = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = float(value)
+    return values
+
+
+def direction(path: str) -> Optional[int]:
+    """+1 when higher is better, -1 when lower is better, None when neutral"""
+    name = path.rsplit(".", 1)[-1]
+    if name.endswith("_per_sec"):
+        return 1
+    if name.endswith("_ms") or name == "seconds":
+        return -1
+    return None
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> Dict:
+    base = flatten({k: v for k, v in baseline.items() if k != "meta"})
+    new = flatten({k: v for k, v in candidate.items() if k != "meta"})
+    rows, regressions = [], []
+    for path in sorted(set(base) & set(new)):
+        before, after = base[path], new[path]
+        change = (after - before) / before if before else None
+        better = direction(path)
+        verdict = ""
+        if better is not None and change is not None and abs(change) > threshold:
+            verdict = "improved" if change * better > 0 else "REGRESSED"
+            if verdict == "REGRESSED":
+                regressions.append(path)
+        rows.append({"metric": path, "baseline": before, "candidate": after, "change": change, "verdict": verdict})
+    return {
+        "rows": rows,
+        "regressions": regressions,
+        "only_in_baseline": sorted(set(base) - set(new)),
+        "only_in_candidate": sorted(set(new) - set(base)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change that counts (default 0.1)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    report = compare(baseline, candidate, args.threshold)
+    commits = (baseline.get("meta", {}).get("commit", "?"), candidate.get("meta", {}).get("commit", "?"))
+    print(f"{'metric':<52} {commits[0]:>12} {commits[1]:>12} {'change':>9}")
+    for row in report["rows"]:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "n/a"
+        print(f"{row['metric']:<52} {row['baseline']:>12.2f} {row['candidate']:>12.2f} {change:>9}  {row['verdict']}")
+    for path in report["only_in_baseline"]:
+        print(f"{path:<52} only in baseline")
+    for path in report["only_in_candidate"]:
+        print(f"{path:<52} only in candidate")
+
+    if report["regressions"]:
+        print(f"\n{len(report['regressions'])} regression(s) beyond {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Offline stand-ins for the embedding model, Gemini and the agent tools.
+
+Everything here is deterministic for a given seed and needs no network, so
+benchmark results differ between commits only because the code did.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import httpx
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from app.config.config import get_settings
+from app.services.ai import embeddings_service
+from app.services.tools.http_client import ToolHttpClient
+
+# The hwchase17/react template, written to REACT_PROMPT_CACHE_PATH so LLMService never calls LangSmith
+REACT_TEMPLATE = """Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+
+CITIES = ["Pune", "Mumbai", "Delhi", "Chennai", "Kolkata", "Bengaluru", "Jaipur", "Hyderabad"]
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic unit vectors from hashed word n-grams.
+
+    Texts sharing runs of words get similar vectors, so a question quoting a
+    line of a page retrieves the chunk holding it, as with a real embedding
+    model. Single words are weighted down: the generated pages share a small
+    vocabulary, and only word pairs and triples tell their lines apart.
+    """
+
+    dimensions = 1024
+    ngram_weights = {1: 0.3, 2: 1.0, 3: 1.0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        words = re.findall(r"\w+", text.lower())
+        vector = np.zeros(self.dimensions)
+        for n, weight in self.ngram_weights.items():
+            for start in range(len(words) - n + 1):
+                index, sign = _feature_slot(" ".join(words[start:start + n]), self.dimensions)
+                vector[index] += sign * weight
+        norm = np.linalg.norm(vector)
+        if not norm:
+            vector[0], norm = 1.0, 1.0
+        return list(vector / norm)
+
+    def stats(self) -> Dict:
+        return {"backend": "hash"}
+
+    def close(self) -> None:
+        pass
+
+
+@lru_cache(maxsize=65536)
+def _feature_slot(feature: str, dimensions: int) -> Tuple[int, float]:
+    """Dimension and sign a feature is hashed to"""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+    return value % dimensions, 1.0 if value >> 63 else -1.0
+
+
+def use_hash_embeddings(cache_size: int = 0) -> None:
+    """Make EmbeddingsService hand out HashEmbeddings instead of loading a model"""
+    service = object.__new__(embeddings_service.EmbeddingsService)
+    service.embeddings = embeddings_service.CachedQueryEmbeddings(HashEmbeddings(), cache_size=cache_size)
+    embeddings_service.EmbeddingsService._instance = service
+
+
+class LatencyChatModel(BaseChatModel):
+    """Chat model that answers after a fixed latency plus a per-token delay.
+
+    Direct prompts get a canned answer. Agent (ReAct) prompts get one
+    ``get_weather`` action for a city named in the question, then a final
+    answer once an observation is present, so tool calls are exercised too.
+    """
+
+    latency_seconds: float = 0.05
+    seconds_per_token: float = 0.002
+    jitter: float = 0.2
+    answer_words: int = 60
+    seed: int = 0
+    _rng: Any = None
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency-fake"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        answer = " ".join(["The manual covers this in the maintenance section."] * max(1, self.answer_words // 8))
+        if "Action Input:" not in prompt:
+            return answer
+        scratchpad = prompt.rsplit("Begin!", 1)[-1]
+        if "Observation:" in scratchpad:
+            return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+        city = next((city for city in CITIES if city.lower() in prompt.lower()), CITIES[0])
+        return f"Thought: I need the current weather.\nAction: get_weather\nAction Input: {city}"
+
+    def _delay(self, text: str) -> float:
+        spread = 1 + self._rng.uniform(-self.jitter, self.jitter)
+        return (self.latency_seconds + self.seconds_per_token * len(text.split())) * spread
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self._reply(messages)
+        time.sleep(self._delay(text))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self._reply(messages)
+        await asyncio.sleep(self._delay(text))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        text = self._reply(messages)
+        time.sleep(self._delay(""))
+        for piece in re.findall(r"\S+\s*", text):
+            time.sleep(self.seconds_per_token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        text = self._reply(messages)
+        await asyncio.sleep(self._delay(""))
+        for piece in re.findall(r"\S+\s*", text):
+            await asyncio.sleep(self.seconds_per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+def stub_tool_transport(latency_seconds: float = 0.05) -> httpx.MockTransport:
+    """HTTP transport answering the weather and news APIs with canned payloads"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_seconds)
+        if request.url.path.endswith("/weather"):
+            city = request.url.params.get("q", "Pune")
+            return httpx.Response(200, json={
+                "name": city,
+                "main": {"temp": 27.5, "feels_like": 29.0, "humidity": 61},
+                "weather": [{"description": "scattered clouds"}],
+                "wind": {"speed": 3.1},
+            })
+        return httpx.Response(200, json={
+            "items": [{"title": f"Headline {i}", "link": f"https://example.com/{i}"} for i in range(5)]
+        })
+
+    return httpx.MockTransport(handler)
+
+
+def use_offline_tools(llm_service, latency_seconds: float = 0.05) -> None:
+    """Route the agent tools of an LLMService to in-process stand-ins"""
+    ToolHttpClient._client = httpx.AsyncClient(transport=stub_tool_transport(latency_seconds))
+
+    def search(query: str) -> str:
+        time.sleep(latency_seconds)
+        return f"[snippet: Results for {query}, title: Example, link: https://example.com]"
+
+    llm_service.search_service.search = search
+
+
+def write_react_prompt() -> None:
+    """Cache the ReAct prompt locally so LLMService does not pull it from LangSmith"""
+    settings = get_settings()
+    path = settings.REACT_PROMPT_CACHE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"ref": settings.REACT_PROMPT_REF, "template": REACT_TEMPLATE}, f)
@@ -0,0 +1,61 @@
+"""Generate simple text PDFs for benchmarks without any PDF-writing dependency"""
+
+import random
+from typing import List, Optional
+
+_WORDS = (
+    "pump valve pressure sensor module firmware calibrate torque gasket housing "
+    "error code reset manual inspection voltage relay circuit bearing assembly "
+    "maintenance schedule warranty replacement filter coolant hydraulic flange"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """Build a minimal PDF with one Helvetica text page per entry in ``pages``"""
+    count = len(pages)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(count))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        lines = " ".join(f"({_escape(line)}) Tj T*" for line in text.split("\n"))
+        stream = f"BT /F1 10 Tf 50 760 Td 12 TL {lines} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def generate_pages(page_count: int, lines_per_page: int = 40, seed: Optional[int] = 0) -> List[str]:
+    """Deterministic pseudo-manual text, with a part number on every page"""
+    rng = random.Random(seed)
+    pages = []
+    for page in range(page_count):
+        lines = [f"Section {page + 1}: part number PN-{page:04d}-{rng.randint(100, 999)}"]
+        for _ in range(lines_per_page - 1):
+            lines.append(" ".join(rng.choice(_WORDS) for _ in range(12)))
+        pages.append("\n".join(lines))
+    return pages
+
+
+def generate_pdf(page_count: int, lines_per_page: int = 40, seed: Optional[int] = 0) -> bytes:
+    return make_pdf(generate_pages(page_count, lines_per_page, seed))
@@ -1,12 +1,32 @@
 import streamlit as st
 import requests
 import time
+import json
 
 API_BASE_URL = "http://127.0.0.1:8000"
 UPLOAD_URL = f"{API_BASE_URL}/documents/upload"
+JOB_URL = f"{API_BASE_URL}/documents/jobs"
 QUERY_URL = f"{API_BASE_URL}/query/"
+QUERY_STREAM_URL = f"{API_BASE_URL}/query/stream"
 HEALTH_URL = f"{API_BASE_URL}/health"
 
+
+def iter_sse_events(response):
+    """Yield (event, data) pairs from a text/event-stream response."""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+
 st.set_page_config(page_title="Gemini RAG Chat", page_icon="A", layout="wide")
 
 st.markdown("""
@@ -54,9 +74,29 @@ if uploaded_file and not st.session_state.pdf_uploaded:
         files = {"file": (uploaded_file.name, uploaded_file, "application/pdf")}
         try:
             resp = requests.post(UPLOAD_URL, files=files)
-            if resp.status_code == 200:
-                st.sidebar.success("✅ PDF uploaded successfully!")
-                st.session_state.pdf_uploaded = True
+            if resp.status_code == 202:
+                job = resp.json()
+                progress_bar = st.sidebar.progress(0.0, text="Queued for indexing...")
+                while job["status"] in ("queued", "running"):
+                    time.sleep(1)
+                    job = requests.get(f"{JOB_URL}/{job['job_id']}", timeout=10).json()
+                    total = job.get("chunks_total") or 0
+                    done = job.get("chunks_written", 0) / total if total else 0.0
+                    progress_bar.progress(
+                        min(done, 1.0),
+                        text=(
+                            f"Pages parsed: {job.get('pages_parsed', 0)} · "
+                            f"Chunks embedded: {job.get('chunks_embedded', 0)}/{total} · "
+                            f"Written: {job.get('chunks_written', 0)}/{total}"
+                        ),
+                    )
+                progress_bar.empty()
+
+                if job["status"] == "completed":
+                    st.sidebar.success("✅ PDF uploaded successfully!")
+                    st.session_state.pdf_uploaded = True
+                else:
+                    st.sidebar.error(f"❌ Indexing failed: {job.get('error')}")
             else:
                 st.sidebar.error(f"❌ Upload failed: {resp.text}")
         except Exception as e:
@@ -69,7 +109,8 @@ else:
 
 st.sidebar.markdown("---")
 top_k = st.sidebar.slider("🔍 Top K Results", 1, 10, 1)
-st.sidebar.markdown("Adjust retrieval depth")
+min_score = st.sidebar.slider("🎯 Minimum Relevance", 0.0, 1.0, 0.2, 0.05)
+st.sidebar.markdown("Adjust retrieval depth and how relevant context must be")
 
 st.title("🤖 Gemini RAG Chatbot")
 st.markdown("Ask any question. If you've uploaded a PDF, responses will use its context — otherwise, Gemini will answer generally.")
@@ -117,16 +158,45 @@ if st.session_state.chat_history and (
             payload = {
                 "question": latest_question,
                 "top_k": top_k,
+                "min_score": min_score,
                 "conversation_id": st.session_state.conversation_id,
                 "use_memory": True,
             }
-            resp = requests.post(QUERY_URL, json=payload, timeout=120)
-
-            if resp.status_code == 200:
-                data = resp.json()
-                answer = data.get("answer", "No answer generated.")
-                sources = data.get("sources", [])
-
+            step_placeholder = st.empty()
+            answer = ""
+            sources = []
+            error = None
+
+            with requests.post(QUERY_STREAM_URL, json=payload, stream=True, timeout=(10, 120)) as resp:
+                if resp.status_code != 200:
+                    error = resp.json().get("detail", "Unknown error")
+                else:
+                    for event, data in iter_sse_events(resp):
+                        if event == "sources":
+                            sources = data
+                        elif event == "step":
+                            if data.get("output") is None:
+                                step_placeholder.caption(f"🔧 Using tool: {data.get('tool')}")
+                            else:
+                                step_placeholder.caption(f"✅ {data.get('tool')} finished")
+                        elif event == "token":
+                            answer += data.get("text", "")
+                            answer_placeholder.markdown(
+                                f"<div class='answer-box'>🤖 <b>Gemini:</b> {answer}▌</div>",
+                                unsafe_allow_html=True,
+                            )
+                        elif event == "done":
+                            answer = data.get("answer") or answer or "No answer generated."
+                        elif event == "error":
+                            error = data.get("detail", "Unknown error")
+
+            step_placeholder.empty()
+            if error:
+                answer_placeholder.markdown(
+                    f"<div class='answer-box'>❌ Query failed: {error}</div>",
+                    unsafe_allow_html=True,
+                )
+            else:
                 st.session_state.chat_history.append(
                     {"role": "assistant", "text": answer, "sources": sources}
                 )
@@ -142,13 +212,6 @@ if st.session_state.chat_history and (
                         for i, src in enumerate(sources, start=1):
                             st.markdown(f"**Source {i}:** {src}")
 
-            else:
-                detail = resp.json().get("detail", "Unknown error")
-                answer_placeholder.markdown(
-                    f"<div class='answer-box'>❌ Query failed: {detail}</div>",
-                    unsafe_allow_html=True,
-                )
-
         except Exception as e:
             answer_placeholder.markdown(
                 f"<div class='answer-box'>🚨 Connection Error: {e}</div>",